@@ -82,7 +82,44 @@ if ! ls "$GIT_CLAUDE_DIR/commits/"*/reasoning.md >/dev/null 2>&1; then
     exit 0
 fi
 
-# Find all reasoning files and search
+# Fast path: answer from the artifact index. Hooks and --watch keep it
+# current; re-index here only when a reasoning file or attempts log is
+# newer than the last re-index this script ran (or the index is missing).
+SCRIPT_DIR="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+TOOLS_DIR="$SCRIPT_DIR/../tools"
+INDEX_DB=".claude/cache/artifact-index/context.db"
+INDEX_STAMP=".claude/cache/artifact-index/reasoning.stamp"
+if command -v uv >/dev/null 2>&1 && [[ -f "$TOOLS_DIR/artifact_query.py" ]]; then
+    query_args=("$QUERY" --type reasoning --limit "$LIMIT")
+    if [[ "$FILTER" == "failed" ]]; then
+        query_args+=(--outcome FAILED)
+    elif [[ "$FILTER" == "passed" ]]; then
+        query_args+=(--outcome SUCCEEDED)
+    fi
+    indexed=1
+    if [[ ! -f "$INDEX_DB" || ! -f "$INDEX_STAMP" ]] || [[ -n "$(find "$GIT_CLAUDE_DIR/commits" "$GIT_CLAUDE_DIR/branches" \
+            \( -name reasoning.md -o -name attempts.jsonl \) -newer "$INDEX_STAMP" -print -quit 2>/dev/null)" ]]; then
+        # Stamp first, so files written during the run are picked up next time
+        mkdir -p "$(dirname "$INDEX_STAMP")" && touch "$INDEX_STAMP.new" 2>/dev/null
+        if uv run python "$TOOLS_DIR/artifact_index.py" --reasoning >/dev/null 2>&1; then
+            mv -f "$INDEX_STAMP.new" "$INDEX_STAMP" 2>/dev/null
+        else
+            rm -f "$INDEX_STAMP.new"
+            indexed=0
+        fi
+    fi
+    if [[ "$indexed" == 1 ]]; then
+        echo ""
+        uv run python "$TOOLS_DIR/artifact_query.py" "${query_args[@]}"
+        echo ""
+        echo "💡 Related searches:"
+        echo "  search-reasoning.sh '$QUERY' --failed   # Only failed attempts"
+        echo "  search-reasoning.sh '$QUERY' --passed   # Only first-try successes"
+        exit 0
+    fi
+fi
+
+# Fallback: grep reasoning files directly
 matches=""
 if [[ "$FILTER" == "failed" ]]; then
     # Only files with "Failed attempts" section
@@ -0,0 +1,348 @@
+#!/usr/bin/env python3
+"""
+Artifact Index Benchmark for SDD Plugin.
+
+Generates a synthetic corpus of handoffs, specs, plans and continuity
+ledgers, then measures index build time, incremental re-index time, query
+latency per artifact type and database size. Results are written as JSON
+so runs can be diffed between versions.
+
+USAGE:
+    uv run python tools/artifact_bench.py --scale 10000
+    uv run python tools/artifact_bench.py --scale 100000 --jobs 8 --output bench-100k.json
+    uv run python tools/artifact_bench.py --scale 10000 --workdir /tmp/corpus --keep
+"""
+
+import argparse
+import json
+import os
+import platform
+import random
+import shutil
+import sqlite3
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+import artifact_index
+import artifact_query
+
+# Share of the corpus given to each artifact type
+MIX = {"handoffs": 0.6, "specs": 0.15, "plans": 0.1, "continuity": 0.15}
+
+VOCAB = (
+    "auth login token refresh session cookie oauth jwt rate limit cache redis "
+    "database migration schema index query postgres sqlite transaction retry "
+    "timeout queue worker async batch pipeline deploy rollback config env "
+    "secret validation error handler middleware router endpoint api rest "
+    "graphql pagination cursor upload storage bucket email notification "
+    "webhook payment invoice billing subscription user profile permission "
+    "role admin audit logging metrics tracing alert dashboard test eval "
+    "fixture mock flaky regression benchmark latency throughput memory leak"
+).split()
+
+QUERIES = [
+    "auth token", "rate limiting", "database migration", "redis cache",
+    "payment webhook", "flaky test", "memory leak", "pagination cursor",
+    "oauth refresh", "rollback deploy",
+]
+
+
+def sentence(rng: random.Random, words: int = 12) -> str:
+    """A pseudo-sentence drawn from the domain vocabulary."""
+    return " ".join(rng.choice(VOCAB) for _ in range(words)).capitalize() + "."
+
+
+def paragraph(rng: random.Random, sentences: int = 3) -> str:
+    """A few pseudo-sentences."""
+    return " ".join(sentence(rng) for _ in range(sentences))
+
+
+def write_handoff(rng: random.Random, root: Path, i: int) -> Path:
+    path = root / "thoughts/shared/handoffs" / f"session-{i % 200:03d}" / f"task-{i:06d}.md"
+    files = "\n".join(
+        f"- `src/{rng.choice(VOCAB)}/{rng.choice(VOCAB)}.py`" for _ in range(rng.randint(1, 6))
+    )
+    path.write_text(
+        f"---\noutcome: {rng.choice(['SUCCEEDED', 'SUCCEEDED', 'PARTIAL', 'FAILED'])}\n---\n"
+        f"# Handoff: task {i}\n\n"
+        f"## Summary\n{paragraph(rng)}\n\n"
+        f"## What Worked\n{paragraph(rng, 2)}\n\n"
+        f"## What Failed\n{paragraph(rng, 2)}\n\n"
+        f"## Key Decisions\n{paragraph(rng, 2)}\n\n"
+        f"## Files Modified\n{files}\n"
+    )
+    return path
+
+
+def write_spec(rng: random.Random, root: Path, i: int) -> Path:
+    path = root / "specs" / f"module-{i % 50:02d}" / f"SPEC-{i:06d}.md"
+    behaviors = "\n".join(
+        f"WHEN the {rng.choice(VOCAB)} {rng.choice(VOCAB)} THEN the system SHALL "
+        f"{rng.choice(VOCAB)} the {rng.choice(VOCAB)}."
+        for _ in range(rng.randint(2, 5))
+    )
+    path.write_text(
+        f"# SPEC-{i:06d}: {rng.choice(VOCAB).capitalize()} {rng.choice(VOCAB)}\n\n"
+        f"Implements REQ-{i % 500:03d}.\n\n"
+        f"## Behavioral Specification\n{paragraph(rng)}\n\n{behaviors}\n"
+    )
+    return path
+
+
+def write_plan(rng: random.Random, root: Path, i: int) -> Path:
+    path = root / "thoughts/shared/plans" / f"plan-{i:06d}.md"
+    path.write_text(
+        f"# Plan: {sentence(rng, 5)}\n\n"
+        f"## Overview\n{paragraph(rng)}\n\n"
+        f"## Approach\n{paragraph(rng, 4)}\n"
+    )
+    return path
+
+
+def write_ledger(rng: random.Random, root: Path, i: int) -> Path:
+    path = root / "thoughts/ledgers" / f"CONTINUITY_session-{i:06d}.md"
+    items = [sentence(rng, 5) for _ in range(6)]
+    path.write_text(
+        f"# Session {i}\n\n"
+        f"## Goal\n{sentence(rng)}\n\n"
+        f"## State\n- [x] {items[0]}\n- [x] {items[1]}\n- [→] {items[2]}\n"
+        f"- [ ] {items[3]}\n- [ ] {items[4]}\n\n"
+        f"## Key Learnings\n{paragraph(rng, 2)}\n\n"
+        f"## Key Decisions\n{paragraph(rng, 2)}\n"
+    )
+    return path
+
+
+WRITERS: Dict[str, Callable[[random.Random, Path, int], Path]] = {
+    "handoffs": write_handoff,
+    "specs": write_spec,
+    "plans": write_plan,
+    "continuity": write_ledger,
+}
+
+
+def generate_corpus(root: Path, scale: int, seed: int) -> Dict[str, List[Path]]:
+    """Write ``scale`` artifacts under ``root`` in the MIX proportions."""
+    rng = random.Random(seed)
+    for d in ("thoughts/shared/handoffs", "thoughts/shared/plans", "thoughts/ledgers", "specs"):
+        (root / d).mkdir(parents=True, exist_ok=True)
+    for i in range(200):
+        (root / "thoughts/shared/handoffs" / f"session-{i:03d}").mkdir(exist_ok=True)
+    for i in range(50):
+        (root / "specs" / f"module-{i:02d}").mkdir(exist_ok=True)
+
+    corpus: Dict[str, List[Path]] = {}
+    for artifact_type, share in MIX.items():
+        count = max(1, int(scale * share))
+        corpus[artifact_type] = [WRITERS[artifact_type](rng, root, i) for i in range(count)]
+    return corpus
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """p50/p95/p99 and mean of latency samples, in milliseconds."""
+    ordered = sorted(samples)
+
+    def pick(p: float) -> float:
+        return ordered[min(len(ordered) - 1, int(round(p * (len(ordered) - 1))))]
+
+    return {
+        "p50_ms": round(pick(0.50) * 1000, 3),
+        "p95_ms": round(pick(0.95) * 1000, 3),
+        "p99_ms": round(pick(0.99) * 1000, 3),
+        "mean_ms": round(statistics.mean(ordered) * 1000, 3),
+    }
+
+
+def run_index(conn: sqlite3.Connection, jobs: int) -> Dict[str, Any]:
+    """Run every indexer once; returns elapsed time and change counts."""
+    executor = ProcessPoolExecutor(max_workers=jobs) if jobs > 1 else None
+    totals = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    start = time.perf_counter()
+    try:
+        for index_fn in (
+            artifact_index.index_handoffs,
+            artifact_index.index_plans,
+            artifact_index.index_specs,
+            artifact_index.index_continuity,
+        ):
+            stats = index_fn(conn, False, executor, jobs)
+            for key in totals:
+                totals[key] += stats[key]
+    finally:
+        if executor is not None:
+            executor.shutdown()
+    elapsed = time.perf_counter() - start
+    return {"seconds": round(elapsed, 4), **totals}
+
+
+def bench_queries(db_path: Path, repeat: int) -> Dict[str, Dict[str, float]]:
+    """Query latency percentiles per artifact type."""
+    conn = sqlite3.connect(db_path)
+    searches = {
+        "handoffs": lambda q: artifact_query.search_handoffs(conn, q, None, 5),
+        "specs": lambda q: artifact_query.search_specs(conn, q, 5),
+        "plans": lambda q: artifact_query.search_plans(conn, q, 5),
+        "continuity": lambda q: artifact_query.search_continuity(conn, q, 5),
+        "past_queries": lambda q: artifact_query.search_past_queries(conn, q),
+        "unified": lambda q: artifact_query.search_unified(conn, q, "all", None, 10),
+    }
+    try:
+        artifact_query.require_numpy()
+        searches["semantic"] = lambda q: artifact_query.search_semantic(conn, q, "all", None, 10)
+        searches["hybrid"] = lambda q: artifact_query.search_hybrid(conn, q, "all", None, 10)
+    except RuntimeError:
+        pass  # NumPy not installed; skip the vector searches
+    results = {}
+    for name, search in searches.items():
+        search(QUERIES[0])  # warm the page cache
+        samples = []
+        for _ in range(repeat):
+            for query in QUERIES:
+                start = time.perf_counter()
+                search(query)
+                samples.append(time.perf_counter() - start)
+        results[name] = percentiles(samples)
+    conn.close()
+    return results
+
+
+def git_revision() -> str:
+    """Short revision of the plugin checkout, for labelling results."""
+    try:
+        return subprocess.run(
+            ["git", "-C", str(Path(__file__).parent), "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_benchmark(root: Path, scale: int, seed: int, jobs: int, repeat: int, touch: float) -> Dict[str, Any]:
+    """Generate a corpus under ``root`` and benchmark indexing and search."""
+    start = time.perf_counter()
+    corpus = generate_corpus(root, scale, seed)
+    generate_s = time.perf_counter() - start
+
+    cwd = os.getcwd()
+    os.chdir(root)
+    try:
+        db_path = artifact_index.get_db_path()
+        conn = artifact_index.init_db(db_path)
+
+        full = run_index(conn, jobs)
+        full["rows_per_s"] = round((full["added"] + full["updated"]) / full["seconds"]) if full["seconds"] else 0
+        noop = run_index(conn, jobs)
+
+        # Modify a fraction of every type and re-index
+        rng = random.Random(seed + 1)
+        touched = 0
+        for paths in corpus.values():
+            for path in rng.sample(paths, max(1, int(len(paths) * touch))):
+                with open(path, "a") as f:
+                    f.write(f"\n{sentence(rng)}\n")
+                touched += 1
+        incremental = run_index(conn, jobs)
+        incremental["files_touched"] = touched
+        conn.close()
+
+        queries = bench_queries(db_path, repeat)
+        db_size = artifact_index.file_size(db_path)
+    finally:
+        os.chdir(cwd)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "sqlite": sqlite3.sqlite_version,
+        "scale": scale,
+        "seed": seed,
+        "jobs": jobs,
+        "corpus": {k: len(v) for k, v in corpus.items()},
+        "generate_s": round(generate_s, 3),
+        "index": {"full": full, "noop": noop, "incremental": incremental},
+        "query": queries,
+        "db_size_bytes": db_size,
+    }
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Benchmark artifact index build and query latency"
+    )
+    parser.add_argument("--scale", type=int, default=10000, help="Total artifacts to generate")
+    parser.add_argument("--seed", type=int, default=42, help="Corpus RNG seed")
+    parser.add_argument("--jobs", type=int, default=1, help="Indexer worker processes")
+    parser.add_argument("--repeat", type=int, default=20, help="Passes over the query set")
+    parser.add_argument(
+        "--touch",
+        type=float,
+        default=0.01,
+        help="Fraction of files modified before the incremental run (default: 0.01)"
+    )
+    parser.add_argument(
+        "--workdir",
+        type=str,
+        help="Corpus directory; must be new or empty (default: a temp dir)"
+    )
+    parser.add_argument(
+        "--keep",
+        action="store_true",
+        help="Keep the corpus after the run"
+    )
+    parser.add_argument("--output", type=str, default="bench_results.json", help="JSON results file")
+
+    args = parser.parse_args()
+
+    # Only a directory this run created is ever deleted
+    if args.workdir:
+        root = Path(args.workdir)
+        if root.exists() and (not root.is_dir() or any(root.iterdir())):
+            parser.error(f"--workdir {root} exists and is not empty; pass a new or empty directory")
+        created = not root.exists()
+        root.mkdir(parents=True, exist_ok=True)
+    else:
+        root = Path(tempfile.mkdtemp(prefix="artifact-bench-"))
+        created = True
+    root = root.resolve()
+
+    print(f"Generating {args.scale} artifacts in {root}")
+    try:
+        results = run_benchmark(root, args.scale, args.seed, args.jobs, args.repeat, args.touch)
+    finally:
+        if not args.keep:
+            if created:
+                shutil.rmtree(root, ignore_errors=True)
+            else:
+                # An empty directory the user passed in: empty it again
+                for child in root.iterdir():
+                    if child.is_dir() and not child.is_symlink():
+                        shutil.rmtree(child, ignore_errors=True)
+                    else:
+                        child.unlink(missing_ok=True)
+
+    index = results["index"]
+    print(f"  Full index:        {index['full']['seconds']:.2f}s ({index['full']['rows_per_s']:,} rows/s)")
+    print(f"  No-op re-index:    {index['noop']['seconds']:.3f}s")
+    print(f"  Incremental:       {index['incremental']['seconds']:.3f}s "
+          f"({index['incremental']['files_touched']} files touched)")
+    for name, stats in results["query"].items():
+        print(f"  Query {name + ':':<14} p50 {stats['p50_ms']:.2f}ms  "
+              f"p95 {stats['p95_ms']:.2f}ms  p99 {stats['p99_ms']:.2f}ms")
+    print(f"  DB size:           {artifact_index.format_size(results['db_size_bytes'])}")
+
+    Path(args.output).write_text(json.dumps(results, indent=2) + "\n")
+    print(f"Results written to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Artifact Query Client for SDD Plugin.
+
+The thin side of the query server (tools/artifact_server.py): finds the
+server's socket, checks that it belongs to this user, and forwards a
+search. It imports only os, sys, socket and json, so a plain search such as
+
+    uv run python tools/artifact_query.py "token refresh" --type handoffs
+
+is answered by the warm server before artifact_query.py loads the rest of
+itself. Anything else (other options, no server, a server running older
+code) falls through to the full CLI.
+
+The socket lives in a directory only this user can enter: $XDG_RUNTIME_DIR,
+or else a 0700 directory under the system temp dir. A socket, or directory,
+owned by anyone else is never used, so another local user can't pose as
+the server and feed forged results back.
+"""
+
+import json
+import os
+import socket
+import sys
+
+DEFAULT_DB = os.path.join(".claude", "cache", "artifact-index", "context.db")
+TOOLS_DIR = os.path.dirname(os.path.abspath(__file__))
+SERVER_SCRIPT = os.path.join(TOOLS_DIR, "artifact_server.py")
+SERVER_TIMEOUT = 2.0
+
+# Modules the server runs; a server started before any of them changed is
+# told to exit and replaced
+SERVER_SOURCES = (
+    "artifact_client.py", "artifact_query.py", "artifact_server.py",
+    "artifact_store.py", "artifact_vectors.py",
+)
+
+# The plain searches the fast path answers; values must be valid for the CLI
+FAST_CHOICES = {
+    "--type": ("handoffs", "plans", "specs", "continuity", "reasoning", "all"),
+    "--outcome": ("SUCCEEDED", "PARTIAL", "FAILED"),
+}
+
+
+def server_dir() -> str:
+    """Per-user directory holding the server socket."""
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR")
+    if runtime_dir:
+        return runtime_dir
+    import tempfile  # Only without XDG_RUNTIME_DIR
+    return os.path.join(tempfile.gettempdir(), f"sdd-artifact-query-{os.getuid()}")
+
+
+def server_socket_path() -> str:
+    """Per-user socket shared by every project's queries."""
+    return os.path.join(server_dir(), "sdd-artifact-query.sock")
+
+
+def private_dir(path: str, create: bool = False) -> bool:
+    """Whether ``path`` is a directory owned by this user that nobody else
+    can enter; with ``create``, make it 0700 first if it is missing."""
+    if create:
+        try:
+            os.mkdir(path, 0o700)
+        except FileExistsError:
+            pass
+        except OSError:
+            return False
+    try:
+        stat = os.lstat(path)
+    except OSError:
+        return False
+    return (
+        (stat.st_mode & 0o170000) == 0o040000  # A directory, not a symlink
+        and stat.st_uid == os.getuid()
+        and stat.st_mode & 0o077 == 0
+    )
+
+
+def trusted_socket(path: str) -> bool:
+    """Whether ``path`` is a socket this user created, in a private directory."""
+    if not private_dir(os.path.dirname(path)):
+        return False
+    try:
+        stat = os.lstat(path)
+    except OSError:
+        return False
+    return (stat.st_mode & 0o170000) == 0o140000 and stat.st_uid == os.getuid()
+
+
+def server_version() -> str:
+    """Fingerprint of the server's code: its source files' mtimes."""
+    stamps = []
+    for name in SERVER_SOURCES:
+        try:
+            stamps.append(str(os.stat(os.path.join(TOOLS_DIR, name)).st_mtime_ns))
+        except OSError:
+            stamps.append("-")
+    return ":".join(stamps)
+
+
+def spawn_server() -> None:
+    """Start the query server in the background, detached from this process."""
+    import subprocess  # Only when no server is running
+    subprocess.Popen(
+        [sys.executable, SERVER_SCRIPT],
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def request_server(request: dict) -> dict:
+    """Send one request to the server and return its response.
+
+    Returns {} when the caller should search directly instead. If no
+    trusted server is listening one is spawned, so the next call is served
+    warm; a server running older code exits, and is replaced the same way.
+    """
+    if not hasattr(socket, "AF_UNIX") or not os.path.exists(SERVER_SCRIPT):
+        return {}
+    path = server_socket_path()
+    if not private_dir(os.path.dirname(path), create=True):
+        return {}
+    if not trusted_socket(path):
+        if not os.path.lexists(path):
+            spawn_server()
+        return {}
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(SERVER_TIMEOUT)
+    try:
+        try:
+            sock.connect(path)
+        except OSError:
+            spawn_server()
+            return {}
+        request = dict(request, version=server_version())
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        response = json.loads(sock.makefile("rb").readline())
+    except (OSError, ValueError):
+        return {}
+    finally:
+        sock.close()
+    if response.get("stale"):
+        spawn_server()
+        return {}
+    return response
+
+
+def query_server(
+    db_path: str,
+    query: str,
+    artifact_type: str = "all",
+    outcome=None,
+    limit: int = 5,
+    cache: bool = True,
+    **options
+):
+    """Run the searches on the query server; None to search directly."""
+    return request_server({
+        "db": os.path.abspath(db_path),
+        "query": query,
+        "type": artifact_type,
+        "outcome": outcome,
+        "limit": limit,
+        "cache": cache,
+        "options": options,
+    }).get("results")
+
+
+def fast_request(argv: list):
+    """The server request for a plain search, or None if ``argv`` asks for
+    anything the fast path doesn't answer."""
+    words = []
+    values = {"--type": "all", "--outcome": None, "--limit": "5", "--db": DEFAULT_DB}
+    args = iter(argv)
+    for arg in args:
+        if not arg.startswith("-"):
+            words.append(arg)
+            continue
+        name, equals, value = arg.partition("=")
+        if name not in values:
+            return None
+        if not equals:
+            value = next(args, None)
+            if value is None:
+                return None
+        if value not in FAST_CHOICES.get(name, (value,)):
+            return None
+        values[name] = value
+    if not values["--limit"].isdigit() or int(values["--limit"]) < 1:
+        return None
+    query = " ".join(words)
+    if not query.strip() or not os.path.isfile(values["--db"]):
+        return None
+    return {
+        "db": os.path.abspath(values["--db"]),
+        "query": query,
+        "type": values["--type"],
+        "outcome": values["--outcome"],
+        "limit": int(values["--limit"]),
+        "cache": True,
+        "options": {
+            "unified": False, "semantic": False, "hybrid": False,
+            "weights": {}, "highlight": False, "facets": {},
+        },
+        "format": True,
+    }
+
+
+def answer(argv: list) -> bool:
+    """Print the server's answer to a plain search; False if the full CLI
+    has to handle ``argv``."""
+    request = fast_request(argv)
+    if request is None:
+        return False
+    text = request_server(request).get("text")
+    if text is None:
+        return False
+    print(text)
+    return True
@@ -10,16 +10,42 @@ USAGE:
     uv run python tools/artifact_index.py --specs            # Index specs only
     uv run python tools/artifact_index.py --plans            # Index plans only
     uv run python tools/artifact_index.py --continuity       # Index ledgers only
+    uv run python tools/artifact_index.py --reasoning        # Index commit reasoning + attempts
+    uv run python tools/artifact_index.py --all --force      # Re-parse unchanged files too
+    uv run python tools/artifact_index.py --all --jobs 8     # Parse in 8 worker processes
+    uv run python tools/artifact_index.py --all --bulk       # Rebuild FTS once, report rows/s
+    uv run python tools/artifact_index.py --watch            # Keep the index fresh
+    uv run python tools/artifact_index.py --handoffs --watch # ...for handoffs only
+    uv run python tools/artifact_index.py --all --max-field-size 16384  # Cap huge sections
+    uv run python tools/artifact_index.py maintain           # Purge orphans, optimize, VACUUM
+
+Re-indexing is incremental: a manifest of file size, mtime and content hash
+lets unchanged files be skipped and rows for deleted files be removed.
 """
 
 import argparse
+import ctypes
+import ctypes.util
 import hashlib
 import json
+import mmap
+import os
 import re
+import select
 import sqlite3
-from datetime import datetime
+import struct
+import subprocess
+import sys
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
+from contextlib import contextmanager, nullcontext
+from dataclasses import dataclass, field
+from datetime import datetime, timezone
+from itertools import chain
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Set
+
+from artifact_vectors import embed
 
 
 def get_db_path() -> Path:
@@ -33,25 +59,357 @@ def init_db(db_path: Path) -> sqlite3.Connection:
     """Initialize the database with schema."""
     conn = sqlite3.connect(db_path)
     
-    # Read and execute schema
+    # WAL lets readers (artifact_query.py) run while we write; NORMAL sync
+    # is durable in WAL mode and avoids an fsync per transaction.
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA cache_size = -65536")  # 64 MiB
+    conn.execute("PRAGMA temp_store = MEMORY")
+    
+    existing = {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    apply_schema(conn)
+    migrate_db(conn, existing)
+    return conn
+
+
+def apply_schema(conn: sqlite3.Connection) -> None:
+    """Execute the schema file (idempotent: everything is IF NOT EXISTS)."""
     schema_path = Path(__file__).parent / "artifact_schema.sql"
     if schema_path.exists():
         schema = schema_path.read_text()
         conn.executescript(schema)
     else:
         print(f"Warning: Schema file not found at {schema_path}")
-    
-    return conn
+
+
+@contextmanager
+def deferred_fts(conn: sqlite3.Connection, tables: List[str]) -> Iterator[Set[str]]:
+    """Suspend FTS sync triggers for ``tables`` during a bulk load.
+
+    Drops the ``*_ai``/``*_ad``/``*_au`` triggers so base-table writes don't
+    each cost two FTS5 writes, then recreates the triggers from the schema.
+    The caller adds each table it wrote rows to into the yielded set; only
+    those FTS indexes are rebuilt and optimized, once each, so a bulk run
+    with nothing to load stays cheap. If the process dies mid-load, the
+    next ``init_db`` recreates the triggers; re-run with ``--bulk --force``
+    to rewrite the rows and rebuild the FTS indexes.
+    """
+    changed: Set[str] = set()
+    for table in tables:
+        for suffix in ("ai", "ad", "au"):
+            conn.execute(f"DROP TRIGGER IF EXISTS {table}_{suffix}")
+    conn.commit()
+    try:
+        yield changed
+    finally:
+        for table in tables:
+            if table not in changed:
+                continue
+            conn.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES('rebuild')")
+            conn.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES('optimize')")
+        conn.commit()
+        apply_schema(conn)
+
+
+# Columns added after the first release; CREATE TABLE IF NOT EXISTS
+# won't add them to databases created by older versions.
+MIGRATIONS = [
+    ("continuity", "file_path", "TEXT"),
+    ("manifest", "truncated", "TEXT"),
+    ("queries", "signature", "BLOB"),
+    ("queries", "search_options", "TEXT"),
+    ("queries", "generation", "TEXT"),
+    ("queries", "times_asked", "INTEGER NOT NULL DEFAULT 1"),
+    ("index_state", "saved", "INTEGER NOT NULL DEFAULT 0"),
+]
+
+
+# Tables derived from other tables by triggers; when one is new to an older
+# database, it is filled from the rows already there.
+BACKFILLS = {
+    "handoff_files": """
+        INSERT OR IGNORE INTO handoff_files (handoff_id, path)
+        SELECT h.id, f.value FROM handoffs h, json_each(h.files_modified) f
+        WHERE json_valid(h.files_modified) AND f.type = 'text'
+    """,
+}
+
+
+def migrate_db(conn: sqlite3.Connection, existing_tables: Iterable[str] = ()) -> None:
+    """Add any columns and derived rows missing from an older database.
+
+    ``existing_tables`` are the tables present before the schema was applied.
+    """
+    for table, column, column_type in MIGRATIONS:
+        existing = {row[1] for row in conn.execute(f"PRAGMA table_info({table})")}
+        if existing and column not in existing:
+            conn.execute(f"ALTER TABLE {table} ADD COLUMN {column} {column_type}")
+    existing_tables = set(existing_tables)
+    if existing_tables:
+        for table, backfill in BACKFILLS.items():
+            if table not in existing_tables:
+                conn.execute(backfill)
+    conn.commit()
+
+
+def bump_generation(conn: sqlite3.Connection) -> None:
+    """Mark the index as changed so cached query results are discarded.
+
+    Runs inside the caller's transaction; the caller commits.
+    """
+    conn.execute("UPDATE index_state SET generation = generation + 1")
 
 
 def generate_id(content: str) -> str:
-    """Generate a unique ID from content."""
+    """Generate a unique ID from content.
+
+    Artifacts are keyed on their file path, so editing a file replaces its
+    row instead of adding a new one; content changes are detected through
+    the manifest's content hash.
+    """
     return hashlib.md5(content.encode()).hexdigest()[:12]
 
 
+HEADING = re.compile(r"^(#{1,6})\s*(.*?)\s*$")
+FENCE = re.compile(r"^\s*(```|~~~)")
+CHECKBOXES = {
+    "x": re.compile(r"\[x\]\s*(.+)", re.IGNORECASE),
+    "→": re.compile(r"\[→\]\s*(.+)"),
+    " ": re.compile(r"\[ \]\s*(.+)"),
+}
+
+# Auto-handoffs embed agent output and transcripts, and pasted logs can be
+# far larger. Each extracted field is capped at this many characters (0
+# disables the cap), and files above MMAP_THRESHOLD bytes are streamed from
+# a memory map rather than read whole.
+MAX_FIELD_SIZE = 64 * 1024
+MMAP_THRESHOLD = 256 * 1024
+TRUNCATION_MARK = "\n\n[… truncated]"
+
+
+def set_field_cap(max_size: int) -> None:
+    """Set the per-field size cap; also used as a worker initializer."""
+    global MAX_FIELD_SIZE
+    MAX_FIELD_SIZE = max_size
+
+
+def normalize_heading(name: str) -> str:
+    return " ".join(name.lower().split())
+
+
+@dataclass
+class MarkdownDoc:
+    """A markdown document split into frontmatter, title and ``##`` sections.
+
+    ``truncated`` maps each capped section (or ``[x]``-style checkbox list)
+    to its full size in characters.
+    """
+    frontmatter: Dict[str, str] = field(default_factory=dict)
+    title: Optional[str] = None
+    sections: Dict[str, str] = field(default_factory=dict)
+    checkboxes: Dict[str, List[str]] = field(default_factory=dict)
+    truncated: Dict[str, int] = field(default_factory=dict)
+
+    def section(self, *names: str) -> Optional[str]:
+        """Return the body of the first section found under any of ``names``.
+
+        Lookup is case-insensitive; aliases are tried in the order given.
+        """
+        for name in names:
+            body = self.sections.get(normalize_heading(name))
+            if body is not None:
+                return body
+        return None
+
+    def fields(self, aliases: Dict[str, tuple]) -> Dict[str, Optional[str]]:
+        """Resolve ``{field: (section aliases...)}`` to section bodies."""
+        return {name: self.section(*names) for name, names in aliases.items()}
+
+    def truncated_fields(self, aliases: Dict[str, tuple]) -> Dict[str, int]:
+        """Full sizes of the fields in ``aliases`` whose sections were capped."""
+        sizes = {}
+        for name, names in aliases.items():
+            for alias in names:
+                key = normalize_heading(alias)
+                if key in self.sections:
+                    if key in self.truncated:
+                        sizes[name] = self.truncated[key]
+                    break
+        return sizes
+
+
+def tokenize(
+    lines: Iterable[str],
+    wanted: Optional[Iterable[str]] = None,
+    max_field: int = 0,
+    checkboxes: bool = False
+) -> MarkdownDoc:
+    """Tokenize a document in a single linear pass over its lines.
+
+    A ``##`` heading opens a section that runs until the next heading of
+    level 1 or 2, so ``###`` subsections stay in their parent's body.
+    Headings inside fenced code blocks are ignored. If a section name
+    repeats, the first occurrence wins.
+
+    Only sections named in ``wanted`` (all when None) are kept, and each
+    keeps at most ``max_field`` characters, so memory is bounded by what
+    the caller asked for rather than by the size of the file. With
+    ``checkboxes``, ``[x]``/``[→]``/``[ ]`` items are collected as well.
+    """
+    doc = MarkdownDoc()
+    lines = iter(lines)
+    wanted = {normalize_heading(name) for name in wanted} if wanted is not None else None
+    limit = max_field or float("inf")
+
+    first = next(lines, None)
+    if first is None:
+        return doc
+    body: Iterable[str] = chain([first], lines)
+    if first.strip() == "---":
+        header: List[str] = []
+        size = 0
+        for line in lines:
+            if line.strip() == "---":
+                for entry in header:
+                    if ":" in entry:
+                        key, value = entry.split(":", 1)
+                        doc.frontmatter[key.strip()] = value.strip()
+                body = lines
+                break
+            header.append(line)
+            size += len(line) + 1
+            if size > limit:
+                break  # Too long to be frontmatter; treat it as body text
+        if body is not lines:
+            body = chain([first], header, lines)
+
+    bodies: Dict[str, List[str]] = {}
+    sizes: Dict[str, int] = {}
+    current: Optional[str] = None
+    in_fence = False
+    if checkboxes:
+        doc.checkboxes = {mark: [] for mark in CHECKBOXES}
+        checkbox_sizes = dict.fromkeys(CHECKBOXES, 0)
+    for line in body:
+        if checkboxes and "[" in line:
+            for mark, pattern in CHECKBOXES.items():
+                for item in pattern.findall(line):
+                    checkbox_sizes[mark] += len(item)
+                    if checkbox_sizes[mark] <= limit:
+                        doc.checkboxes[mark].append(item)
+        if FENCE.match(line):
+            in_fence = not in_fence
+        elif not in_fence and line.startswith("#"):
+            match = HEADING.match(line)
+            level = len(match.group(1))
+            if level <= 2:
+                current = None
+                if level == 1:
+                    if doc.title is None:
+                        doc.title = match.group(2)
+                else:
+                    key = normalize_heading(match.group(2))
+                    if key not in bodies and (wanted is None or key in wanted):
+                        current = key
+                        bodies[key] = []
+                        sizes[key] = 0
+                continue
+        if current is not None:
+            sizes[current] += len(line) + 1
+            if sizes[current] <= limit:
+                bodies[current].append(line)
+
+    for key, lines_kept in bodies.items():
+        text = "\n".join(lines_kept).strip()
+        if sizes[key] > limit:
+            doc.truncated[key] = sizes[key]
+            text += TRUNCATION_MARK
+        doc.sections[key] = text
+    if checkboxes:
+        for mark, size in checkbox_sizes.items():
+            if size > limit:
+                doc.truncated[f"[{mark}]"] = size
+    return doc
+
+
+def parse_markdown(content: str) -> MarkdownDoc:
+    """Tokenize an in-memory document; see ``tokenize``."""
+    return tokenize(content.split("\n"))
+
+
+def iter_lines(file_path: Path) -> Iterator[str]:
+    """Yield a file's lines without their newlines.
+
+    Small files are read whole; larger ones are memory-mapped and decoded a
+    line at a time, so only the current line is ever held as a string.
+    Pages already consumed are handed back to the kernel as the scan moves
+    on, keeping resident memory flat.
+    """
+    if file_path.stat().st_size < MMAP_THRESHOLD:
+        yield from file_path.read_text().split("\n")
+        return
+    release = hasattr(mmap, "MADV_DONTNEED")
+    with open(file_path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+        released = 0
+        for raw in iter(mapped.readline, b""):
+            line = raw.decode("utf-8", errors="replace")
+            yield line[:-1] if line.endswith("\n") else line
+            position = mapped.tell()
+            if release and position - released >= MMAP_THRESHOLD:
+                end = position - position % mmap.PAGESIZE
+                mapped.madvise(mmap.MADV_DONTNEED, released, end - released)
+                released = end
+
+
+def load_markdown(
+    file_path: Path,
+    aliases: Optional[Dict[str, tuple]] = None,
+    checkboxes: bool = False
+) -> MarkdownDoc:
+    """Stream a markdown file, keeping only the sections named in ``aliases``.
+
+    Fields are capped at ``MAX_FIELD_SIZE`` characters.
+    """
+    wanted = [name for names in aliases.values() for name in names] if aliases else None
+    return tokenize(iter_lines(file_path), wanted, MAX_FIELD_SIZE, checkboxes)
+
+
+HANDOFF_SECTIONS = {
+    "task_summary": ("Summary", "Task Summary", "Overview"),
+    "what_worked": ("What Worked", "Successes", "Worked"),
+    "what_failed": ("What Failed", "Failures", "Issues", "Problems"),
+    "key_decisions": ("Key Decisions", "Decisions"),
+    "files_modified": ("Files Modified", "Modified Files", "Changes"),
+}
+
+
+def normalize_file_path(path: str) -> str:
+    """Canonical form of a path listed in a handoff (no ./, no :line suffix)."""
+    path = re.sub(r":\d+(?:-\d+)?$", "", path.strip())
+    return os.path.normpath(path) if path else path
+
+
+def artifact_timestamp(value: Optional[str], file_path: Path) -> str:
+    """When an artifact was written, as UTC 'YYYY-MM-DD HH:MM:SS'.
+
+    Taken from an ISO frontmatter value when it parses, else the file's
+    mtime, so re-indexing doesn't move an artifact's date.
+    """
+    try:
+        when = datetime.fromisoformat(value) if value else None
+    except ValueError:
+        when = None
+    if when is None:
+        when = datetime.fromtimestamp(file_path.stat().st_mtime, timezone.utc)
+    elif when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    return when.strftime("%Y-%m-%d %H:%M:%S")
+
+
 def parse_handoff(file_path: Path) -> Optional[Dict[str, Any]]:
     """Parse a handoff markdown file."""
-    content = file_path.read_text()
+    doc = load_markdown(file_path, HANDOFF_SECTIONS)
+    sections = doc.fields(HANDOFF_SECTIONS)
     
     # Extract session name from path: thoughts/shared/handoffs/{session}/...
     parts = file_path.parts
@@ -61,16 +419,7 @@ def parse_handoff(file_path: Path) -> Optional[Dict[str, Any]]:
         if idx + 1 < len(parts):
             session_name = parts[idx + 1]
     
-    # Parse frontmatter if present
-    frontmatter = {}
-    if content.startswith("---"):
-        end = content.find("---", 3)
-        if end != -1:
-            fm_content = content[3:end].strip()
-            for line in fm_content.split("\n"):
-                if ":" in line:
-                    key, value = line.split(":", 1)
-                    frontmatter[key.strip()] = value.strip()
+    frontmatter = doc.frontmatter
     
     # Extract task number from filename or frontmatter
     task_number = frontmatter.get("task_number")
@@ -79,22 +428,13 @@ def parse_handoff(file_path: Path) -> Optional[Dict[str, Any]]:
         if match:
             task_number = int(match.group(1))
     
-    # Extract sections
-    def extract_section(header: str) -> Optional[str]:
-        pattern = rf"##\s*{header}\s*\n(.*?)(?=\n##|\Z)"
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        return match.group(1).strip() if match else None
-    
-    task_summary = extract_section("Summary|Task Summary|Overview")
-    what_worked = extract_section("What Worked|Successes|Worked")
-    what_failed = extract_section("What Failed|Failures|Issues|Problems")
-    key_decisions = extract_section("Key Decisions|Decisions")
-    
     # Extract files modified
     files_modified = []
-    files_section = extract_section("Files Modified|Modified Files|Changes")
-    if files_section:
-        files_modified = re.findall(r"`([^`]+)`", files_section)
+    if sections["files_modified"]:
+        files_modified = [
+            normalize_file_path(path)
+            for path in re.findall(r"`([^`]+)`", sections["files_modified"])
+        ]
     
     # Determine outcome
     outcome = frontmatter.get("outcome", "UNKNOWN").upper()
@@ -102,16 +442,20 @@ def parse_handoff(file_path: Path) -> Optional[Dict[str, Any]]:
         outcome = "UNKNOWN"
     
     return {
-        "id": generate_id(str(file_path) + content[:100]),
+        "id": generate_id(str(file_path)),
         "session_name": session_name,
         "task_number": task_number,
         "file_path": str(file_path),
-        "task_summary": task_summary,
-        "what_worked": what_worked,
-        "what_failed": what_failed,
-        "key_decisions": key_decisions,
+        "task_summary": sections["task_summary"],
+        "what_worked": sections["what_worked"],
+        "what_failed": sections["what_failed"],
+        "key_decisions": sections["key_decisions"],
         "files_modified": json.dumps(files_modified),
         "outcome": outcome,
+        "created_at": artifact_timestamp(
+            frontmatter.get("created") or frontmatter.get("date"), file_path
+        ),
+        "truncated": doc.truncated_fields(HANDOFF_SECTIONS),
     }
 
 
@@ -136,22 +480,14 @@ def parse_plan(file_path: Path) -> Optional[Dict[str, Any]]:
             pass
     
     # Parse markdown
-    title = file_path.stem
-    title_match = re.search(r"^#\s+(.+)$", content, re.MULTILINE)
-    if title_match:
-        title = title_match.group(1)
-    
-    def extract_section(header: str) -> Optional[str]:
-        pattern = rf"##\s*{header}\s*\n(.*?)(?=\n##|\Z)"
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        return match.group(1).strip() if match else None
+    doc = parse_markdown(content)
     
     return {
         "id": generate_id(str(file_path)),
-        "title": title,
+        "title": doc.title or file_path.stem,
         "file_path": str(file_path),
-        "overview": extract_section("Overview|Summary|Description"),
-        "approach": extract_section("Approach|Strategy|Method"),
+        "overview": doc.section("Overview", "Summary", "Description"),
+        "approach": doc.section("Approach", "Strategy", "Method"),
         "phases": json.dumps([]),  # Could parse phases if needed
         "constraints": json.dumps([]),
     }
@@ -160,6 +496,7 @@ def parse_plan(file_path: Path) -> Optional[Dict[str, Any]]:
 def parse_spec(file_path: Path) -> Optional[Dict[str, Any]]:
     """Parse a spec markdown file."""
     content = file_path.read_text()
+    doc = parse_markdown(content)
     
     # Extract SPEC ID from filename or content
     spec_id = None
@@ -182,14 +519,8 @@ def parse_spec(file_path: Path) -> Optional[Dict[str, Any]]:
     
     # Extract title
     title = file_path.stem
-    title_match = re.search(r"^#\s+(?:SPEC-\d+[:\s]*)?\s*(.+)$", content, re.MULTILINE)
-    if title_match:
-        title = title_match.group(1).strip()
-    
-    def extract_section(header: str) -> Optional[str]:
-        pattern = rf"##\s*{header}\s*\n(.*?)(?=\n##|\Z)"
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        return match.group(1).strip() if match else None
+    if doc.title:
+        title = re.sub(r"^SPEC-\d+[:\s]*", "", doc.title).strip() or title
     
     # Extract expected behaviors (WHEN/THEN patterns)
     behaviors = re.findall(
@@ -209,7 +540,7 @@ def parse_spec(file_path: Path) -> Optional[Dict[str, Any]]:
         "req_id": req_id,
         "title": title,
         "file_path": str(file_path),
-        "behavior_summary": extract_section("Behavioral Specification|Behavior|Summary"),
+        "behavior_summary": doc.section("Behavioral Specification", "Behavior", "Summary"),
         "expected_behaviors": json.dumps(behaviors),
         "eval_criteria": json.dumps([]),
         "has_eval": has_eval,
@@ -217,9 +548,18 @@ def parse_spec(file_path: Path) -> Optional[Dict[str, Any]]:
     }
 
 
+CONTINUITY_SECTIONS = {
+    "goal": ("Goal", "Objective", "Purpose"),
+    "key_learnings": ("Key Learnings", "Learnings", "Insights"),
+    "key_decisions": ("Key Decisions", "Decisions"),
+}
+CONTINUITY_CHECKBOXES = {"state_done": "x", "state_now": "→", "state_next": " "}
+
+
 def parse_continuity(file_path: Path) -> Optional[Dict[str, Any]]:
     """Parse a continuity ledger file."""
-    content = file_path.read_text()
+    doc = load_markdown(file_path, CONTINUITY_SECTIONS, checkboxes=True)
+    sections = doc.fields(CONTINUITY_SECTIONS)
     
     # Extract session name from filename
     session_name = "unknown"
@@ -227,180 +567,862 @@ def parse_continuity(file_path: Path) -> Optional[Dict[str, Any]]:
     if match:
         session_name = match.group(1)
     
-    def extract_section(header: str) -> Optional[str]:
-        pattern = rf"##\s*{header}\s*\n(.*?)(?=\n##|\Z)"
-        match = re.search(pattern, content, re.DOTALL | re.IGNORECASE)
-        return match.group(1).strip() if match else None
+    # Checkboxes become done/now/next
+    done_items = doc.checkboxes["x"]
+    current_items = doc.checkboxes["→"]
+    next_items = doc.checkboxes[" "]
     
-    # Extract checkboxes as done/now/next
-    done_items = re.findall(r"\[x\]\s*(.+)", content, re.IGNORECASE)
-    current_items = re.findall(r"\[→\]\s*(.+)", content)
-    next_items = re.findall(r"\[ \]\s*(.+)", content)
+    truncated = doc.truncated_fields(CONTINUITY_SECTIONS)
+    for name, mark in CONTINUITY_CHECKBOXES.items():
+        if f"[{mark}]" in doc.truncated:
+            truncated[name] = doc.truncated[f"[{mark}]"]
     
     return {
-        "id": generate_id(str(file_path) + content[:100]),
+        "id": generate_id(str(file_path)),
         "session_name": session_name,
-        "goal": extract_section("Goal|Objective|Purpose"),
+        "file_path": str(file_path),
+        "goal": sections["goal"],
         "state_done": json.dumps(done_items),
         "state_now": "; ".join(current_items) if current_items else None,
         "state_next": json.dumps(next_items),
-        "key_learnings": extract_section("Key Learnings|Learnings|Insights"),
-        "key_decisions": extract_section("Key Decisions|Decisions"),
+        "key_learnings": sections["key_learnings"],
+        "key_decisions": sections["key_decisions"],
         "snapshot_reason": "manual",
+        "truncated": truncated,
     }
 
 
-def index_handoffs(conn: sqlite3.Connection) -> int:
-    """Index all handoff files."""
-    count = 0
-    handoff_dirs = [
-        Path("thoughts/shared/handoffs"),
-        Path("thoughts/handoffs"),
-    ]
+def parse_reasoning(file_path: Path) -> Optional[Dict[str, Any]]:
+    """Parse a commit reasoning file written by generate-reasoning.sh.
+
+    Commit subject, author and date are filled in afterwards for the whole
+    batch by ``enrich_reasoning``.
+    """
+    content = file_path.read_text()
+    doc = parse_markdown(content)
     
-    for handoff_dir in handoff_dirs:
-        if not handoff_dir.exists():
-            continue
-        
-        for file_path in handoff_dir.rglob("*.md"):
-            try:
-                data = parse_handoff(file_path)
-                if data:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO handoffs 
-                        (id, session_name, task_number, file_path, task_summary, 
-                         what_worked, what_failed, key_decisions, files_modified, outcome)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        data["id"], data["session_name"], data["task_number"],
-                        data["file_path"], data["task_summary"], data["what_worked"],
-                        data["what_failed"], data["key_decisions"], data["files_modified"],
-                        data["outcome"]
-                    ))
-                    count += 1
-            except Exception as e:
-                print(f"Error indexing {file_path}: {e}")
+    failed_attempts = 0
+    match = re.search(r"after \*\*(\d+) failed attempt", content)
+    if match:
+        failed_attempts = int(match.group(1))
+    else:
+        failures = re.search(r"^### Failed attempts\n((?:- .*\n?)*)", content, re.MULTILINE)
+        if failures:
+            failed_attempts = failures.group(1).count("\n- ") + 1
     
-    conn.commit()
-    return count
+    outcome = "UNKNOWN"
+    if "### Failed attempts" in content:
+        outcome = "AFTER_FAILURES"
+    elif "passed on first try" in content:
+        outcome = "FIRST_TRY"
+    
+    return {
+        "id": generate_id(str(file_path)),
+        "commit_hash": file_path.parent.name,
+        "file_path": str(file_path),
+        "branch": doc.section("Branch"),
+        "subject": doc.section("What was committed"),
+        "author": None,
+        "committed_at": None,
+        "content": content,
+        "failed_attempts": failed_attempts,
+        "outcome": outcome,
+    }
 
 
-def index_plans(conn: sqlite3.Connection) -> int:
-    """Index all plan files."""
-    count = 0
-    plan_dirs = [
-        Path("thoughts/shared/plans"),
-        Path("thoughts/plans"),
-        Path("docs/design"),
-    ]
-    
-    for plan_dir in plan_dirs:
-        if not plan_dir.exists():
+def commit_metadata(hashes: List[str]) -> Dict[str, Dict[str, str]]:
+    """Fetch subject, author and date for many commits in one git call.
+
+    Unknown hashes are skipped; abbreviated hashes are matched by prefix.
+    """
+    if not hashes:
+        return {}
+    try:
+        output = subprocess.run(
+            ["git", "log", "--no-walk=unsorted", "--ignore-missing", "--stdin",
+             "--format=%H%x1f%s%x1f%an%x1f%cI"],
+            input="\n".join(hashes), capture_output=True, text=True, check=True
+        ).stdout
+    except (OSError, subprocess.CalledProcessError):
+        return {}
+
+    by_full_hash = {}
+    for line in output.splitlines():
+        full_hash, subject, author, date = line.split("\x1f")
+        by_full_hash[full_hash] = {"subject": subject, "author": author, "committed_at": date}
+
+    metadata = {}
+    for commit_hash in hashes:
+        for full_hash, meta in by_full_hash.items():
+            if full_hash.startswith(commit_hash):
+                metadata[commit_hash] = meta
+                break
+    return metadata
+
+
+def enrich_reasoning(records: List[Dict[str, Any]]) -> None:
+    """Fill in commit metadata for a batch of parsed reasoning files."""
+    metadata = commit_metadata([r["commit_hash"] for r in records])
+    for record in records:
+        record.update(metadata.get(record["commit_hash"], {}))
+
+
+def parse_attempts(file_path: Path) -> List[Dict[str, Any]]:
+    """Parse a branch attempts.jsonl log into one record per attempt."""
+    branch = file_path.parent.name
+    records = []
+    for line_number, line in enumerate(file_path.read_text().splitlines(), 1):
+        if not line.strip():
             continue
-        
-        for file_path in plan_dir.rglob("*.md"):
-            try:
-                data = parse_plan(file_path)
-                if data:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO plans
-                        (id, title, file_path, overview, approach, phases, constraints)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        data["id"], data["title"], data["file_path"],
-                        data["overview"], data["approach"], data["phases"],
-                        data["constraints"]
-                    ))
-                    count += 1
-            except Exception as e:
-                print(f"Error indexing {file_path}: {e}")
-        
-        # Also check JSON files
-        for file_path in plan_dir.rglob("*.json"):
+        try:
+            entry = json.loads(line)
+        except json.JSONDecodeError:
+            continue
+        records.append({
+            "id": generate_id(f"{file_path}:{line_number}"),
+            "branch": branch,
+            "file_path": str(file_path),
+            "line_number": line_number,
+            "attempt_type": entry.get("type"),
+            "build_type": entry.get("build_type"),
+            "command": entry.get("command"),
+            "error": entry.get("error") or None,
+            "timestamp": entry.get("timestamp"),
+        })
+    return records
+
+
+# Artifact types and how they map onto tables. A parser returns one row
+# (dict) per file, or a list of rows for files holding many records
+# ("multi_row"); an optional "enrich" hook post-processes a parsed batch.
+# A row's "truncated" key (field -> full size) is kept in the manifest, and
+# its "embed" fields make up the text of its semantic search vector.
+ARTIFACT_TYPES: Dict[str, Dict[str, Any]] = {
+    "handoffs": {
+        "table": "handoffs",
+        "parse": parse_handoff,
+        "embed": ("task_summary", "what_worked", "what_failed", "key_decisions"),
+        "columns": (
+            "id", "session_name", "task_number", "file_path", "task_summary",
+            "what_worked", "what_failed", "key_decisions", "files_modified",
+            "outcome", "created_at",
+        ),
+    },
+    "plans": {
+        "table": "plans",
+        "parse": parse_plan,
+        "embed": ("title", "overview", "approach"),
+        "columns": (
+            "id", "title", "file_path", "overview", "approach", "phases",
+            "constraints",
+        ),
+    },
+    "specs": {
+        "table": "specs",
+        "parse": parse_spec,
+        "embed": ("title", "behavior_summary", "expected_behaviors"),
+        "columns": (
+            "id", "spec_id", "req_id", "title", "file_path", "behavior_summary",
+            "expected_behaviors", "eval_criteria", "has_eval", "eval_path",
+        ),
+    },
+    "continuity": {
+        "table": "continuity",
+        "parse": parse_continuity,
+        "embed": ("goal", "key_learnings", "key_decisions", "state_now"),
+        "columns": (
+            "id", "session_name", "file_path", "goal", "state_done",
+            "state_now", "state_next", "key_learnings", "key_decisions",
+            "snapshot_reason",
+        ),
+    },
+    "reasoning": {
+        "table": "reasoning",
+        "parse": parse_reasoning,
+        "enrich": enrich_reasoning,
+        "embed": ("subject", "content"),
+        "columns": (
+            "id", "commit_hash", "file_path", "branch", "subject", "author",
+            "committed_at", "content", "failed_attempts", "outcome",
+        ),
+    },
+    "attempts": {
+        "table": "attempts",
+        "parse": parse_attempts,
+        "multi_row": True,
+        "embed": ("command", "error"),
+        "columns": (
+            "id", "branch", "file_path", "line_number", "attempt_type",
+            "build_type", "command", "error", "timestamp",
+        ),
+    },
+}
+
+
+HANDOFF_DIRS = [Path("thoughts/shared/handoffs"), Path("thoughts/handoffs")]
+PLAN_DIRS = [Path("thoughts/shared/plans"), Path("thoughts/plans"), Path("docs/design")]
+SPEC_DIRS = [Path("specs")]
+LEDGER_DIRS = [Path("thoughts/ledgers"), Path(".")]
+GIT_CLAUDE_DIR = Path(".git/claude")
+
+
+def discover_handoffs() -> List[Path]:
+    """Find all handoff files."""
+    files = []
+    for handoff_dir in HANDOFF_DIRS:
+        if handoff_dir.exists():
+            files.extend(handoff_dir.rglob("*.md"))
+    return files
+
+
+def discover_plans() -> List[Path]:
+    """Find all plan files (markdown and JSON)."""
+    files = []
+    for plan_dir in PLAN_DIRS:
+        if plan_dir.exists():
+            files.extend(plan_dir.rglob("*.md"))
+            files.extend(plan_dir.rglob("*.json"))
+    return files
+
+
+def discover_specs() -> List[Path]:
+    """Find all spec files."""
+    files = []
+    for specs_dir in SPEC_DIRS:
+        if specs_dir.exists():
+            files.extend(specs_dir.rglob("*.md"))
+    return files
+
+
+def discover_continuity() -> List[Path]:
+    """Find all continuity ledger files."""
+    files = []
+    for ledger_dir in LEDGER_DIRS:
+        if ledger_dir.exists():
+            files.extend(ledger_dir.glob("CONTINUITY_*.md"))
+    return files
+
+
+def discover_reasoning() -> List[Path]:
+    """Find all commit reasoning files."""
+    return list((GIT_CLAUDE_DIR / "commits").glob("*/reasoning.md"))
+
+
+def discover_attempts() -> List[Path]:
+    """Find all per-branch attempt logs."""
+    return list((GIT_CLAUDE_DIR / "branches").glob("*/attempts.jsonl"))
+
+
+def classify_path(path: Path) -> Optional[str]:
+    """Return the artifact type the discover_* functions would file a path under."""
+    if path.name.startswith("CONTINUITY_") and path.suffix == ".md":
+        if path.parent in LEDGER_DIRS:
+            return "continuity"
+
+    if path.name == "reasoning.md" and path.parent.parent == GIT_CLAUDE_DIR / "commits":
+        return "reasoning"
+    if path.name == "attempts.jsonl" and path.parent.parent == GIT_CLAUDE_DIR / "branches":
+        return "attempts"
+
+    def under(dirs: List[Path]) -> bool:
+        return any(d in path.parents for d in dirs)
+
+    if path.suffix == ".md" and under(HANDOFF_DIRS):
+        return "handoffs"
+    if path.suffix in (".md", ".json") and under(PLAN_DIRS):
+        return "plans"
+    if path.suffix == ".md" and under(SPEC_DIRS):
+        return "specs"
+    return None
+
+
+def hash_file(file_path: Path) -> str:
+    """Hash file contents for change detection, one chunk at a time."""
+    digest = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def scan_file(
+    artifact_type: str,
+    path: str,
+    previous_hash: Optional[str],
+    force: bool = False
+) -> Dict[str, Any]:
+    """Hash and (if changed) parse one file.
+
+    Pure with respect to the database so it can run in a worker process.
+    Returns the file's fingerprint plus either parsed row data, an error,
+    or ``changed=False`` when the content hash matches the manifest. A
+    changed file that parses to nothing has ``changed=True`` and empty data.
+    """
+    file_path = Path(path)
+    result: Dict[str, Any] = {"path": path, "data": None, "error": None, "changed": False}
+    try:
+        stat = file_path.stat()
+        result["size"] = stat.st_size
+        result["mtime_ns"] = stat.st_mtime_ns
+        result["content_hash"] = hash_file(file_path)
+        if force or result["content_hash"] != previous_hash:
+            result["changed"] = True
+            result["data"] = ARTIFACT_TYPES[artifact_type]["parse"](file_path)
+    except Exception as e:
+        result["error"] = str(e)
+    return result
+
+
+def embed_record(spec: Dict[str, Any], record: Dict[str, Any]) -> bytes:
+    """Semantic search vector for a parsed row, from its "embed" fields."""
+    return embed("\n".join(str(record.get(f) or "") for f in spec["embed"]))
+
+
+def index_files(
+    conn: sqlite3.Connection,
+    artifact_type: str,
+    files: List[Path],
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1,
+    scope: Optional[List[str]] = None
+) -> Dict[str, int]:
+    """Incrementally index files of one artifact type against the manifest.
+
+    Files whose size and mtime match the manifest are skipped without being
+    read. The rest are hashed and, if their content changed, re-parsed —
+    fanned out to ``executor`` when one is given. A single writer then
+    applies all changes with ``executemany`` in one transaction: rows for
+    changed and deleted files are removed (FTS entries follow via the
+    delete triggers) before the new rows and manifest entries go in.
+
+    ``scope`` restricts removal to the given paths, so a caller can index a
+    handful of touched files without treating every other file as deleted.
+    """
+    spec = ARTIFACT_TYPES[artifact_type]
+    table = spec["table"]
+    columns = spec["columns"]
+    insert_sql = (
+        f"INSERT OR REPLACE INTO {table} ({', '.join(columns)}) "
+        f"VALUES ({', '.join('?' for _ in columns)})"
+    )
+
+    stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+    known = {
+        row[0]: row[1:]
+        for row in conn.execute(
+            "SELECT path, size, mtime_ns, content_hash FROM manifest "
+            "WHERE artifact_type = ?",
+            (artifact_type,)
+        )
+    }
+    if scope is not None:
+        known = {path: known[path] for path in scope if path in known}
+    seen = set()
+    pending = []
+
+    for file_path in files:
+        path = str(file_path)
+        seen.add(path)
+        previous = known.get(path)
+        if not force and previous:
             try:
-                data = parse_plan(file_path)
-                if data:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO plans
-                        (id, title, file_path, overview, approach, phases, constraints)
-                        VALUES (?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        data["id"], data["title"], data["file_path"],
-                        data["overview"], data["approach"], data["phases"],
-                        data["constraints"]
-                    ))
-                    count += 1
-            except Exception as e:
-                print(f"Error indexing {file_path}: {e}")
-    
+                stat = file_path.stat()
+            except OSError:
+                continue
+            if previous[:2] == (stat.st_size, stat.st_mtime_ns):
+                stats["unchanged"] += 1
+                continue
+        pending.append(path)
+
+    # Parse phase
+    args = [
+        (artifact_type, path, known[path][2] if path in known else None, force)
+        for path in pending
+    ]
+    if executor is not None and len(args) > 1:
+        chunksize = max(1, len(args) // (jobs * 4))
+        scanned = executor.map(scan_file, *zip(*args), chunksize=chunksize)
+    else:
+        scanned = (scan_file(*a) for a in args)
+
+    touched = []
+    replaced = []
+    records = []
+    entries = []
+    for result in scanned:
+        path = result["path"]
+        if result["error"]:
+            print(f"Error indexing {path}: {result['error']}")
+            continue
+        fingerprint = (result["size"], result["mtime_ns"])
+        if not result["changed"]:
+            if path in known:
+                # Touched but not modified: refresh the fingerprint only
+                touched.append(fingerprint + (path,))
+                stats["unchanged"] += 1
+            continue
+        replaced.append((path,))
+        if not result["data"]:
+            # Changed and now parses to nothing: drop its old rows, and
+            # record the content so it is only re-parsed once it changes
+            entries.append((path, artifact_type) + fingerprint + (result["content_hash"], None))
+            stats["removed"] += path in known
+            continue
+        if spec.get("multi_row"):
+            records.extend(result["data"])
+        else:
+            records.append(result["data"])
+        truncated = None if spec.get("multi_row") else result["data"].get("truncated")
+        entries.append((path, artifact_type) + fingerprint + (
+            result["content_hash"], json.dumps(truncated) if truncated else None
+        ))
+        stats["updated" if path in known else "added"] += 1
+
+    removed = [(path,) for path in set(known) - seen]
+    stats["removed"] += len(removed)
+
+    if spec.get("enrich") and records:
+        spec["enrich"](records)
+    rows = [[record[c] for c in columns] for record in records]
+    vectors = [
+        (artifact_type, record["id"], embed_record(spec, record))
+        for record in records
+    ]
+
+    # Write phase: single writer, one transaction
+    conn.executemany(
+        "UPDATE manifest SET size = ?, mtime_ns = ? WHERE path = ?", touched
+    )
+    conn.executemany(f"""
+        DELETE FROM vectors WHERE artifact_type = '{artifact_type}'
+        AND id IN (SELECT id FROM {table} WHERE file_path = ?)
+    """, replaced + removed)
+    conn.executemany(f"DELETE FROM {table} WHERE file_path = ?", replaced + removed)
+    conn.executemany(insert_sql, rows)
+    conn.executemany(
+        "INSERT OR REPLACE INTO vectors (artifact_type, id, vector) VALUES (?, ?, ?)",
+        vectors
+    )
+    conn.executemany("""
+        INSERT OR REPLACE INTO manifest
+        (path, artifact_type, size, mtime_ns, content_hash, truncated)
+        VALUES (?, ?, ?, ?, ?, ?)
+    """, entries)
+    conn.executemany("DELETE FROM manifest WHERE path = ?", removed)
+    if replaced or removed:
+        bump_generation(conn)
     conn.commit()
-    return count
+    return stats
 
 
-def index_specs(conn: sqlite3.Connection) -> int:
+def index_handoffs(
+    conn: sqlite3.Connection,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1
+) -> Dict[str, int]:
+    """Index all handoff files."""
+    return index_files(conn, "handoffs", discover_handoffs(), force, executor, jobs)
+
+
+def index_plans(
+    conn: sqlite3.Connection,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1
+) -> Dict[str, int]:
+    """Index all plan files."""
+    return index_files(conn, "plans", discover_plans(), force, executor, jobs)
+
+
+def index_specs(
+    conn: sqlite3.Connection,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1
+) -> Dict[str, int]:
     """Index all spec files."""
-    count = 0
-    specs_dir = Path("specs")
-    
-    if not specs_dir.exists():
-        return 0
-    
-    for file_path in specs_dir.rglob("*.md"):
-        try:
-            data = parse_spec(file_path)
-            if data:
-                conn.execute("""
-                    INSERT OR REPLACE INTO specs
-                    (id, spec_id, req_id, title, file_path, behavior_summary,
-                     expected_behaviors, eval_criteria, has_eval, eval_path)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    data["id"], data["spec_id"], data["req_id"], data["title"],
-                    data["file_path"], data["behavior_summary"],
-                    data["expected_behaviors"], data["eval_criteria"],
-                    data["has_eval"], data["eval_path"]
-                ))
-                count += 1
-        except Exception as e:
-            print(f"Error indexing {file_path}: {e}")
-    
-    conn.commit()
-    return count
+    return index_files(conn, "specs", discover_specs(), force, executor, jobs)
 
 
-def index_continuity(conn: sqlite3.Connection) -> int:
+def index_continuity(
+    conn: sqlite3.Connection,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1
+) -> Dict[str, int]:
     """Index all continuity ledger files."""
-    count = 0
-    ledger_dirs = [
-        Path("thoughts/ledgers"),
-        Path("."),
-    ]
-    
-    for ledger_dir in ledger_dirs:
-        if not ledger_dir.exists():
-            continue
-        
-        for file_path in ledger_dir.glob("CONTINUITY_*.md"):
+    return index_files(conn, "continuity", discover_continuity(), force, executor, jobs)
+
+
+def index_reasoning(
+    conn: sqlite3.Connection,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1
+) -> Dict[str, int]:
+    """Index all commit reasoning files."""
+    return index_files(conn, "reasoning", discover_reasoning(), force, executor, jobs)
+
+
+def index_attempts(
+    conn: sqlite3.Connection,
+    force: bool = False,
+    executor: Optional[Executor] = None,
+    jobs: int = 1
+) -> Dict[str, int]:
+    """Index all build/test attempt logs."""
+    return index_files(conn, "attempts", discover_attempts(), force, executor, jobs)
+
+
+# (artifact type, display label, indexer, CLI flag selecting it)
+INDEXERS = [
+    ("handoffs", "Handoffs", index_handoffs, "handoffs"),
+    ("plans", "Plans", index_plans, "plans"),
+    ("specs", "Specs", index_specs, "specs"),
+    ("continuity", "Continuity", index_continuity, "continuity"),
+    ("reasoning", "Reasoning", index_reasoning, "reasoning"),
+    ("attempts", "Attempts", index_attempts, "reasoning"),
+]
+
+
+def format_stats(stats: Dict[str, int]) -> str:
+    """Format an index run's change counts for display."""
+    return (
+        f"{stats['added']} added, {stats['updated']} updated, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed"
+    )
+
+
+def format_rate(rows: int, seconds: float) -> str:
+    """Format ingest throughput for display."""
+    rate = rows / seconds if seconds > 0 else 0.0
+    return f"{rate:,.0f} rows/s"
+
+
+def index_paths(
+    conn: sqlite3.Connection,
+    paths: List[str],
+    types: Optional[Set[str]] = None
+) -> Dict[str, Dict[str, int]]:
+    """Index only the given paths, removing rows for those that no longer exist.
+
+    Paths that don't belong to any artifact type, or to one outside
+    ``types`` (default: every type), are ignored.
+    """
+    by_type: Dict[str, List[str]] = {}
+    for path in paths:
+        artifact_type = classify_path(Path(os.path.relpath(path)))
+        if artifact_type and (types is None or artifact_type in types):
+            by_type.setdefault(artifact_type, []).append(os.path.relpath(path))
+
+    results = {}
+    for artifact_type, scope in by_type.items():
+        files = [Path(p) for p in scope if Path(p).is_file()]
+        results[artifact_type] = index_files(conn, artifact_type, files, scope=scope)
+    return results
+
+
+# Directories watched recursively, plus the project root (non-recursively)
+# for root-level CONTINUITY_*.md ledgers and for the roots being created.
+WATCH_ROOTS = [Path("thoughts"), Path("specs"), Path("docs/design"), GIT_CLAUDE_DIR]
+
+RESCAN = "*"  # Returned by a watcher when it lost events and can't say what changed
+
+
+class PollingWatcher:
+    """Detect changes by diffing periodic stat snapshots of the watch roots."""
+
+    name = "polling"
+
+    def __init__(self, interval: float = 2.0):
+        self.interval = interval
+        self.snapshot = self._scan()
+
+    def _scan(self) -> Dict[str, tuple]:
+        state = {}
+        for root in WATCH_ROOTS + [Path(".")]:
+            stack = [str(root)]
+            while stack:
+                try:
+                    entries = list(os.scandir(stack.pop()))
+                except OSError:
+                    continue
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if root != Path("."):
+                                stack.append(entry.path)
+                        elif root != Path(".") or entry.name.startswith("CONTINUITY_"):
+                            st = entry.stat()
+                            state[os.path.normpath(entry.path)] = (st.st_size, st.st_mtime_ns)
+                    except OSError:
+                        continue
+        return state
+
+    def wait(self, timeout: Optional[float] = None) -> set:
+        """Return paths changed within ``timeout`` (None: block until a change)."""
+        while True:
+            time.sleep(self.interval if timeout is None else min(timeout, self.interval))
+            current = self._scan()
+            changed = {
+                path for path in current.keys() | self.snapshot.keys()
+                if current.get(path) != self.snapshot.get(path)
+            }
+            self.snapshot = current
+            if changed or timeout is not None:
+                return changed
+
+    def close(self) -> None:
+        pass
+
+
+class InotifyWatcher:
+    """Linux inotify watcher (via ctypes, no third-party dependency)."""
+
+    name = "inotify"
+
+    IN_CLOSE_WRITE = 0x008
+    IN_MOVED_FROM = 0x040
+    IN_MOVED_TO = 0x080
+    IN_CREATE = 0x100
+    IN_DELETE = 0x200
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    IN_ISDIR = 0x40000000
+    MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+    EVENT = struct.Struct("iIII")
+
+    def __init__(self):
+        self.libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self.fd = self.libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: Dict[int, str] = {}
+        self._add(Path("."), recursive=False)
+        for root in WATCH_ROOTS:
+            for parent in reversed(root.parents[:-1]):
+                self._add(parent, recursive=False)
+            self._add(root, recursive=True)
+
+    def _add(self, directory: Path, recursive: bool) -> List[str]:
+        """Watch a directory; returns files already inside it (recursive only)."""
+        found: List[str] = []
+        if not directory.is_dir():
+            return found
+        wd = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+        if wd < 0:
+            raise OSError(ctypes.get_errno(), f"inotify_add_watch failed for {directory}")
+        self.dirs[wd] = os.path.normpath(directory)
+        if recursive:
+            for entry in os.scandir(directory):
+                if entry.is_dir(follow_symlinks=False):
+                    found.extend(self._add(Path(entry.path), recursive=True))
+                else:
+                    found.append(os.path.normpath(entry.path))
+        return found
+
+    def _watched_recursively(self, directory: Path) -> bool:
+        return any(directory == root or root in directory.parents for root in WATCH_ROOTS)
+
+    def wait(self, timeout: Optional[float] = None) -> set:
+        """Return paths changed within ``timeout`` (None: block until a change)."""
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        changed = set()
+        while True:
             try:
-                data = parse_continuity(file_path)
-                if data:
-                    conn.execute("""
-                        INSERT OR REPLACE INTO continuity
-                        (id, session_name, goal, state_done, state_now, state_next,
-                         key_learnings, key_decisions, snapshot_reason)
-                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
-                    """, (
-                        data["id"], data["session_name"], data["goal"],
-                        data["state_done"], data["state_now"], data["state_next"],
-                        data["key_learnings"], data["key_decisions"],
-                        data["snapshot_reason"]
-                    ))
-                    count += 1
-            except Exception as e:
-                print(f"Error indexing {file_path}: {e}")
-    
+                buf = os.read(self.fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(buf):
+                wd, mask, _, length = self.EVENT.unpack_from(buf, offset)
+                name = os.fsdecode(buf[offset + self.EVENT.size:offset + self.EVENT.size + length].rstrip(b"\0"))
+                offset += self.EVENT.size + length
+                if mask & self.IN_Q_OVERFLOW:
+                    changed.add(RESCAN)
+                    continue
+                if mask & self.IN_IGNORED:
+                    self.dirs.pop(wd, None)
+                    continue
+                if wd not in self.dirs:
+                    continue
+                path = Path(self.dirs[wd]) / name
+                if mask & self.IN_ISDIR:
+                    if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                        if self._watched_recursively(path):
+                            changed.update(self._add(path, recursive=True))
+                        elif any(path in root.parents for root in WATCH_ROOTS):
+                            self._add(path, recursive=False)
+                    elif mask & self.IN_MOVED_FROM:
+                        changed.add(RESCAN)
+                    continue
+                changed.add(os.path.normpath(path))
+        return changed
+
+    def close(self) -> None:
+        os.close(self.fd)
+
+
+def make_watcher(force_polling: bool = False, interval: float = 2.0):
+    """Use inotify where available, otherwise fall back to polling."""
+    if not force_polling and sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher()
+        except (OSError, AttributeError) as e:
+            print(f"inotify unavailable ({e}); falling back to polling")
+    return PollingWatcher(interval)
+
+
+def watch(
+    conn: sqlite3.Connection,
+    debounce: float = 0.5,
+    force_polling: bool = False,
+    interval: float = 2.0,
+    indexers: Optional[List[tuple]] = None
+) -> None:
+    """Re-index touched files as they change until interrupted.
+
+    Events are collected until ``debounce`` seconds pass without a new one,
+    so a burst of writes (e.g. a hook rewriting a ledger) costs one pass.
+    Only files of the types in ``indexers`` (default: all of INDEXERS) are
+    re-indexed.
+    """
+    indexers = INDEXERS if indexers is None else indexers
+    types = {i[0] for i in indexers}
+    watcher = make_watcher(force_polling, interval)
+    print(f"Watching {', '.join(str(r) for r in WATCH_ROOTS)} for "
+          f"{', '.join(i[0] for i in indexers)} ({watcher.name}); Ctrl-C to stop")
+    try:
+        while True:
+            changed = watcher.wait()
+            while True:
+                more = watcher.wait(debounce)
+                if not more:
+                    break
+                changed |= more
+
+            if RESCAN in changed:
+                results = {name: index_fn(conn) for name, _, index_fn, _ in indexers}
+            else:
+                results = index_paths(conn, sorted(changed), types)
+
+            stamp = datetime.now().strftime("%H:%M:%S")
+            for artifact_type, stats in results.items():
+                if stats["unchanged"] != sum(stats.values()):
+                    print(f"[{stamp}] {artifact_type}: {format_stats(stats)}")
+    except KeyboardInterrupt:
+        print("Stopped watching.")
+    finally:
+        watcher.close()
+
+
+def file_size(db_path: Path) -> int:
+    """Size of the database including its WAL file."""
+    return sum(
+        p.stat().st_size
+        for p in (db_path, Path(f"{db_path}-wal"))
+        if p.exists()
+    )
+
+
+def backfill_vectors(conn: sqlite3.Connection, artifact_type: str) -> None:
+    """Drop vectors of deleted rows and embed rows indexed without one."""
+    spec = ARTIFACT_TYPES[artifact_type]
+    table = spec["table"]
+    conn.execute(f"""
+        DELETE FROM vectors WHERE artifact_type = ?
+        AND id NOT IN (SELECT id FROM {table})
+    """, (artifact_type,))
+    cursor = conn.execute(f"""
+        SELECT id, {', '.join(spec['embed'])} FROM {table}
+        WHERE id NOT IN (SELECT id FROM vectors WHERE artifact_type = ?)
+    """, (artifact_type,))
+    cursor.row_factory = sqlite3.Row
+    conn.executemany(
+        "INSERT INTO vectors (artifact_type, id, vector) VALUES (?, ?, ?)",
+        [
+            (artifact_type, row["id"], embed_record(spec, dict(row)))
+            for row in cursor.fetchall()
+        ]
+    )
+
+
+def maintain(conn: sqlite3.Connection, db_path: Path) -> Dict[str, Any]:
+    """Purge orphaned rows, rebuild and optimize FTS indexes, and VACUUM.
+
+    Rows still keyed by the old content-derived IDs are re-indexed under
+    their path key, an incremental pass brings the manifest in line with
+    the files on disk, and rows the manifest doesn't account for (vanished
+    files, rows with no file path) are deleted, along with their semantic
+    vectors; rows indexed before vectors existed get one. FTS indexes are rebuilt to
+    drop entries that INSERT OR REPLACE orphaned, since it doesn't fire the
+    delete triggers.
+    """
+    report: Dict[str, Any] = {"size_before": file_size(db_path), "purged": {}}
+
+    # Files whose rows carry an old content-derived ID are dropped from the
+    # manifest so the index pass below re-parses them under the path key.
+    conn.create_function("artifact_id", 1, generate_id, deterministic=True)
+    for artifact_type, spec in ARTIFACT_TYPES.items():
+        report["purged"][artifact_type] = 0
+        if spec.get("multi_row"):
+            continue
+        table = spec["table"]
+        stale_paths = f"""
+            SELECT file_path FROM {table}
+            WHERE file_path IS NOT NULL AND id != artifact_id(file_path)
+        """
+        # Rows of files the manifest doesn't know are counted by the purge below
+        stale = conn.execute(
+            f"SELECT COUNT(*) FROM ({stale_paths}) WHERE file_path IN "
+            "(SELECT path FROM manifest WHERE artifact_type = ?)",
+            (artifact_type,)
+        ).fetchone()[0]
+        conn.execute(
+            f"DELETE FROM manifest WHERE artifact_type = ? AND path IN ({stale_paths})",
+            (artifact_type,)
+        )
+        report["purged"][artifact_type] = stale
+    conn.commit()
+
+    for _, _, index_fn, _ in INDEXERS:
+        index_fn(conn)
+
+    for artifact_type, spec in ARTIFACT_TYPES.items():
+        cursor = conn.execute(f"""
+            DELETE FROM {spec['table']}
+            WHERE file_path IS NULL
+               OR file_path NOT IN (
+                   SELECT path FROM manifest WHERE artifact_type = ?
+               )
+        """, (artifact_type,))
+        report["purged"][artifact_type] += cursor.rowcount
+        backfill_vectors(conn, artifact_type)
+    bump_generation(conn)
     conn.commit()
-    return count
+
+    for table in [spec["table"] for spec in ARTIFACT_TYPES.values()] + ["queries"]:
+        conn.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES('rebuild')")
+        conn.execute(f"INSERT INTO {table}_fts({table}_fts) VALUES('optimize')")
+    conn.commit()
+
+    conn.execute("VACUUM")
+    conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    report["size_after"] = file_size(db_path)
+    return report
+
+
+def format_size(size: int) -> str:
+    """Format a byte count for display."""
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
 
 
 def main():
@@ -408,39 +1430,130 @@ def main():
     parser = argparse.ArgumentParser(
         description="Index artifacts for recall-reasoning"
     )
+    parser.add_argument(
+        "command",
+        nargs="?",
+        choices=["index", "maintain"],
+        default="index",
+        help="index (default) or maintain: purge orphans, optimize FTS, VACUUM"
+    )
     parser.add_argument("--all", action="store_true", help="Index everything")
     parser.add_argument("--handoffs", action="store_true", help="Index handoffs")
     parser.add_argument("--plans", action="store_true", help="Index plans")
     parser.add_argument("--specs", action="store_true", help="Index specs")
     parser.add_argument("--continuity", action="store_true", help="Index ledgers")
+    parser.add_argument(
+        "--reasoning",
+        action="store_true",
+        help="Index commit reasoning and build/test attempts (.git/claude/)"
+    )
     parser.add_argument("--db", type=str, help="Custom database path")
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Re-parse every file, ignoring the manifest"
+    )
+    parser.add_argument(
+        "--jobs",
+        type=int,
+        default=1,
+        help="Parse files in N worker processes (default: 1)"
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Defer FTS maintenance and rebuild once at the end (large loads)"
+    )
+    parser.add_argument(
+        "--watch",
+        action="store_true",
+        help="After indexing, keep running and re-index files as they change"
+    )
+    parser.add_argument(
+        "--debounce",
+        type=float,
+        default=0.5,
+        help="Seconds of quiet before a burst of changes is indexed (default: 0.5)"
+    )
+    parser.add_argument(
+        "--poll",
+        action="store_true",
+        help="Watch by polling even where inotify is available"
+    )
+    parser.add_argument(
+        "--poll-interval",
+        type=float,
+        default=2.0,
+        help="Seconds between polling scans (default: 2.0)"
+    )
+    parser.add_argument(
+        "--max-field-size",
+        type=int,
+        default=MAX_FIELD_SIZE,
+        help=f"Truncate extracted fields to N characters, 0 = no cap (default: {MAX_FIELD_SIZE})"
+    )
     
     args = parser.parse_args()
+    set_field_cap(args.max_field_size)
     
     # Default to --all if nothing specified
-    if not any([args.all, args.handoffs, args.plans, args.specs, args.continuity]):
+    if not any([args.all, args.handoffs, args.plans, args.specs, args.continuity,
+                args.reasoning]):
         args.all = True
     
     db_path = Path(args.db) if args.db else get_db_path()
     conn = init_db(db_path)
     
+    if args.command == "maintain":
+        print(f"Maintaining: {db_path}")
+        report = maintain(conn, db_path)
+        for artifact_type, count in report["purged"].items():
+            print(f"  {artifact_type.capitalize()}: {count} orphaned rows purged")
+        print(f"  Size: {format_size(report['size_before'])} -> {format_size(report['size_after'])}")
+        conn.close()
+        print("Done!")
+        return
+    
     print(f"Indexing to: {db_path}")
     
-    if args.all or args.handoffs:
-        count = index_handoffs(conn)
-        print(f"  Handoffs: {count} indexed")
+    selected = [i for i in INDEXERS if args.all or getattr(args, i[3])]
+    
+    executor = ProcessPoolExecutor(
+        max_workers=args.jobs, initializer=set_field_cap, initargs=(args.max_field_size,)
+    ) if args.jobs > 1 else None
+    bulk = deferred_fts(conn, [i[0] for i in selected]) if args.bulk else nullcontext(set())
     
-    if args.all or args.plans:
-        count = index_plans(conn)
-        print(f"  Plans: {count} indexed")
+    total_rows = 0
+    start = time.perf_counter()
+    try:
+        with bulk as changed:
+            for table, label, index_fn, _ in selected:
+                type_start = time.perf_counter()
+                stats = index_fn(conn, args.force, executor, args.jobs)
+                if stats["added"] or stats["updated"] or stats["removed"]:
+                    changed.add(table)
+                line = f"  {label}: {format_stats(stats)}"
+                if args.bulk:
+                    rows = stats["added"] + stats["updated"]
+                    total_rows += rows
+                    line += f" ({format_rate(rows, time.perf_counter() - type_start)})"
+                print(line)
+            load_done = time.perf_counter()
+    finally:
+        if executor is not None:
+            executor.shutdown()
     
-    if args.all or args.specs:
-        count = index_specs(conn)
-        print(f"  Specs: {count} indexed")
+    if args.bulk:
+        elapsed = time.perf_counter() - start
+        if changed:
+            print(f"  FTS rebuild + optimize ({', '.join(sorted(changed))}): "
+                  f"{time.perf_counter() - load_done:.2f}s")
+        else:
+            print("  FTS rebuild skipped: no rows changed")
+        print(f"  Total: {total_rows} rows in {elapsed:.2f}s ({format_rate(total_rows, elapsed)})")
     
-    if args.all or args.continuity:
-        count = index_continuity(conn)
-        print(f"  Continuity: {count} indexed")
+    if args.watch:
+        watch(conn, args.debounce, args.poll, args.poll_interval, selected)
     
     conn.close()
     print("Done!")
@@ -448,4 +1561,3 @@ def main():
 
 if __name__ == "__main__":
     main()
-
@@ -9,27 +9,70 @@ USAGE:
     uv run python tools/artifact_query.py "implement agent" --outcome SUCCEEDED
     uv run python tools/artifact_query.py "API design" --type specs
     uv run python tools/artifact_query.py "login flow" --type handoffs --limit 10
+    uv run python tools/artifact_query.py "ImportError" --type reasoning --outcome FAILED
+    uv run python tools/artifact_query.py "rate limiting" --federate "~/src/*"
+    uv run python tools/artifact_query.py "retry" --federate "~/src/*" --parallel
+    uv run python tools/artifact_query.py "token refresh" --unified --limit 10
+    uv run python tools/artifact_query.py "flaky test" --weight what_failed=4 --highlight
+    uv run python tools/artifact_query.py "session expired" --semantic  # Similar wording, no keyword match needed
+    uv run python tools/artifact_query.py "session expired" --hybrid    # Fuse semantic and bm25 rankings
+    uv run python tools/artifact_query.py --file src/auth/login.py        # Handoffs that touched a file
+    uv run python tools/artifact_query.py "retry" --session s1 --since 2025-01-01
+    uv run python tools/artifact_query.py "auth" --type handoffs --jsonl --limit 0 > all.jsonl
+    uv run python tools/artifact_query.py "auth" --type handoffs --limit 100 --after=-4.2,1834
+    uv run python tools/artifact_query.py "OAuth" --no-server      # Skip the query server
+    uv run python tools/artifact_query.py "OAuth" --profile        # Timings and query plans
+    uv run python tools/artifact_query.py "OAuth" --record         # Log timings to query_metrics
+    uv run python tools/artifact_query.py --stats --days 7         # Latency percentiles per day
+
+Queries go through a long-lived server (tools/artifact_server.py) that keeps
+warm read-only connections; it is started on first use and searching falls
+back to a direct connection whenever it is unavailable. A plain search
+(words plus --type, --outcome, --limit or --db) is handed to the server by
+artifact_client.py before the rest of this module loads.
 """
 
+import sys
+
+if __name__ == "__main__":
+    import artifact_client
+
+    if artifact_client.answer(sys.argv[1:]):
+        sys.exit(0)
+
 import argparse
+import glob as globmod
 import hashlib
+import heapq
 import json
+import os
+import random
+import re
 import sqlite3
-from datetime import datetime
+import statistics
+import time
+from array import array
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from pathlib import Path
-from typing import Dict, List, Optional
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from artifact_client import query_server
+from artifact_vectors import STOPWORDS, WORD, require_numpy, vector_index
+
+DEFAULT_DB = Path(".claude/cache/artifact-index/context.db")
 
 
 def get_db_path(custom_path: Optional[str] = None) -> Path:
     """Get the database path."""
     if custom_path:
         return Path(custom_path)
-    return Path(".claude/cache/artifact-index/context.db")
+    return DEFAULT_DB
 
 
 def escape_fts5_query(query: str) -> str:
     """Escape FTS5 query to prevent syntax errors.
-    
+
     Splits query into words and joins with OR for flexible matching.
     """
     words = query.split()
@@ -37,118 +80,1220 @@ def escape_fts5_query(query: str) -> str:
     return " OR ".join(quoted_words)
 
 
+# FTS5 columns of each index, in declaration order, with their default
+# bm25() weights: matches in short curated fields (titles, summaries,
+# goals) count for more than matches in long free-form ones.
+FTS_COLUMNS: Dict[str, Dict[str, float]] = {
+    "handoffs": {
+        "task_summary": 2.0, "what_worked": 1.0, "what_failed": 1.0,
+        "key_decisions": 1.5, "files_modified": 0.5,
+    },
+    "plans": {
+        "title": 3.0, "overview": 2.0, "approach": 1.0, "phases": 0.5,
+        "constraints": 0.5,
+    },
+    "specs": {
+        "spec_id": 3.0, "title": 3.0, "behavior_summary": 1.5,
+        "expected_behaviors": 1.0, "eval_criteria": 0.5,
+    },
+    "continuity": {
+        "goal": 2.0, "key_learnings": 1.5, "key_decisions": 1.5, "state_now": 1.0,
+    },
+    "reasoning": {"subject": 2.0, "content": 1.0},
+    "attempts": {"command": 1.0, "error": 1.0},
+    "queries": {"question": 2.0, "answer": 1.0},
+}
+
+# Long text comes back as a window of this many tokens around the matches
+SNIPPET_TOKENS = 32
+HIGHLIGHT_MARKERS = ("**", "**")
+
+
+def rank_function(table: str, weights: Optional[Dict[str, float]] = None) -> str:
+    """bm25() ranking for ``table``; ``weights`` overrides defaults by column name.
+
+    Bound as ``rank MATCH ?`` so FTS5 still sorts by rank internally.
+    """
+    weights = weights or {}
+    values = [weights.get(column, default) for column, default in FTS_COLUMNS[table].items()]
+    return f"bm25({', '.join(f'{value:g}' for value in values)})"
+
+
+def weight_columns(artifact_type: str) -> List[str]:
+    """Columns ``--weight`` can name when searching ``artifact_type``."""
+    columns = {
+        column
+        for table, weights in FTS_COLUMNS.items()
+        if artifact_type == "all" or PAGED_SECTIONS.get(table) == artifact_type
+        for column in weights
+    }
+    return sorted(columns)
+
+
+def snippet_sql(table: str, column: str, highlight: bool = False) -> str:
+    """SQL for the best-matching window of one column, built by SQLite."""
+    index = list(FTS_COLUMNS[table]).index(column)
+    start, end = HIGHLIGHT_MARKERS if highlight else ("", "")
+    return f"snippet({table}_fts, {index}, '{start}', '{end}', ' … ', {SNIPPET_TOKENS})"
+
+
+def highlight_sql(table: str, column: str, highlight: bool = False) -> str:
+    """SQL for a short column with its matches marked (or left as-is)."""
+    if not highlight:
+        return f"{table}_fts.{column}"
+    index = list(FTS_COLUMNS[table]).index(column)
+    start, end = HIGHLIGHT_MARKERS
+    return f"highlight({table}_fts, {index}, '{start}', '{end}')"
+
+
+def fetch_dicts(conn: sqlite3.Connection, sql: str, params: List) -> List[Dict]:
+    cursor = conn.execute(sql, params)
+    columns = [desc[0] for desc in cursor.description]
+    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+
+# Rows per keyset page when streaming; the sort behind each page holds no more
+STREAM_PAGE = 500
+
+
+def page_sql(
+    sql: str,
+    params: List,
+    table: str,
+    alias: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+    keyset: bool = False
+) -> Tuple[str, List]:
+    """Append the cursor condition, ordering and LIMIT to a per-type search.
+
+    ``keyset`` (implied by ``after``) orders by (rank, rowid) so the pair is
+    an exact cursor. A ``limit`` of 0 means no limit.
+    """
+    if after is not None:
+        sql += f" AND ({table}_fts.rank, {alias}.rowid) > (?, ?)"
+        params = params + list(after)
+    keyset = keyset or after is not None
+    sql += f" ORDER BY rank{f', {alias}.rowid' if keyset else ''} LIMIT ?"
+    return sql, params + [limit or -1]
+
+
+def iter_pages(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: List,
+    table: str,
+    alias: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None
+) -> Iterator[Dict]:
+    """Yield up to ``limit`` rows (0 = all) in keyset pages of STREAM_PAGE.
+
+    Each page is its own bounded ORDER BY ... LIMIT, resumed just past the
+    last row of the one before, so memory stays flat however many rows
+    match.
+    """
+    remaining = limit or None
+    while remaining is None or remaining > 0:
+        size = STREAM_PAGE if remaining is None else min(STREAM_PAGE, remaining)
+        rows = fetch_dicts(conn, *page_sql(sql, params, table, alias, size, after, keyset=True))
+        yield from rows
+        if len(rows) < size:
+            return
+        if remaining is not None:
+            remaining -= len(rows)
+        after = (rows[-1]["score"], rows[-1]["rowid"])
+
+
+def page(
+    conn: sqlite3.Connection,
+    sql: str,
+    params: List,
+    table: str,
+    alias: str,
+    limit: int,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
+):
+    """Order, limit and run a per-type FTS search.
+
+    ``after`` resumes just past a (rank, rowid) keyset cursor, so each page
+    costs the same however deep it is. A ``limit`` of 0 means no limit.
+    With ``stream``, rows are yielded page by page (see iter_pages).
+    """
+    if stream:
+        return iter_pages(conn, sql, params, table, alias, limit, after)
+    return fetch_dicts(conn, *page_sql(sql, params, table, alias, limit, after))
+
+
+def facet_conditions(
+    facets: Optional[Dict[str, str]],
+    schema: str = "main"
+) -> Tuple[str, List]:
+    """SQL conditions (on alias ``h``) restricting handoffs to the facets.
+
+    ``file`` is looked up in handoff_files: an exact path, a directory
+    (trailing /) or a glob. ``since``/``until`` bound created_at (``until``
+    is exclusive) and ``session`` matches the session name; each resolves
+    through an index rather than a scan.
+    """
+    sql = ""
+    params: List = []
+    facets = facets or {}
+    if facets.get("file"):
+        path = facets["file"]
+        if path.endswith("/"):
+            op, path = "GLOB", os.path.normpath(path) + "/*"
+        else:
+            op = "GLOB" if any(c in path for c in "*?[") else "="
+            path = os.path.normpath(path)
+        sql += f" AND h.id IN (SELECT handoff_id FROM {schema}.handoff_files WHERE path {op} ?)"
+        params.append(path)
+    if facets.get("session"):
+        sql += " AND h.session_name = ?"
+        params.append(facets["session"])
+    if facets.get("since"):
+        sql += " AND h.created_at >= ?"
+        params.append(facets["since"])
+    if facets.get("until"):
+        sql += " AND h.created_at < ?"
+        params.append(facets["until"])
+    return sql, params
+
+
+def list_handoffs(
+    conn: sqlite3.Connection,
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    schema: str = "main",
+    facets: Optional[Dict[str, str]] = None
+) -> List[Dict]:
+    """Newest handoffs matching the facets, for lookups without query text.
+
+    ``score`` is the negated Julian day, so newer sorts first wherever
+    results are ordered by score.
+    """
+    conditions, params = facet_conditions(facets, schema)
+    sql = f"""
+        SELECT h.id, h.session_name, h.task_number,
+               COALESCE(substr(h.task_summary, 1, 240), '') as task_summary,
+               h.outcome, h.file_path, h.created_at,
+               -julianday(h.created_at) as score
+        FROM {schema}.handoffs h
+        WHERE 1 {conditions}
+    """
+    if outcome:
+        sql += " AND h.outcome = ?"
+        params.append(outcome)
+    sql += " ORDER BY h.created_at DESC LIMIT ?"
+    params.append(limit or -1)
+    return fetch_dicts(conn, sql, params)
+
+
 def search_handoffs(
     conn: sqlite3.Connection,
     query: str,
     outcome: Optional[str] = None,
-    limit: int = 5
+    limit: int = 5,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    facets: Optional[Dict[str, str]] = None,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
 ) -> List[Dict]:
-    """Search handoffs using FTS5."""
-    sql = """
-        SELECT h.id, h.session_name, h.task_number, h.task_summary,
-               h.what_worked, h.what_failed, h.key_decisions,
+    """Search handoffs using FTS5.
+
+    Section fields are snippets around the match, not the full text.
+    """
+    conditions, facet_params = facet_conditions(facets, schema)
+    sql = f"""
+        SELECT h.id, h.rowid, h.session_name, h.task_number,
+               {snippet_sql("handoffs", "task_summary", highlight)} as task_summary,
+               {snippet_sql("handoffs", "what_worked", highlight)} as what_worked,
+               {snippet_sql("handoffs", "what_failed", highlight)} as what_failed,
+               {snippet_sql("handoffs", "key_decisions", highlight)} as key_decisions,
                h.outcome, h.file_path, h.created_at,
                handoffs_fts.rank as score
-        FROM handoffs_fts
-        JOIN handoffs h ON handoffs_fts.rowid = h.rowid
-        WHERE handoffs_fts MATCH ?
+        FROM {schema}.handoffs_fts
+        JOIN {schema}.handoffs h ON handoffs_fts.rowid = h.rowid
+        WHERE handoffs_fts MATCH ? AND handoffs_fts.rank MATCH ? {conditions}
     """
-    params = [escape_fts5_query(query)]
-    
+    params = [escape_fts5_query(query), rank_function("handoffs", weights)] + facet_params
+
     if outcome:
         sql += " AND h.outcome = ?"
         params.append(outcome)
-    
-    sql += " ORDER BY rank LIMIT ?"
-    params.append(limit)
-    
-    cursor = conn.execute(sql, params)
-    columns = [desc[0] for desc in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+    return page(conn, sql, params, "handoffs", "h", limit, after, stream)
 
 
 def search_plans(
     conn: sqlite3.Connection,
     query: str,
-    limit: int = 3
+    limit: int = 3,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
 ) -> List[Dict]:
     """Search plans using FTS5."""
-    sql = """
-        SELECT p.id, p.title, p.overview, p.approach, p.file_path, p.created_at,
+    sql = f"""
+        SELECT p.id, p.rowid, {highlight_sql("plans", "title", highlight)} as title,
+               {snippet_sql("plans", "overview", highlight)} as overview,
+               {snippet_sql("plans", "approach", highlight)} as approach,
+               p.file_path, p.created_at,
                plans_fts.rank as score
-        FROM plans_fts
-        JOIN plans p ON plans_fts.rowid = p.rowid
-        WHERE plans_fts MATCH ?
-        ORDER BY rank LIMIT ?
+        FROM {schema}.plans_fts
+        JOIN {schema}.plans p ON plans_fts.rowid = p.rowid
+        WHERE plans_fts MATCH ? AND plans_fts.rank MATCH ?
     """
-    cursor = conn.execute(sql, [escape_fts5_query(query), limit])
-    columns = [desc[0] for desc in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    params = [escape_fts5_query(query), rank_function("plans", weights)]
+    return page(conn, sql, params, "plans", "p", limit, after, stream)
 
 
 def search_specs(
     conn: sqlite3.Connection,
     query: str,
-    limit: int = 5
+    limit: int = 5,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
 ) -> List[Dict]:
     """Search specs using FTS5."""
-    sql = """
-        SELECT s.id, s.spec_id, s.req_id, s.title, s.behavior_summary,
+    sql = f"""
+        SELECT s.id, s.rowid, s.spec_id, s.req_id,
+               {highlight_sql("specs", "title", highlight)} as title,
+               {snippet_sql("specs", "behavior_summary", highlight)} as behavior_summary,
                s.has_eval, s.file_path, s.created_at,
                specs_fts.rank as score
-        FROM specs_fts
-        JOIN specs s ON specs_fts.rowid = s.rowid
-        WHERE specs_fts MATCH ?
-        ORDER BY rank LIMIT ?
+        FROM {schema}.specs_fts
+        JOIN {schema}.specs s ON specs_fts.rowid = s.rowid
+        WHERE specs_fts MATCH ? AND specs_fts.rank MATCH ?
     """
-    cursor = conn.execute(sql, [escape_fts5_query(query), limit])
-    columns = [desc[0] for desc in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    params = [escape_fts5_query(query), rank_function("specs", weights)]
+    return page(conn, sql, params, "specs", "s", limit, after, stream)
 
 
 def search_continuity(
     conn: sqlite3.Connection,
     query: str,
-    limit: int = 3
+    limit: int = 3,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
 ) -> List[Dict]:
     """Search continuity ledgers using FTS5."""
-    sql = """
-        SELECT c.id, c.session_name, c.goal, c.key_learnings, c.key_decisions,
+    sql = f"""
+        SELECT c.id, c.rowid, c.session_name,
+               {snippet_sql("continuity", "goal", highlight)} as goal,
+               {snippet_sql("continuity", "key_learnings", highlight)} as key_learnings,
+               {snippet_sql("continuity", "key_decisions", highlight)} as key_decisions,
                c.state_now, c.created_at,
                continuity_fts.rank as score
-        FROM continuity_fts
-        JOIN continuity c ON continuity_fts.rowid = c.rowid
-        WHERE continuity_fts MATCH ?
-        ORDER BY rank LIMIT ?
+        FROM {schema}.continuity_fts
+        JOIN {schema}.continuity c ON continuity_fts.rowid = c.rowid
+        WHERE continuity_fts MATCH ? AND continuity_fts.rank MATCH ?
     """
-    cursor = conn.execute(sql, [escape_fts5_query(query), limit])
-    columns = [desc[0] for desc in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    params = [escape_fts5_query(query), rank_function("continuity", weights)]
+    return page(conn, sql, params, "continuity", "c", limit, after, stream)
+
+
+def search_reasoning(
+    conn: sqlite3.Connection,
+    query: str,
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
+) -> List[Dict]:
+    """Search commit reasoning using FTS5.
+
+    ``outcome`` maps onto build history: FAILED keeps commits that needed
+    failed attempts first, SUCCEEDED keeps commits that passed first try.
+    """
+    sql = f"""
+        SELECT r.id, r.rowid, r.commit_hash,
+               {highlight_sql("reasoning", "subject", highlight)} as subject,
+               r.author, r.committed_at,
+               r.branch, r.failed_attempts, r.outcome, r.file_path,
+               {snippet_sql("reasoning", "content", highlight)} as excerpt,
+               reasoning_fts.rank as score
+        FROM {schema}.reasoning_fts
+        JOIN {schema}.reasoning r ON reasoning_fts.rowid = r.rowid
+        WHERE reasoning_fts MATCH ? AND reasoning_fts.rank MATCH ?
+    """
+    params = [escape_fts5_query(query), rank_function("reasoning", weights)]
+
+    if outcome == "FAILED":
+        sql += " AND r.failed_attempts > 0"
+    elif outcome == "SUCCEEDED":
+        sql += " AND r.outcome = 'FIRST_TRY'"
+
+    return page(conn, sql, params, "reasoning", "r", limit, after, stream)
+
+
+# Attempt types end in _fail or _pass (build_fail, test_pass, ...)
+ATTEMPT_OUTCOMES = {
+    "FAILED": "a.attempt_type LIKE '%\\_fail' ESCAPE '\\'",
+    "SUCCEEDED": "a.attempt_type LIKE '%\\_pass' ESCAPE '\\'",
+}
+
+
+def search_attempts(
+    conn: sqlite3.Connection,
+    query: str,
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    after: Optional[Tuple[float, int]] = None,
+    stream: bool = False
+) -> List[Dict]:
+    """Search uncommitted build/test attempts using FTS5.
+
+    ``outcome`` FAILED keeps failed attempts (``*_fail``), SUCCEEDED
+    passing ones (``*_pass``).
+    """
+    sql = f"""
+        SELECT a.id, a.rowid, a.branch, a.attempt_type, a.build_type,
+               {snippet_sql("attempts", "command", highlight)} as command,
+               {snippet_sql("attempts", "error", highlight)} as error,
+               a.timestamp, a.file_path,
+               attempts_fts.rank as score
+        FROM {schema}.attempts_fts
+        JOIN {schema}.attempts a ON attempts_fts.rowid = a.rowid
+        WHERE attempts_fts MATCH ? AND attempts_fts.rank MATCH ?
+    """
+    params = [escape_fts5_query(query), rank_function("attempts", weights)]
+
+    if outcome in ATTEMPT_OUTCOMES:
+        sql += f" AND {ATTEMPT_OUTCOMES[outcome]}"
+
+    return page(conn, sql, params, "attempts", "a", limit, after, stream)
 
 
 def search_past_queries(
     conn: sqlite3.Connection,
     query: str,
-    limit: int = 2
+    limit: int = 2,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False
 ) -> List[Dict]:
     """Check if similar questions have been asked before."""
-    sql = """
-        SELECT q.id, q.question, q.answer, q.was_helpful, q.created_at,
+    sql = f"""
+        SELECT q.id, {highlight_sql("queries", "question", highlight)} as question,
+               {snippet_sql("queries", "answer", highlight)} as answer,
+               q.was_helpful, q.created_at,
                queries_fts.rank as score
-        FROM queries_fts
-        JOIN queries q ON queries_fts.rowid = q.rowid
-        WHERE queries_fts MATCH ?
+        FROM {schema}.queries_fts
+        JOIN {schema}.queries q ON queries_fts.rowid = q.rowid
+        WHERE queries_fts MATCH ? AND queries_fts.rank MATCH ?
         ORDER BY rank LIMIT ?
     """
-    cursor = conn.execute(sql, [escape_fts5_query(query), limit])
-    columns = [desc[0] for desc in cursor.description]
-    return [dict(zip(columns, row)) for row in cursor.fetchall()]
+    return fetch_dicts(conn, sql, [
+        escape_fts5_query(query), rank_function("queries", weights), limit
+    ])
+
+
+# How each artifact type projects onto the common columns of a unified
+# search; "type" is the --type value that selects it, "summary" the FTS
+# column excerpted.
+UNIFIED_SOURCES = {
+    "handoffs": {
+        "type": "handoffs", "table": "handoffs", "alias": "h",
+        "title": "h.session_name || '/task-' || COALESCE(h.task_number, '?')",
+        "summary": "task_summary", "date": "h.created_at",
+        "outcome": {"SUCCEEDED": "h.outcome = 'SUCCEEDED'",
+                    "PARTIAL": "h.outcome = 'PARTIAL'",
+                    "FAILED": "h.outcome = 'FAILED'"},
+    },
+    "specs": {
+        "type": "specs", "table": "specs", "alias": "s",
+        "title": "s.spec_id || ': ' || s.title",
+        "summary": "behavior_summary", "date": "s.created_at",
+    },
+    "plans": {
+        "type": "plans", "table": "plans", "alias": "p",
+        "title": "p.title", "summary": "overview", "date": "p.created_at",
+    },
+    "continuity": {
+        "type": "continuity", "table": "continuity", "alias": "c",
+        "title": "'Session: ' || c.session_name", "summary": "goal",
+        "date": "c.created_at",
+    },
+    "reasoning": {
+        "type": "reasoning", "table": "reasoning", "alias": "r",
+        "title": "r.subject", "summary": "content", "date": "r.committed_at",
+        "outcome": {"FAILED": "r.failed_attempts > 0",
+                    "SUCCEEDED": "r.outcome = 'FIRST_TRY'"},
+    },
+    "attempts": {
+        "type": "reasoning", "table": "attempts", "alias": "a",
+        "title": "a.command", "summary": "error", "date": "a.timestamp",
+        "outcome": ATTEMPT_OUTCOMES,
+    },
+}
+
+
+def search_unified(
+    conn: sqlite3.Connection,
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 10,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    facets: Optional[Dict[str, str]] = None
+) -> List[Dict]:
+    """Rank every artifact type together in one UNION ALL statement.
+
+    Raw bm25 values depend on each table's size and column lengths, so each
+    type's scores are divided by that type's best score before merging: a
+    table of long documents can't crowd out short specs and handoffs.
+    ``score`` is the negated result (-1.0 = best hit of its type), keeping
+    lower-is-better like FTS5 rank everywhere else; ties go to raw bm25.
+    Facets are handoff fields, so with any set only handoffs are ranked.
+    """
+    existing = {
+        row[0] for row in conn.execute(f"SELECT name FROM {schema}.sqlite_master WHERE type = 'table'")
+    }
+    selects = []
+    params: List = []
+    match = escape_fts5_query(query)
+    for name, source in UNIFIED_SOURCES.items():
+        table, alias = source["table"], source["alias"]
+        if artifact_type not in (source["type"], "all") or f"{table}_fts" not in existing:
+            continue
+        if facets and name != "handoffs":
+            continue
+        sql = f"""
+            SELECT '{name}' AS artifact_type, {alias}.id, {source["title"]} AS title,
+                   {snippet_sql(table, source["summary"], highlight)} AS summary,
+                   {alias}.file_path, {source["date"]} AS created_at,
+                   {table}_fts.rank AS bm25
+            FROM {schema}.{table}_fts
+            JOIN {schema}.{table} {alias} ON {table}_fts.rowid = {alias}.rowid
+            WHERE {table}_fts MATCH ? AND {table}_fts.rank MATCH ?
+        """
+        if outcome in source.get("outcome", {}):
+            sql += f" AND {source['outcome'][outcome]}"
+        if facets:
+            conditions, facet_params = facet_conditions(facets, schema)
+            sql += conditions
+        else:
+            facet_params = []
+        # A type's best hit and its share of the global top-k both lie
+        # within its own top-k, so nothing below that needs scoring.
+        selects.append(f"SELECT * FROM ({sql} ORDER BY rank LIMIT ?)")
+        params.extend([match, rank_function(table, weights), *facet_params, limit])
+    if not selects:
+        return []
+
+    sql = f"""
+        WITH hits AS ({" UNION ALL ".join(selects)})
+        SELECT artifact_type, id, title, summary, file_path, created_at, bm25,
+               -COALESCE(bm25 / NULLIF(MIN(bm25) OVER (PARTITION BY artifact_type), 0), 1.0)
+                   AS score
+        FROM hits
+        ORDER BY score, bm25 LIMIT ?
+    """
+    params.append(limit)
+    return fetch_dicts(conn, sql, params)
+
+
+# =============================================================================
+# Semantic and hybrid search
+# =============================================================================
+
+SUMMARY_CHARS = 240
+
+# Reciprocal rank fusion constant: damps the weight of the very top ranks
+# so agreement between the two rankings beats a single first place.
+RRF_K = 60
+
+
+def database_file(conn: sqlite3.Connection, schema: str = "main") -> Optional[Path]:
+    """File behind an attached schema; None for in-memory databases."""
+    for _, name, file in conn.execute("PRAGMA database_list"):
+        if name == schema and file:
+            return Path(file)
+    return None
+
+
+def fetch_artifacts(
+    conn: sqlite3.Connection,
+    keys: List[Tuple[str, str]],
+    outcome: Optional[str] = None,
+    schema: str = "main"
+) -> Dict[Tuple[str, str], Dict]:
+    """Unified-search rows for (artifact_type, id) pairs, keyed the same way.
+
+    Rows excluded by ``outcome`` are left out.
+    """
+    ids: Dict[str, List[str]] = {}
+    for name, artifact_id in keys:
+        ids.setdefault(name, []).append(artifact_id)
+    rows = {}
+    for name, type_ids in ids.items():
+        source = UNIFIED_SOURCES[name]
+        alias = source["alias"]
+        sql = f"""
+            SELECT '{name}' AS artifact_type, {alias}.id, {source["title"]} AS title,
+                   substr({alias}.{source["summary"]}, 1, {SUMMARY_CHARS}) AS summary,
+                   {alias}.file_path, {source["date"]} AS created_at
+            FROM {schema}.{source["table"]} {alias}
+            WHERE {alias}.id IN ({", ".join("?" for _ in type_ids)})
+        """
+        if outcome in source.get("outcome", {}):
+            sql += f" AND {source['outcome'][outcome]}"
+        for row in fetch_dicts(conn, sql, type_ids):
+            rows[(name, row["id"])] = row
+    return rows
+
+
+def search_semantic(
+    conn: sqlite3.Connection,
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 10,
+    schema: str = "main",
+    facets: Optional[Dict[str, str]] = None
+) -> List[Dict]:
+    """Rank artifacts by cosine similarity of hashed TF-IDF vectors.
+
+    Finds artifacts that share vocabulary with the query even where FTS5
+    would need every spelling right. ``score`` is the negated similarity.
+    With facets, only the handoffs they select are scored.
+    """
+    db_path = database_file(conn, schema)
+    if db_path is None:
+        return []
+    names = [
+        name for name, source in UNIFIED_SOURCES.items()
+        if artifact_type in (source["type"], "all")
+    ]
+    candidates = None
+    if facets:
+        if "handoffs" not in names:
+            return []
+        names = ["handoffs"]
+        conditions, params = facet_conditions(facets, schema)
+        candidates = {"handoffs": [
+            row[0] for row in conn.execute(
+                f"SELECT h.id FROM {schema}.handoffs h WHERE 1 {conditions}", params
+            )
+        ]}
+    index = vector_index(conn, db_path, content_generation(conn, schema), schema)
+    # Over-fetch when filtering, since the filter runs after the ranking
+    hits = index.search(query, names, limit * 4 if outcome else limit, candidates)
+    rows = fetch_artifacts(conn, [(name, id_) for name, id_, _ in hits], outcome, schema)
+
+    results = []
+    for name, artifact_id, similarity in hits:
+        row = rows.get((name, artifact_id))
+        if row is not None:
+            results.append(dict(row, score=-similarity))
+    return results[:limit]
+
+
+def search_hybrid(
+    conn: sqlite3.Connection,
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 10,
+    schema: str = "main",
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    facets: Optional[Dict[str, str]] = None
+) -> List[Dict]:
+    """Fuse the bm25 and semantic rankings with reciprocal rank fusion.
+
+    Each list contributes 1 / (RRF_K + rank) per artifact, scaled so a first
+    place in one list is worth 1.0; ``score`` is the negated sum. Keyword
+    rows are preferred for display, as they carry match snippets.
+    """
+    depth = max(limit * 4, 20)
+    rankings = [
+        search_unified(conn, query, artifact_type, outcome, depth, schema, weights, highlight, facets),
+        search_semantic(conn, query, artifact_type, outcome, depth, schema, facets),
+    ]
+    fused: Dict[Tuple[str, str], float] = {}
+    rows: Dict[Tuple[str, str], Dict] = {}
+    for ranking in rankings:
+        for rank, row in enumerate(ranking, 1):
+            key = (row["artifact_type"], row["id"])
+            fused[key] = fused.get(key, 0.0) + (RRF_K + 1) / (RRF_K + rank)
+            rows.setdefault(key, row)
+    best = heapq.nlargest(limit, fused, key=fused.get)
+    return [dict(rows[key], score=-fused[key]) for key in best]
+
+
+def run_searches(
+    conn: sqlite3.Connection,
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    schema: str = "main",
+    unified: bool = False,
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    semantic: bool = False,
+    hybrid: bool = False,
+    facets: Optional[Dict[str, str]] = None,
+    profile: Optional[Dict[str, Dict]] = None
+) -> Dict[str, List[Dict]]:
+    """Run every search selected by ``artifact_type`` against one schema.
+
+    Tables missing from older indexes yield empty result lists. With
+    ``unified``, ``semantic`` or ``hybrid``, artifacts come back as one
+    cross-type list under "ranked". ``facets`` (file, session, since,
+    until) narrow the search to matching handoffs; with no query text they
+    list those handoffs newest first. Saved questions ("past_queries") are
+    searched only when neither a type nor facets narrow the search.
+
+    Given a ``profile`` dict, each search is timed and its statements are
+    explained into ``profile[key]`` (see ``describe_statements``).
+    """
+    opts = {"schema": schema, "weights": weights, "highlight": highlight}
+    if facets and not query.strip():
+        searches = [("handoffs", lambda: list_handoffs(conn, outcome, limit, schema, facets))]
+    elif hybrid:
+        searches = [("ranked", lambda: search_hybrid(conn, query, artifact_type, outcome, limit, **opts, facets=facets))]
+    elif semantic:
+        searches = [("ranked", lambda: search_semantic(conn, query, artifact_type, outcome, limit, schema, facets))]
+    elif unified:
+        searches = [("ranked", lambda: search_unified(conn, query, artifact_type, outcome, limit, **opts, facets=facets))]
+    else:
+        searches = []
+        if artifact_type in ["handoffs", "all"]:
+            searches.append(("handoffs", lambda: search_handoffs(conn, query, outcome, limit, **opts, facets=facets)))
+        if not facets:
+            if artifact_type in ["specs", "all"]:
+                searches.append(("specs", lambda: search_specs(conn, query, limit, **opts)))
+            if artifact_type in ["plans", "all"]:
+                searches.append(("plans", lambda: search_plans(conn, query, limit, **opts)))
+            if artifact_type in ["continuity", "all"]:
+                searches.append(("continuity", lambda: search_continuity(conn, query, limit, **opts)))
+            if artifact_type in ["reasoning", "all"]:
+                searches.append(("reasoning", lambda: search_reasoning(conn, query, outcome, limit, **opts)))
+                searches.append(("attempts", lambda: search_attempts(conn, query, outcome, limit, **opts)))
+    if not facets and artifact_type == "all":
+        searches.insert(0, ("past_queries", lambda: search_past_queries(conn, query, **opts)))
+
+    results = {}
+    for key, search in searches:
+        statements: List[str] = []
+        if profile is not None:
+            conn.set_trace_callback(statements.append)
+        start = time.perf_counter()
+        try:
+            results[key] = search()
+        except sqlite3.OperationalError:
+            results[key] = []
+        if profile is not None:
+            elapsed = time.perf_counter() - start
+            conn.set_trace_callback(None)
+            profile[key] = {
+                "wall_ms": elapsed * 1000,
+                "rows_returned": len(results[key]),
+                **describe_statements(conn, statements, schema),
+            }
+    return results
+
+
+# Sections with keyset paging, and the --type that selects each
+PAGED_SECTIONS = {
+    "handoffs": "handoffs", "specs": "specs", "plans": "plans",
+    "continuity": "continuity", "reasoning": "reasoning", "attempts": "reasoning",
+}
+
+
+def stream_searches(
+    conn: sqlite3.Connection,
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    after: Optional[Tuple[float, int]] = None,
+    schema: str = "main",
+    unified: bool = False,
+    weights: Optional[Dict[str, float]] = None,
+    highlight: bool = False,
+    semantic: bool = False,
+    hybrid: bool = False,
+    facets: Optional[Dict[str, str]] = None
+) -> Iterator[Tuple[str, Dict]]:
+    """Yield (section, row) pairs as the per-type cursors produce them.
+
+    Memory stays flat however many rows match (``limit`` 0 = all of them).
+    ``after`` is the (score, rowid) of the last row already seen and needs
+    a --type with a single section. Ranked and facet-listing modes are
+    computed whole, then yielded.
+    """
+    if unified or semantic or hybrid or (facets and not query.strip()):
+        if after is not None:
+            raise ValueError("--after pages the per-type keyword searches only")
+        results = run_searches(
+            conn, query, artifact_type, outcome, limit, schema, unified,
+            weights, highlight, semantic, hybrid, facets
+        )
+        for section, rows in results.items():
+            for row in rows:
+                yield section, row
+        return
+
+    opts = {"schema": schema, "weights": weights, "highlight": highlight,
+            "after": after, "stream": True}
+    searches = {
+        "handoffs": lambda: search_handoffs(conn, query, outcome, limit, **opts, facets=facets),
+        "specs": lambda: search_specs(conn, query, limit, **opts),
+        "plans": lambda: search_plans(conn, query, limit, **opts),
+        "continuity": lambda: search_continuity(conn, query, limit, **opts),
+        "reasoning": lambda: search_reasoning(conn, query, outcome, limit, **opts),
+        "attempts": lambda: search_attempts(conn, query, outcome, limit, **opts),
+    }
+    sections = [
+        section for section, selected_by in PAGED_SECTIONS.items()
+        if artifact_type in (selected_by, "all") and (not facets or section == "handoffs")
+    ]
+    if after is not None and len(sections) != 1:
+        raise ValueError(
+            "--after needs a single section: --type handoffs, specs, plans or continuity"
+        )
+    for section in sections:
+        try:
+            for row in searches[section]():
+                yield section, row
+        except sqlite3.OperationalError:
+            continue
+
+
+# =============================================================================
+# Profiling
+# =============================================================================
+
+# FTS5 tables and the (expanded) MATCH expression in traced statements
+TRACED_MATCH = re.compile(r"\b(\w+)_fts MATCH '((?:[^']|'')*)'")
+
+# Plan steps reading a whole table; FTS5 index lookups and one-row
+# bookkeeping tables don't count
+FULL_SCAN = re.compile(r"SCAN (?!.*(?:VIRTUAL TABLE|_fts_config|index_state))")
+
+
+def describe_statements(
+    conn: sqlite3.Connection,
+    statements: List[str],
+    schema: str = "main"
+) -> Dict:
+    """Explain the queries a search ran.
+
+    Returns the query plan steps (``plan``), how many of them scan a whole
+    table (``full_scans``) and how many rows each FTS MATCH produced before
+    ranking and LIMIT (``fts_matches``) - the rows SQLite had to consider.
+    """
+    plan: List[str] = []
+    matches: Dict[str, int] = {}
+    for sql in statements:
+        if not sql.lstrip().upper().startswith(("SELECT", "WITH")):
+            continue
+        try:
+            plan.extend(row[3] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}"))
+        except sqlite3.Error:
+            continue
+        for table, expression in TRACED_MATCH.findall(sql):
+            if table in matches:
+                continue
+            try:
+                matches[table] = conn.execute(
+                    f"SELECT count(*) FROM {schema}.{table}_fts WHERE {table}_fts MATCH ?",
+                    (expression.replace("''", "'"),)
+                ).fetchone()[0]
+            except sqlite3.Error:
+                pass
+    return {
+        "plan": plan,
+        "full_scans": sum(1 for step in plan if FULL_SCAN.match(step)),
+        "fts_matches": sum(matches.values()) if matches else None,
+    }
+
+
+def format_profile(profile: Dict[str, Dict]) -> str:
+    """Render a --profile report."""
+    output = ["## Profile", ""]
+    output.append(f"{'section':<14}{'ms':>9}{'rows':>7}{'matches':>9}{'scans':>7}")
+    for key, entry in profile.items():
+        matches = entry.get("fts_matches")
+        output.append(
+            f"{key:<14}{entry['wall_ms']:>9.2f}{entry.get('rows_returned', ''):>7}"
+            f"{'' if matches is None else matches:>9}{entry.get('full_scans', ''):>7}"
+        )
+    total = sum(entry["wall_ms"] for entry in profile.values())
+    output.append(f"{'total':<14}{total:>9.2f}")
+    for key, entry in profile.items():
+        if entry.get("plan"):
+            output.append("")
+            output.append(f"{key}:")
+            output.extend(f"  {step}" for step in entry["plan"])
+    return "\n".join(output)
+
+
+def record_metrics(
+    conn: sqlite3.Connection,
+    query: str,
+    profile: Dict[str, Dict]
+) -> None:
+    """Append a profile to the query_metrics table.
+
+    Raises sqlite3.OperationalError for indexes built before the table
+    existed; any artifact_index.py run adds it.
+    """
+    generation = content_generation(conn)
+    conn.executemany("""
+        INSERT INTO query_metrics
+        (query, section, wall_ms, rows_returned, fts_matches, full_scans, generation)
+        VALUES (?, ?, ?, ?, ?, ?, ?)
+    """, [
+        (query, key, entry["wall_ms"], entry.get("rows_returned"),
+         entry.get("fts_matches"), entry.get("full_scans"), generation)
+        for key, entry in profile.items()
+    ])
+    conn.commit()
+
+
+def metrics_stats(conn: sqlite3.Connection, days: int = 30) -> List[Dict]:
+    """Daily latency percentiles per section over the last ``days`` days."""
+    samples: Dict[tuple, List[float]] = {}
+    for day, section, wall_ms in conn.execute("""
+        SELECT date(recorded_at), section, wall_ms FROM query_metrics
+        WHERE recorded_at >= datetime('now', ?)
+        ORDER BY recorded_at
+    """, (f"-{days} days",)):
+        samples.setdefault((day, section), []).append(wall_ms)
+
+    stats = []
+    for (day, section), values in samples.items():
+        values.sort()
+        cuts = statistics.quantiles(values, n=100, method="inclusive") if len(values) > 1 else values * 99
+        stats.append({
+            "day": day, "section": section, "queries": len(values),
+            "p50_ms": cuts[49], "p95_ms": cuts[94], "max_ms": values[-1],
+        })
+    return stats
+
+
+def format_stats(stats: List[Dict]) -> str:
+    """Render the --stats report."""
+    if not stats:
+        return "No query metrics recorded yet. Search with --record to collect them."
+    output = [f"{'day':<12}{'section':<14}{'queries':>8}{'p50 ms':>9}{'p95 ms':>9}{'max ms':>9}"]
+    for row in stats:
+        output.append(
+            f"{row['day']:<12}{row['section']:<14}{row['queries']:>8}"
+            f"{row['p50_ms']:>9.2f}{row['p95_ms']:>9.2f}{row['max_ms']:>9.2f}"
+        )
+    return "\n".join(output)
+
+
+# =============================================================================
+# Result cache
+# =============================================================================
+
+CACHE_ENTRIES = 512
+
+
+def content_generation(conn: sqlite3.Connection, schema: str = "main") -> Optional[str]:
+    """Identify the indexed artifacts' current contents; None for indexes
+    that predate it.
+
+    The indexer bumps the generation on every write, and the epoch differs
+    between databases, so equal values mean identical artifacts.
+    """
+    try:
+        row = conn.execute(f"SELECT epoch, generation FROM {schema}.index_state").fetchone()
+    except sqlite3.OperationalError:
+        return None
+    return f"{row[0]}:{row[1]}" if row else None
+
+
+def index_generation(conn: sqlite3.Connection, schema: str = "main") -> Optional[str]:
+    """Identify everything a search can return: the artifacts plus the
+    saved queries behind "Previously Asked". Equal values mean identical
+    search results."""
+    generation = content_generation(conn, schema)
+    if generation is None:
+        return None
+    try:
+        saved = conn.execute(f"SELECT saved FROM {schema}.index_state").fetchone()[0]
+    except sqlite3.OperationalError:  # Index not yet migrated
+        return generation
+    return f"{generation}:{saved}"
+
+
+def cache_key(
+    query: str,
+    artifact_type: str,
+    outcome: Optional[str],
+    limit: int,
+    options: Dict
+) -> str:
+    """Key a search by everything that affects its results.
+
+    Words are OR-ed together and matched case-insensitively, so their order
+    and case don't matter. ``options`` are the extra ``run_searches``
+    arguments (unified, semantic, hybrid, weights, highlight).
+    """
+    words = sorted(word.lower() for word in query.split())
+    return json.dumps([words, artifact_type, outcome, limit, options], sort_keys=True)
+
+
+class QueryCache:
+    """LRU cache of search results, stored beside the index it caches.
+
+    It lives in its own database so searches can keep read-only
+    connections to the index. Entries from older index generations are
+    treated as misses and pruned on the next write.
+    """
+
+    def __init__(self, db_path: Path, max_entries: int = CACHE_ENTRIES):
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(db_path.with_suffix(".cache.db"), timeout=1.0)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = OFF")  # Losing a cache is harmless
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS query_cache (
+                key TEXT PRIMARY KEY,
+                generation TEXT NOT NULL,
+                results TEXT NOT NULL,
+                hits INTEGER NOT NULL DEFAULT 0,
+                last_used REAL NOT NULL
+            )
+        """)
+        self.conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_query_cache_used ON query_cache(last_used)"
+        )
+        self.conn.commit()
+
+    def get(self, key: str, generation: str) -> Optional[Dict[str, List[Dict]]]:
+        row = self.conn.execute(
+            "SELECT results FROM query_cache WHERE key = ? AND generation = ?",
+            (key, generation)
+        ).fetchone()
+        if row is None:
+            return None
+        self.conn.execute(
+            "UPDATE query_cache SET hits = hits + 1, last_used = ? WHERE key = ?",
+            (time.time(), key)
+        )
+        self.conn.commit()
+        return json.loads(row[0])
+
+    def put(self, key: str, generation: str, results: Dict[str, List[Dict]]) -> None:
+        self.conn.execute("DELETE FROM query_cache WHERE generation != ?", (generation,))
+        self.conn.execute(
+            "INSERT OR REPLACE INTO query_cache (key, generation, results, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (key, generation, json.dumps(results, default=str), time.time())
+        )
+        self.conn.execute("""
+            DELETE FROM query_cache WHERE key IN (
+                SELECT key FROM query_cache ORDER BY last_used DESC LIMIT -1 OFFSET ?
+            )
+        """, (self.max_entries,))
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_cache(db_path: Path) -> Optional[QueryCache]:
+    """Open the result cache for an index, or None if it can't be written."""
+    try:
+        return QueryCache(db_path)
+    except sqlite3.Error:
+        return None
+
+
+def cached_searches(
+    conn: sqlite3.Connection,
+    cache: Optional[QueryCache],
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    **options
+) -> Dict[str, List[Dict]]:
+    """``run_searches`` with results served from and saved to ``cache``.
+
+    A hit costs two primary-key lookups and no FTS work.
+    """
+    generation = index_generation(conn) if cache is not None else None
+    if generation is None:
+        return run_searches(conn, query, artifact_type, outcome, limit, **options)
+
+    key = cache_key(query, artifact_type, outcome, limit, options)
+    try:
+        results = cache.get(key, generation)
+    except sqlite3.Error:
+        results = None
+    if results is None:
+        results = run_searches(conn, query, artifact_type, outcome, limit, **options)
+        try:
+            cache.put(key, generation, results)
+        except sqlite3.Error:
+            pass
+    return results
+
+
+# =============================================================================
+# Federated search
+# =============================================================================
+
+def expand_federation(patterns: List[str]) -> List[Path]:
+    """Expand --federate arguments into existing index databases.
+
+    Each pattern may be a database file, a project root (the default index
+    location is appended), or a glob of either.
+    """
+    found: Dict[Path, None] = {}
+    for pattern in patterns:
+        expanded = os.path.expanduser(pattern)
+        matches = globmod.glob(expanded, recursive=True) if globmod.has_magic(expanded) else [expanded]
+        for match in sorted(matches):
+            path = Path(match)
+            if path.is_dir():
+                path = path / DEFAULT_DB
+            if path.is_file():
+                found.setdefault(path.resolve(), None)
+    return list(found)
+
+
+def project_name(db_path: Path) -> str:
+    """Label results with the project that owns the index."""
+    if db_path.parts[-len(DEFAULT_DB.parts):] == DEFAULT_DB.parts:
+        return str(db_path.parents[len(DEFAULT_DB.parts) - 1])
+    return str(db_path)
+
+
+def attach_limit(conn: sqlite3.Connection) -> int:
+    """Maximum number of databases one connection can ATTACH."""
+    try:
+        return conn.getlimit(sqlite3.SQLITE_LIMIT_ATTACHED)
+    except AttributeError:  # Python < 3.11
+        return 10
+
+
+def merge_results(per_db: List[Dict[str, List[Dict]]], limit: int) -> Dict[str, List[Dict]]:
+    """Merge per-database results into a global top-k per type.
+
+    FTS5 rank is bm25 (lower is better), so the k smallest scores win.
+    """
+    merged: Dict[str, List[Dict]] = {}
+    for results in per_db:
+        for key, rows in results.items():
+            merged.setdefault(key, []).extend(rows)
+    return {
+        key: heapq.nsmallest(
+            2 if key == "past_queries" else limit, rows, key=lambda r: r["score"]
+        )
+        for key, rows in merged.items()
+    }
+
+
+def tag_project(results: Dict[str, List[Dict]], project: str) -> Dict[str, List[Dict]]:
+    for rows in results.values():
+        for row in rows:
+            row["project"] = project
+    return results
+
+
+def federated_search(
+    db_paths: List[Path],
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    **options
+) -> Dict[str, List[Dict]]:
+    """Search many project indexes from one connection via ATTACH.
+
+    Databases are attached read-only in batches of SQLite's ATTACH limit,
+    each batch is searched, then detached before the next.
+    """
+    conn = sqlite3.connect(":memory:", uri=True)
+    batch_size = attach_limit(conn)
+    per_db = []
+    try:
+        for start in range(0, len(db_paths), batch_size):
+            batch = db_paths[start:start + batch_size]
+            schemas = [f"p{i}" for i in range(len(batch))]
+            for schema, path in zip(schemas, batch):
+                conn.execute("ATTACH DATABASE ? AS " + schema, (f"{path.as_uri()}?mode=ro",))
+            for schema, path in zip(schemas, batch):
+                results = run_searches(
+                    conn, query, artifact_type, outcome, limit, schema, **options
+                )
+                per_db.append(tag_project(results, project_name(path)))
+            for schema in schemas:
+                conn.execute("DETACH DATABASE " + schema)
+    finally:
+        conn.close()
+    return merge_results(per_db, limit)
+
+
+def parallel_search(
+    db_paths: List[Path],
+    query: str,
+    artifact_type: str = "all",
+    outcome: Optional[str] = None,
+    limit: int = 5,
+    workers: Optional[int] = None,
+    **options
+) -> Dict[str, List[Dict]]:
+    """Search many project indexes with one reader thread per database."""
+    def search_one(path: Path) -> Dict[str, List[Dict]]:
+        conn = sqlite3.connect(f"{path.as_uri()}?mode=ro", uri=True)
+        try:
+            results = run_searches(conn, query, artifact_type, outcome, limit, **options)
+        finally:
+            conn.close()
+        return tag_project(results, project_name(path))
+
+    with ThreadPoolExecutor(max_workers=workers or min(32, len(db_paths))) as pool:
+        per_db = list(pool.map(search_one, db_paths))
+    return merge_results(per_db, limit)
+
+
+# =============================================================================
+# Output
+# =============================================================================
+
+def artifact_location(row: Dict) -> str:
+    """File path of a result, prefixed with its project when federated."""
+    file_path = row.get("file_path") or ""
+    if row.get("project"):
+        return str(Path(row["project"]) / file_path)
+    return file_path
 
 
 def format_results(results: Dict) -> str:
     """Format search results for display."""
     output = []
-    
+
     # Past queries (compound learning)
     if results.get("past_queries"):
         output.append("## Previously Asked")
@@ -158,7 +1303,19 @@ def format_results(results: Dict) -> str:
             output.append(f"- **Q:** {question}...")
             output.append(f"  **A:** {answer}...")
         output.append("")
-    
+
+    # Unified cross-type ranking
+    if results.get("ranked"):
+        output.append("## Ranked Results")
+        for r in results["ranked"]:
+            label = r.get("artifact_type", "").rstrip("s").capitalize()
+            output.append(f"### [{label}] {r.get('title') or 'Untitled'} ({-r['score']:.2f})")
+            summary = " ".join((r.get("summary") or "").split())[:200]
+            if summary:
+                output.append(f"**Summary:** {summary}")
+            output.append(f"**File:** `{artifact_location(r)}`")
+            output.append("")
+
     # Handoffs
     if results.get("handoffs"):
         output.append("## Relevant Handoffs")
@@ -183,9 +1340,9 @@ def format_results(results: Dict) -> str:
             if what_failed:
                 output.append(f"**What failed:** {what_failed[:200]}")
             
-            output.append(f"**File:** `{h.get('file_path', '')}`")
+            output.append(f"**File:** `{artifact_location(h)}`")
             output.append("")
-    
+
     # Specs
     if results.get("specs"):
         output.append("## Relevant Specs")
@@ -199,9 +1356,9 @@ def format_results(results: Dict) -> str:
             if behavior:
                 output.append(f"**Behavior:** {behavior}")
             
-            output.append(f"**File:** `{s.get('file_path', '')}`")
+            output.append(f"**File:** `{artifact_location(s)}`")
             output.append("")
-    
+
     # Plans
     if results.get("plans"):
         output.append("## Relevant Plans")
@@ -211,15 +1368,17 @@ def format_results(results: Dict) -> str:
             
             overview = p.get("overview", "")[:200]
             output.append(f"**Overview:** {overview}")
-            output.append(f"**File:** `{p.get('file_path', '')}`")
+            output.append(f"**File:** `{artifact_location(p)}`")
             output.append("")
-    
+
     # Continuity
     if results.get("continuity"):
         output.append("## Related Sessions")
         for c in results["continuity"]:
             session = c.get("session_name", "unknown")
             output.append(f"### Session: {session}")
+            if c.get("project"):
+                output.append(f"**Project:** `{c['project']}`")
             
             goal = c.get("goal", "")[:200]
             output.append(f"**Goal:** {goal}")
@@ -228,42 +1387,334 @@ def format_results(results: Dict) -> str:
             if key_learnings:
                 output.append(f"**Key learnings:** {key_learnings[:200]}")
             output.append("")
-    
+
+    # Commit reasoning
+    if results.get("reasoning"):
+        output.append("## Commit Reasoning")
+        for r in results["reasoning"]:
+            status_icon = {
+                "AFTER_FAILURES": "✗→✓",
+                "FIRST_TRY": "✓",
+            }.get(r.get("outcome"), "?")
+            commit = (r.get("commit_hash") or "")[:8]
+            date = (r.get("committed_at") or "unknown date")[:10]
+            output.append(f"### [{status_icon}] Commit `{commit}` - {date}")
+            subject = r.get("subject") or "Unknown commit"
+            output.append(f"**{subject}** (by {r.get('author') or 'Unknown'})")
+            
+            excerpt = " ".join((r.get("excerpt") or "").split())
+            if excerpt:
+                output.append(f"**Excerpt:** {excerpt}")
+            output.append(f"**File:** `{artifact_location(r)}`")
+            output.append("")
+
+    # Uncommitted attempts
+    if results.get("attempts"):
+        output.append("## Recent Build/Test Attempts")
+        for a in results["attempts"]:
+            status_icon = "✗" if (a.get("attempt_type") or "").endswith("_fail") else "✓"
+            command = (a.get("command") or "")[:80]
+            output.append(f"- {status_icon} `{command}` ({a.get('branch')}, {a.get('timestamp')})")
+            if a.get("error"):
+                output.append(f"  **Error:** {a['error'][:200]}")
+        output.append("")
+
     if not any(results.values()):
         output.append("No relevant precedent found.")
         output.append("")
         output.append("**Tip:** Run `uv run python tools/artifact_index.py --all` to index existing artifacts.")
-    
+
     return "\n".join(output)
 
 
+# =============================================================================
+# Saved queries
+# =============================================================================
+
+MINHASH_PERMUTATIONS = 64
+MINHASH_BANDS = 8  # 8 bands of 8 rows: pairs above ~0.77 similarity share a bucket
+NEAR_DUPLICATE = 0.8  # Estimated Jaccard similarity merged as the same question
+
+# Words of a question as compared for sameness: IDs, versions and paths
+# (SPEC-042, feature-auth-v2, src/app.py) stay whole, and nothing is dropped
+QUESTION_TOKEN = re.compile(r"[a-z0-9_]+(?:[-./:][a-z0-9_]+)*")
+# Words that flip a question's meaning; "t" is what QUESTION_TOKEN leaves of n't
+NEGATIONS = frozenset({"no", "not", "never", "none", "nor", "without", "cannot", "t"})
+
+_MERSENNE_61 = (1 << 61) - 1
+_seeded = random.Random(0x5DD)
+PERMUTATIONS = [
+    (_seeded.randrange(1, _MERSENNE_61), _seeded.randrange(0, _MERSENNE_61))
+    for _ in range(MINHASH_PERMUTATIONS)
+]
+
+
+def question_shingles(question: str) -> set:
+    """Character 4-grams of the question's words, stopwords dropped, so
+    word order, case and small wording changes barely matter."""
+    shingles = set()
+    for word in WORD.findall(question.lower()):
+        if word not in STOPWORDS:
+            padded = f" {word} "
+            shingles.update(padded[i:i + 4] for i in range(len(padded) - 3))
+    return shingles or {question.lower()}
+
+
+def minhash(question: str) -> List[int]:
+    """MinHash signature of a question's shingles."""
+    hashes = [
+        int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), "little")
+        for shingle in question_shingles(question)
+    ]
+    return [
+        min((a * h + b) % _MERSENNE_61 for h in hashes)
+        for a, b in PERMUTATIONS
+    ]
+
+
+def question_tokens(question: str) -> frozenset:
+    """The question's words, ignoring case, order and repeats. Two questions
+    are the same question only if these are equal."""
+    return frozenset(QUESTION_TOKEN.findall(question.lower()))
+
+
+def question_anchors(question: str) -> frozenset:
+    """The words a near-duplicate must share exactly: IDs, versions and
+    paths (anything with a digit or a separator) and negations."""
+    return frozenset(
+        token for token in question_tokens(question)
+        if token in NEGATIONS or any(c.isdigit() or c in "-./:" for c in token)
+    )
+
+
+def signature_similarity(first: List[int], second: List[int]) -> float:
+    """Estimated Jaccard similarity of the questions behind two signatures."""
+    return sum(x == y for x, y in zip(first, second)) / MINHASH_PERMUTATIONS
+
+
+def band_buckets(signature: List[int]) -> List[Tuple[int, int]]:
+    """(band, bucket) pairs for LSH lookup, buckets as signed 64-bit ints."""
+    rows = MINHASH_PERMUTATIONS // MINHASH_BANDS
+    return [
+        (band, int.from_bytes(hashlib.blake2b(
+            array("Q", signature[band * rows:(band + 1) * rows]).tobytes(), digest_size=8
+        ).digest(), "little", signed=True))
+        for band in range(MINHASH_BANDS)
+    ]
+
+
+def find_similar_queries(
+    conn: sqlite3.Connection,
+    question: str,
+    signature: Optional[List[int]] = None
+) -> Tuple[Optional[Dict], Optional[Dict]]:
+    """(same, similar): the saved question this one duplicates, and
+    otherwise the most similar one at or above NEAR_DUPLICATE. A duplicate
+    takes this question's answer on --save; --reuse also needs identical
+    words (``is_same_question``).
+
+    Candidates come from the band index, so only questions sharing a
+    bucket are compared. A question is the same if it has exactly the same
+    words, or is a near-duplicate (at or above NEAR_DUPLICATE) with the same
+    IDs, versions, paths and negations; SPEC-042 / SPEC-043 or "fail" /
+    "not fail" are only similar, and never share an answer.
+    """
+    signature = signature if signature is not None else minhash(question)
+    tokens = question_tokens(question)
+    anchors = question_anchors(question)
+    buckets = band_buckets(signature)
+    candidates = fetch_dicts(conn, f"""
+        SELECT q.id, q.question, q.answer, q.signature, q.search_options, q.generation
+        FROM queries q
+        WHERE q.id IN (
+            SELECT query_id FROM query_bands
+            WHERE (band, bucket) IN (VALUES {", ".join("(?, ?)" for _ in buckets)})
+        )
+    """, [value for pair in buckets for value in pair])
+    same, same_similarity = None, NEAR_DUPLICATE
+    best, best_similarity = None, NEAR_DUPLICATE
+    for candidate in candidates:
+        if question_tokens(candidate["question"] or "") == tokens:
+            return candidate, None
+        similarity = signature_similarity(signature, list(array("Q", candidate["signature"])))
+        if question_anchors(candidate["question"] or "") == anchors:
+            if similarity >= same_similarity:
+                same, same_similarity = candidate, similarity
+        elif similarity >= best_similarity:
+            best, best_similarity = candidate, similarity
+    return (same, None) if same is not None else (None, best)
+
+
+def saved_question_note(same: Optional[Dict], similar: Optional[Dict]) -> Optional[str]:
+    """The line naming a saved question that was the same or similar."""
+    if same is not None:
+        return f"[Asked before: {same['question']}]"
+    if similar is not None:
+        return f"[Similar saved question: {similar['question']}]"
+    return None
+
+
+def search_options_key(
+    artifact_type: str,
+    outcome: Optional[str],
+    limit: int,
+    options: Dict
+) -> str:
+    """What, besides the question, a saved answer depends on."""
+    return json.dumps([artifact_type, outcome, limit, options], sort_keys=True)
+
+
+def is_same_question(saved: Dict, question: str) -> bool:
+    """Whether a saved question has exactly the words of ``question``; only
+    then may its answer stand in for a search (--reuse)."""
+    return question_tokens(saved["question"] or "") == question_tokens(question)
+
+
+def is_current(conn: sqlite3.Connection, saved: Dict, search_options: str) -> bool:
+    """Whether searching again would give a saved answer: same search
+    options, and no artifacts reindexed since."""
+    return (
+        saved["search_options"] == search_options
+        and saved["generation"] == content_generation(conn)
+    )
+
+
+def backfill_signatures(conn: sqlite3.Connection) -> None:
+    """Sign questions saved before near-duplicate detection existed."""
+    for query_id, question in conn.execute(
+        "SELECT id, question FROM queries WHERE signature IS NULL"
+    ).fetchall():
+        signature = minhash(question or "")
+        conn.execute(
+            "UPDATE queries SET signature = ? WHERE id = ?",
+            (array("Q", signature).tobytes(), query_id)
+        )
+        conn.executemany(
+            "INSERT OR IGNORE INTO query_bands (band, bucket, query_id) VALUES (?, ?, ?)",
+            [(band, bucket, query_id) for band, bucket in band_buckets(signature)]
+        )
+
+
+def record_reuse(conn: sqlite3.Connection, query_id: str) -> None:
+    """Count another ask of a saved question whose answer was reused."""
+    conn.execute("UPDATE queries SET times_asked = times_asked + 1 WHERE id = ?", (query_id,))
+    conn.commit()
+
+
 def save_query(
     conn: sqlite3.Connection,
     question: str,
     answer: str,
-    matches: Dict
+    matches: Dict,
+    search_options: Optional[str] = None
 ):
-    """Save query for compound learning."""
-    query_id = hashlib.md5(
-        f"{question}{datetime.now().isoformat()}".encode()
-    ).hexdigest()[:12]
-    
-    conn.execute("""
-        INSERT INTO queries (id, question, answer, handoffs_matched, plans_matched,
-                           specs_matched, continuity_matched)
-        VALUES (?, ?, ?, ?, ?, ?, ?)
-    """, (
-        query_id,
-        question,
-        answer,
+    """Save query for compound learning.
+
+    The same question, or a near-duplicate of it (see find_similar_queries),
+    updates its saved row (new answer, one more ask) instead of adding a
+    copy. Any other question gets its own row.
+    """
+    matched = (
         json.dumps([h["id"] for h in matches.get("handoffs", [])]),
         json.dumps([p["id"] for p in matches.get("plans", [])]),
         json.dumps([s["id"] for s in matches.get("specs", [])]),
         json.dumps([c["id"] for c in matches.get("continuity", [])]),
-    ))
+    )
+    signature = minhash(question)
+    try:
+        backfill_signatures(conn)
+        duplicate, _ = find_similar_queries(conn, question, signature)
+    except sqlite3.OperationalError:  # Index not yet migrated: plain insert
+        duplicate = None
+        signature = None
+
+    if duplicate is not None:
+        conn.execute("""
+            UPDATE queries SET answer = ?, handoffs_matched = ?, plans_matched = ?,
+                specs_matched = ?, continuity_matched = ?, search_options = ?,
+                generation = ?, times_asked = times_asked + 1
+            WHERE id = ?
+        """, (answer, *matched, search_options, content_generation(conn), duplicate["id"]))
+    else:
+        query_id = hashlib.md5(
+            f"{question}{datetime.now().isoformat()}".encode()
+        ).hexdigest()[:12]
+        if signature is None:
+            conn.execute("""
+                INSERT INTO queries (id, question, answer, handoffs_matched, plans_matched,
+                                   specs_matched, continuity_matched)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            """, (query_id, question, answer, *matched))
+        else:
+            conn.execute("""
+                INSERT INTO queries (id, question, answer, handoffs_matched, plans_matched,
+                                   specs_matched, continuity_matched, signature,
+                                   search_options, generation)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+            """, (query_id, question, answer, *matched, array("Q", signature).tobytes(),
+                  search_options, content_generation(conn)))
+            conn.executemany(
+                "INSERT OR IGNORE INTO query_bands (band, bucket, query_id) VALUES (?, ?, ?)",
+                [(band, bucket, query_id) for band, bucket in band_buckets(signature)]
+            )
+    # Saved questions appear in later searches, so cached results are stale
+    try:
+        conn.execute("UPDATE index_state SET saved = saved + 1")
+    except sqlite3.OperationalError:
+        try:
+            conn.execute("UPDATE index_state SET generation = generation + 1")
+        except sqlite3.OperationalError:
+            pass
     conn.commit()
 
 
+def facet_date(value: str, end: bool = False) -> str:
+    """Normalize a --since/--until value to the index's timestamp format.
+
+    With ``end``, the result is an exclusive bound: the next day for a bare
+    date, the next second for a datetime.
+    """
+    try:
+        when = datetime.fromisoformat(value)
+    except ValueError:
+        raise ValueError(f"expected an ISO date or datetime, got {value!r}") from None
+    if when.tzinfo is not None:
+        when = when.astimezone(timezone.utc)
+    if end:
+        bare_date = not any(c in value for c in "T :")
+        when += timedelta(days=1) if bare_date else timedelta(seconds=1)
+    return when.strftime("%Y-%m-%d %H:%M:%S")
+
+
+def stream_rows(
+    conn: sqlite3.Connection,
+    query: str,
+    args: argparse.Namespace,
+    after: Optional[Tuple[float, int]],
+    options: Dict
+) -> None:
+    """Print a streamed or paged search (--jsonl / --after).
+
+    With --after and a full page, the cursor for the next page goes to
+    stderr.
+    """
+    rows = stream_searches(conn, query, args.type, args.outcome, args.limit, after, **options)
+    last = None
+    count = 0
+    if args.jsonl:
+        for section, row in rows:
+            sys.stdout.write(json.dumps({"section": section, **row}, default=str) + "\n")
+            last, count = row, count + 1
+    else:
+        results: Dict[str, List[Dict]] = {}
+        for section, row in rows:
+            results.setdefault(section, []).append(row)
+            last, count = row, count + 1
+        print(json.dumps(results, indent=2, default=str) if args.json else format_results(results))
+    if after is not None and last is not None and count == args.limit:
+        print(f"Next page: --after={last['score']!r},{last['rowid']}", file=sys.stderr)
+
+
 def main():
     """Main entry point."""
     parser = argparse.ArgumentParser(
@@ -272,20 +1723,21 @@ def main():
     parser.add_argument("query", nargs="*", help="Search query")
     parser.add_argument(
         "--type",
-        choices=["handoffs", "plans", "specs", "continuity", "all"],
+        choices=["handoffs", "plans", "specs", "continuity", "reasoning", "all"],
         default="all",
         help="Type of artifacts to search"
     )
     parser.add_argument(
         "--outcome",
         choices=["SUCCEEDED", "PARTIAL", "FAILED"],
-        help="Filter handoffs by outcome"
+        help="Filter handoffs by outcome (reasoning: FAILED = needed retries, "
+             "SUCCEEDED = passed first try; attempts: failed or passing ones)"
     )
     parser.add_argument(
         "--limit",
         type=int,
         default=5,
-        help="Maximum results per type"
+        help="Maximum results per type (0 = no limit; per-type keyword searches only)"
     )
     parser.add_argument("--db", type=str, help="Custom database path")
     parser.add_argument(
@@ -298,68 +1750,304 @@ def main():
         action="store_true",
         help="Output as JSON"
     )
-    
+    parser.add_argument(
+        "--jsonl",
+        action="store_true",
+        help="Stream one JSON object per result line, tagged with its section"
+    )
+    parser.add_argument(
+        "--after",
+        metavar="SCORE,ROWID",
+        help="Resume after this row (its score and rowid) to page through one type"
+    )
+    parser.add_argument(
+        "--federate",
+        action="append",
+        metavar="PATH",
+        help="Search other project indexes (db file, project root, or glob; repeatable)"
+    )
+    parser.add_argument(
+        "--parallel",
+        action="store_true",
+        help="With --federate, use one reader thread per database instead of ATTACH"
+    )
+    ranking = parser.add_mutually_exclusive_group()
+    ranking.add_argument(
+        "--unified",
+        action="store_true",
+        help="Rank all selected artifact types together in one list"
+    )
+    ranking.add_argument(
+        "--semantic",
+        action="store_true",
+        help="Rank by vector similarity instead of keyword match (needs NumPy)"
+    )
+    ranking.add_argument(
+        "--hybrid",
+        action="store_true",
+        help="Fuse keyword and vector rankings into one list (needs NumPy)"
+    )
+    parser.add_argument(
+        "--weight",
+        action="append",
+        metavar="COLUMN=W",
+        help="Override a column's bm25 weight, e.g. what_failed=3 (repeatable)"
+    )
+    parser.add_argument(
+        "--highlight",
+        action="store_true",
+        help="Mark matched terms in excerpts with **bold**"
+    )
+    parser.add_argument(
+        "--file",
+        metavar="PATH",
+        help="Only handoffs that modified PATH (a file, a directory ending in /, or a glob)"
+    )
+    parser.add_argument(
+        "--session",
+        help="Only handoffs from this session"
+    )
+    parser.add_argument(
+        "--since",
+        metavar="DATE",
+        help="Only handoffs written on or after DATE (ISO date or datetime)"
+    )
+    parser.add_argument(
+        "--until",
+        metavar="DATE",
+        help="Only handoffs written on or before DATE (ISO date or datetime)"
+    )
+    parser.add_argument(
+        "--profile",
+        action="store_true",
+        help="Report per-section timings, FTS match counts and query plans (stderr)"
+    )
+    parser.add_argument(
+        "--record",
+        action="store_true",
+        help="Append this search's timings to the query_metrics table"
+    )
+    parser.add_argument(
+        "--stats",
+        action="store_true",
+        help="Report daily latency percentiles per section from query_metrics"
+    )
+    parser.add_argument(
+        "--days",
+        type=int,
+        default=30,
+        help="With --stats, how many days of metrics to report (default: 30)"
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Always run the searches instead of reusing cached results"
+    )
+    parser.add_argument(
+        "--reuse",
+        action="store_true",
+        help="Print the saved answer to this same question (same words, any order or "
+             "case) instead of searching, if nothing was reindexed since"
+    )
+    parser.add_argument(
+        "--no-server",
+        action="store_true",
+        help="Query the database directly instead of via the warm query server"
+    )
+
     args = parser.parse_args()
-    
-    if not args.query:
+
+    facets = {}
+    if args.file:
+        facets["file"] = args.file
+    if args.session:
+        facets["session"] = args.session
+    try:
+        if args.since:
+            facets["since"] = facet_date(args.since)
+        if args.until:
+            facets["until"] = facet_date(args.until, end=True)
+    except ValueError as e:
+        parser.error(str(e))
+
+    if args.stats:
+        db_path = get_db_path(args.db)
+        if not db_path.exists():
+            print(f"Database not found: {db_path}")
+            return
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+        try:
+            stats = metrics_stats(conn, args.days)
+        except sqlite3.OperationalError:
+            stats = []
+        conn.close()
+        print(json.dumps(stats, indent=2) if args.json else format_stats(stats))
+        return
+
+    if not args.query and not facets:
         parser.print_help()
         return
-    
+
+
     query = " ".join(args.query)
-    
-    db_path = get_db_path(args.db)
-    if not db_path.exists():
-        print(f"Database not found: {db_path}")
-        print("Run: uv run python tools/artifact_index.py --all")
-        return
-    
-    conn = sqlite3.connect(db_path)
-    
-    results = {}
-    
-    # Always check past queries first
-    try:
-        results["past_queries"] = search_past_queries(conn, query)
-    except sqlite3.OperationalError:
-        results["past_queries"] = []
-    
-    if args.type in ["handoffs", "all"]:
+
+    # Ranked and federated results are a top-N merge, which needs an N
+    if args.limit < 0:
+        parser.error("--limit must be 0 (no limit) or more")
+    if args.limit == 0 and (args.unified or args.semantic or args.hybrid or args.federate):
+        parser.error("--limit 0 (no limit) works with the per-type keyword searches only, "
+                     "not --unified, --semantic, --hybrid or --federate")
+
+    after = None
+    if args.after:
         try:
-            results["handoffs"] = search_handoffs(
-                conn, query, args.outcome, args.limit
-            )
-        except sqlite3.OperationalError:
-            results["handoffs"] = []
-    
-    if args.type in ["specs", "all"]:
+            score, rowid = args.after.split(",")
+            after = (float(score), int(rowid))
+        except ValueError:
+            parser.error(f"--after expects SCORE,ROWID, got {args.after!r}")
+
+    weights = {}
+    for spec in args.weight or []:
+        column, _, value = spec.partition("=")
         try:
-            results["specs"] = search_specs(conn, query, args.limit)
-        except sqlite3.OperationalError:
-            results["specs"] = []
-    
-    if args.type in ["plans", "all"]:
+            weights[column.strip()] = float(value)
+        except ValueError:
+            parser.error(f"--weight expects COLUMN=NUMBER, got {spec!r}")
+        if column.strip() not in weight_columns(args.type):
+            parser.error(
+                f"--weight: no column {column.strip()!r} in --type {args.type}; "
+                f"choose from: {', '.join(weight_columns(args.type))}"
+            )
+    options = {
+        "unified": args.unified, "semantic": args.semantic, "hybrid": args.hybrid,
+        "weights": weights, "highlight": args.highlight, "facets": facets,
+    }
+    if args.semantic or args.hybrid:
         try:
-            results["plans"] = search_plans(conn, query, args.limit)
-        except sqlite3.OperationalError:
-            results["plans"] = []
-    
-    if args.type in ["continuity", "all"]:
+            require_numpy()
+        except RuntimeError as e:
+            parser.error(str(e))
+
+    # Profiling measures the searches themselves: no server, no cache
+    profile = {} if args.profile or args.record else None
+    if profile is not None and args.federate:
+        parser.error("--profile and --record work on the local index only")
+
+    # Streaming and paging read straight off the cursors too
+    if args.jsonl or after is not None:
+        if args.federate:
+            parser.error("--jsonl and --after work on the local index only")
+        db_path = get_db_path(args.db)
+        if not db_path.exists():
+            print(f"Database not found: {db_path}")
+            return
+        conn = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
         try:
-            results["continuity"] = search_continuity(conn, query, args.limit)
-        except sqlite3.OperationalError:
-            results["continuity"] = []
-    
+            stream_rows(conn, query, args, after, options)
+        except ValueError as e:
+            parser.error(str(e))
+        finally:
+            conn.close()
+        return
+
+    same, similar = None, None
+    if args.federate:
+        db_paths = expand_federation(args.federate)
+        if not db_paths:
+            print(f"No artifact indexes matched: {' '.join(args.federate)}")
+            return
+        search = parallel_search if args.parallel else federated_search
+        results = search(db_paths, query, args.type, args.outcome, args.limit, **options)
+        
+        # Saving needs a local index; federated results are read-only otherwise
+        db_path = get_db_path(args.db)
+        conn = sqlite3.connect(db_path) if args.save and db_path.exists() else None
+    else:
+        db_path = get_db_path(args.db)
+        if not db_path.exists():
+            print(f"Database not found: {db_path}")
+            print("Run: uv run python tools/artifact_index.py --all")
+            return
+        
+        # Has this question, or one like it, been saved before? With
+        # --reuse, the identical question's still-current answer skips the
+        # search; a near-duplicate's answer is only pointed out
+        search_options = search_options_key(args.type, args.outcome, args.limit, options)
+        if query and not args.json and profile is None:
+            reader = sqlite3.connect(f"{db_path.resolve().as_uri()}?mode=ro", uri=True)
+            try:
+                same, similar = find_similar_queries(reader, query)
+            except sqlite3.OperationalError:  # Index not yet migrated
+                same, similar = None, None
+            reusable = (
+                args.reuse and same is not None and is_same_question(same, query)
+                and is_current(reader, same, search_options)
+            )
+            reader.close()
+            if reusable:
+                print(same["answer"])
+                print(f"\n[Reused the saved answer to: {same['question']}]")
+                if args.save:
+                    conn = sqlite3.connect(db_path)
+                    record_reuse(conn, same["id"])
+                    conn.close()
+                return
+
+        results = None
+        if not args.no_server and profile is None:
+            results = query_server(
+                db_path, query, args.type, args.outcome, args.limit,
+                not args.no_cache, **options
+            )
+        
+        conn = None
+        if profile is not None:
+            conn = sqlite3.connect(db_path)
+            results = run_searches(
+                conn, query, args.type, args.outcome, args.limit, **options, profile=profile
+            )
+        elif results is None:
+            conn = sqlite3.connect(db_path)
+            cache = None if args.no_cache else open_cache(db_path)
+            results = cached_searches(
+                conn, cache, query, args.type, args.outcome, args.limit, **options
+            )
+            if cache is not None:
+                cache.close()
+        elif args.save:
+            conn = sqlite3.connect(db_path)
+
+    start = time.perf_counter()
     if args.json:
         print(json.dumps(results, indent=2, default=str))
     else:
         formatted = format_results(results)
         print(formatted)
-        
-        if args.save:
-            save_query(conn, query, formatted, results)
-            print("\n[Query saved for compound learning]")
-    
-    conn.close()
+        note = saved_question_note(same, similar)
+        if note:
+            print(f"\n{note}")
+    if profile is not None:
+        profile["format"] = {"wall_ms": (time.perf_counter() - start) * 1000}
+        if args.profile:
+            print(format_profile(profile), file=sys.stderr)
+        if args.record:
+            try:
+                record_metrics(conn, query, profile)
+            except sqlite3.OperationalError:
+                print("query_metrics table missing; run: uv run python tools/artifact_index.py",
+                      file=sys.stderr)
+
+    if not args.json and args.save and conn is not None:
+        save_query(
+            conn, query, formatted, results,
+            # Federated answers come from other indexes, so are never reused
+            None if args.federate
+            else search_options_key(args.type, args.outcome, args.limit, options)
+        )
+        print("\n[Query saved for compound learning]")
+
+    if conn is not None:
+        conn.close()
 
 
 if __name__ == "__main__":
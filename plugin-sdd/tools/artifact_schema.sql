@@ -6,7 +6,12 @@
 -- - Plans (design documents)
 -- - Specs (behavioral specifications)
 -- - Continuity ledgers (session state snapshots)
--- - Queries (compound learning from Q&A)
+-- - Queries (compound learning from Q&A) and their latency metrics
+-- - Commit reasoning and build/test attempts (.git/claude/)
+-- - Manifest (source file fingerprints for incremental re-indexing)
+-- - Index state (generation counter for query result caches)
+-- - Vectors (hashed term frequencies for semantic search)
+-- - Handoff files (files_modified normalized for per-file lookups)
 --
 -- FTS5 is used for full-text search with porter stemming.
 
@@ -33,6 +38,21 @@ CREATE TABLE IF NOT EXISTS handoffs (
     indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- Facet lookups: outcome and session listings newest first
+CREATE INDEX IF NOT EXISTS idx_handoffs_outcome_created ON handoffs(outcome, created_at);
+CREATE INDEX IF NOT EXISTS idx_handoffs_session_created ON handoffs(session_name, created_at);
+CREATE INDEX IF NOT EXISTS idx_handoffs_created ON handoffs(created_at);
+
+-- Files listed in each handoff's files_modified, one row per file, for
+-- exact "which handoffs touched this file" lookups (kept in sync by triggers)
+CREATE TABLE IF NOT EXISTS handoff_files (
+    handoff_id TEXT NOT NULL,
+    path TEXT NOT NULL,
+    PRIMARY KEY (handoff_id, path)
+) WITHOUT ROWID;
+
+CREATE INDEX IF NOT EXISTS idx_handoff_files_path ON handoff_files(path);
+
 -- Plans (design documents)
 CREATE TABLE IF NOT EXISTS plans (
     id TEXT PRIMARY KEY,
@@ -77,6 +97,7 @@ CREATE TABLE IF NOT EXISTS specs (
 CREATE TABLE IF NOT EXISTS continuity (
     id TEXT PRIMARY KEY,
     session_name TEXT NOT NULL,
+    file_path TEXT,
     
     -- State
     goal TEXT,
@@ -108,10 +129,115 @@ CREATE TABLE IF NOT EXISTS queries (
     -- Feedback
     was_helpful BOOLEAN,
     
+    -- Near-duplicate merging and answer reuse (artifact_query.py)
+    signature BLOB,          -- MinHash of the question: uint64[64]
+    search_options TEXT,     -- type/outcome/limit/options the answer was made with
+    generation TEXT,         -- index_state epoch:generation of the answer
+    times_asked INTEGER NOT NULL DEFAULT 1,
+    
     -- Metadata
     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
 );
 
+-- MinHash LSH buckets: questions sharing any (band, bucket) are
+-- near-duplicate candidates
+CREATE TABLE IF NOT EXISTS query_bands (
+    band INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    query_id TEXT NOT NULL,
+    PRIMARY KEY (band, bucket, query_id)
+) WITHOUT ROWID;
+
+-- Query metrics (artifact_query.py --record): one row per search section
+-- per query, so latency can be tracked as the index grows
+CREATE TABLE IF NOT EXISTS query_metrics (
+    id INTEGER PRIMARY KEY,
+    query TEXT NOT NULL,
+    section TEXT NOT NULL,  -- handoffs, specs, ..., ranked, format
+    wall_ms REAL NOT NULL,
+    rows_returned INTEGER,
+    fts_matches INTEGER,    -- rows the FTS MATCH produced before ranking
+    full_scans INTEGER,     -- query plan steps that scan a whole table
+    generation TEXT,        -- index_state epoch:generation at query time
+    recorded_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_query_metrics_recorded ON query_metrics(recorded_at);
+
+-- Commit reasoning (.git/claude/commits/{hash}/reasoning.md)
+CREATE TABLE IF NOT EXISTS reasoning (
+    id TEXT PRIMARY KEY,
+    commit_hash TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    branch TEXT,
+    
+    -- Commit metadata (from git log)
+    subject TEXT,
+    author TEXT,
+    committed_at TIMESTAMP,
+    
+    -- Content
+    content TEXT,
+    failed_attempts INTEGER DEFAULT 0,
+    outcome TEXT CHECK(outcome IN ('FIRST_TRY', 'AFTER_FAILURES', 'UNKNOWN')),
+    
+    -- Metadata
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Build/test attempts (.git/claude/branches/{branch}/attempts.jsonl)
+CREATE TABLE IF NOT EXISTS attempts (
+    id TEXT PRIMARY KEY,
+    branch TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    line_number INTEGER,
+    
+    -- Attempt (one JSONL record)
+    attempt_type TEXT,  -- build_fail, build_pass, test_fail, test_pass
+    build_type TEXT,
+    command TEXT,
+    error TEXT,
+    timestamp TEXT,
+    
+    -- Metadata
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+-- Manifest of indexed source files (drives incremental re-indexing)
+CREATE TABLE IF NOT EXISTS manifest (
+    path TEXT PRIMARY KEY,
+    artifact_type TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    content_hash TEXT NOT NULL,
+    truncated TEXT,  -- JSON {field: full size} for fields cut at the size cap
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+
+CREATE INDEX IF NOT EXISTS idx_manifest_type ON manifest(artifact_type);
+
+-- Index generation: bumped on every artifact write so query caches can tell
+-- when their results went stale. Saved queries bump "saved" instead, so
+-- answers saved at a generation stay reusable. The epoch changes if the
+-- database is recreated.
+CREATE TABLE IF NOT EXISTS index_state (
+    id INTEGER PRIMARY KEY CHECK (id = 1),
+    epoch TEXT NOT NULL DEFAULT (lower(hex(randomblob(8)))),
+    generation INTEGER NOT NULL DEFAULT 0,
+    saved INTEGER NOT NULL DEFAULT 0  -- bumped per saved query (past_queries results)
+);
+
+INSERT OR IGNORE INTO index_state (id) VALUES (1);
+
+-- Semantic search vectors: hashed term frequencies, float32[256] per row
+-- (artifact_vectors.py). Weighted and normalized at query time.
+CREATE TABLE IF NOT EXISTS vectors (
+    artifact_type TEXT NOT NULL,
+    id TEXT NOT NULL,
+    vector BLOB NOT NULL,
+    PRIMARY KEY (artifact_type, id)
+) WITHOUT ROWID;
+
 -- FTS5 indexes for full-text search
 CREATE VIRTUAL TABLE IF NOT EXISTS handoffs_fts USING fts5(
     task_summary, what_worked, what_failed, key_decisions, files_modified,
@@ -140,6 +266,18 @@ CREATE VIRTUAL TABLE IF NOT EXISTS continuity_fts USING fts5(
     tokenize='porter ascii'
 );
 
+CREATE VIRTUAL TABLE IF NOT EXISTS reasoning_fts USING fts5(
+    subject, content,
+    content='reasoning', content_rowid='rowid',
+    tokenize='porter ascii'
+);
+
+CREATE VIRTUAL TABLE IF NOT EXISTS attempts_fts USING fts5(
+    command, error,
+    content='attempts', content_rowid='rowid',
+    tokenize='porter ascii'
+);
+
 CREATE VIRTUAL TABLE IF NOT EXISTS queries_fts USING fts5(
     question, answer,
     content='queries', content_rowid='rowid',
@@ -166,6 +304,28 @@ CREATE TRIGGER IF NOT EXISTS handoffs_au AFTER UPDATE ON handoffs BEGIN
     VALUES (NEW.rowid, NEW.task_summary, NEW.what_worked, NEW.what_failed, NEW.key_decisions, NEW.files_modified);
 END;
 
+-- HANDOFF FILES triggers (INSERT OR REPLACE skips the delete trigger,
+-- so the insert trigger clears the row's old files itself)
+CREATE TRIGGER IF NOT EXISTS handoff_files_ai AFTER INSERT ON handoffs BEGIN
+    DELETE FROM handoff_files WHERE handoff_id = NEW.id;
+    INSERT OR IGNORE INTO handoff_files (handoff_id, path)
+    SELECT NEW.id, value FROM json_each(
+        CASE WHEN json_valid(NEW.files_modified) THEN NEW.files_modified ELSE '[]' END
+    ) WHERE type = 'text';
+END;
+
+CREATE TRIGGER IF NOT EXISTS handoff_files_ad AFTER DELETE ON handoffs BEGIN
+    DELETE FROM handoff_files WHERE handoff_id = OLD.id;
+END;
+
+CREATE TRIGGER IF NOT EXISTS handoff_files_au AFTER UPDATE OF id, files_modified ON handoffs BEGIN
+    DELETE FROM handoff_files WHERE handoff_id = OLD.id;
+    INSERT OR IGNORE INTO handoff_files (handoff_id, path)
+    SELECT NEW.id, value FROM json_each(
+        CASE WHEN json_valid(NEW.files_modified) THEN NEW.files_modified ELSE '[]' END
+    ) WHERE type = 'text';
+END;
+
 -- PLANS triggers
 CREATE TRIGGER IF NOT EXISTS plans_ai AFTER INSERT ON plans BEGIN
     INSERT INTO plans_fts(rowid, title, overview, approach, phases, constraints)
@@ -220,6 +380,42 @@ CREATE TRIGGER IF NOT EXISTS continuity_au AFTER UPDATE ON continuity BEGIN
     VALUES (NEW.rowid, NEW.goal, NEW.key_learnings, NEW.key_decisions, NEW.state_now);
 END;
 
+-- REASONING triggers
+CREATE TRIGGER IF NOT EXISTS reasoning_ai AFTER INSERT ON reasoning BEGIN
+    INSERT INTO reasoning_fts(rowid, subject, content)
+    VALUES (NEW.rowid, NEW.subject, NEW.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS reasoning_ad AFTER DELETE ON reasoning BEGIN
+    INSERT INTO reasoning_fts(reasoning_fts, rowid, subject, content)
+    VALUES('delete', OLD.rowid, OLD.subject, OLD.content);
+END;
+
+CREATE TRIGGER IF NOT EXISTS reasoning_au AFTER UPDATE ON reasoning BEGIN
+    INSERT INTO reasoning_fts(reasoning_fts, rowid, subject, content)
+    VALUES('delete', OLD.rowid, OLD.subject, OLD.content);
+    INSERT INTO reasoning_fts(rowid, subject, content)
+    VALUES (NEW.rowid, NEW.subject, NEW.content);
+END;
+
+-- ATTEMPTS triggers
+CREATE TRIGGER IF NOT EXISTS attempts_ai AFTER INSERT ON attempts BEGIN
+    INSERT INTO attempts_fts(rowid, command, error)
+    VALUES (NEW.rowid, NEW.command, NEW.error);
+END;
+
+CREATE TRIGGER IF NOT EXISTS attempts_ad AFTER DELETE ON attempts BEGIN
+    INSERT INTO attempts_fts(attempts_fts, rowid, command, error)
+    VALUES('delete', OLD.rowid, OLD.command, OLD.error);
+END;
+
+CREATE TRIGGER IF NOT EXISTS attempts_au AFTER UPDATE ON attempts BEGIN
+    INSERT INTO attempts_fts(attempts_fts, rowid, command, error)
+    VALUES('delete', OLD.rowid, OLD.command, OLD.error);
+    INSERT INTO attempts_fts(rowid, command, error)
+    VALUES (NEW.rowid, NEW.command, NEW.error);
+END;
+
 -- QUERIES triggers
 CREATE TRIGGER IF NOT EXISTS queries_ai AFTER INSERT ON queries BEGIN
     INSERT INTO queries_fts(rowid, question, answer)
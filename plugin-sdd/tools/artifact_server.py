@@ -0,0 +1,226 @@
+#!/usr/bin/env python3
+"""
+Artifact Query Server for SDD Plugin.
+
+Keeps warm read-only connections to artifact indexes and answers searches
+over a Unix domain socket, so repeated queries from hooks and skills skip
+interpreter startup, imports and a cold page cache. artifact_query.py
+starts it on demand and talks to it through artifact_client.py; it never
+needs to be run by hand. Semantic search vectors stay loaded between
+queries too. A client whose tools are newer than the running server's
+code tells it to exit, and starts a fresh one.
+
+USAGE:
+    uv run python tools/artifact_server.py                       # Serve on the default socket
+    uv run python tools/artifact_server.py --idle-timeout 60     # Exit after 60s without requests
+    uv run python tools/artifact_server.py --socket ~/.sdd/q.sock  # Custom socket (0700 dir)
+
+PROTOCOL:
+    One JSON object per connection, newline-terminated:
+        {"db": "/abs/path/context.db", "query": "...", "type": "all",
+         "outcome": null, "limit": 5, "cache": true,
+         "options": {"unified": false, "semantic": false, "hybrid": false,
+                     "weights": {}, "highlight": false, "facets": {}},
+         "version": "...", "format": false}
+    answered by {"results": {...}} or {"error": "..."}. With "format", the
+    answer also carries "text", the CLI's output for the search. A request
+    whose "version" isn't the server's is answered by {"stale": true}.
+"""
+
+import argparse
+import json
+import os
+import socket
+import socketserver
+import sqlite3
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+from artifact_client import private_dir, server_socket_path, server_version
+from artifact_query import (
+    QueryCache, cached_searches, find_similar_queries, format_results, open_cache,
+    saved_question_note,
+)
+from artifact_store import ArtifactStore
+
+
+class ConnectionPool:
+    """An ArtifactStore per database, reopened if the file is replaced, plus
+    that database's result cache. The server is serial, so each store holds
+    a single connection."""
+
+    def __init__(self):
+        self.stores: Dict[str, Tuple[Tuple[int, int], ArtifactStore]] = {}
+        self.caches: Dict[str, Optional[QueryCache]] = {}
+
+    def cache(self, db_path: str) -> Optional[QueryCache]:
+        if db_path not in self.caches:
+            self.caches[db_path] = open_cache(Path(db_path))
+        return self.caches[db_path]
+
+    def get(self, db_path: str) -> ArtifactStore:
+        stat = os.stat(db_path)
+        identity = (stat.st_dev, stat.st_ino)
+        cached = self.stores.get(db_path)
+        if cached and cached[0] == identity:
+            return cached[1]
+        if cached:
+            cached[1].close()
+        store = ArtifactStore(Path(db_path), size=1)
+        self.stores[db_path] = (identity, store)
+        return store
+
+    def close(self) -> None:
+        for _, store in self.stores.values():
+            store.close()
+        for cache in self.caches.values():
+            if cache is not None:
+                cache.close()
+        self.stores.clear()
+        self.caches.clear()
+
+
+class QueryHandler(socketserver.StreamRequestHandler):
+    # A client that connects and goes quiet must not stall the server
+    timeout = 5.0
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            if request.get("version", self.server.version) != self.server.version:
+                # Tools were upgraded since this server started: make way
+                self.server.retire()
+                self.wfile.write(json.dumps({"stale": True}).encode() + b"\n")
+                return
+            pool = self.server.pool
+            cache = pool.cache(request["db"]) if request.get("cache", True) else None
+            with pool.get(request["db"]).connection() as conn:
+                results = cached_searches(
+                    conn,
+                    cache,
+                    request["query"],
+                    request.get("type", "all"),
+                    request.get("outcome"),
+                    request.get("limit", 5),
+                    **request.get("options", {}),
+                )
+                response: Dict[str, Any] = {"results": results}
+                if request.get("format"):
+                    try:
+                        same, similar = find_similar_queries(conn, request["query"])
+                    except sqlite3.OperationalError:  # Index not yet migrated
+                        same, similar = None, None
+                    note = saved_question_note(same, similar)
+                    response["text"] = format_results(results) + (f"\n{note}" if note else "")
+        except Exception as e:
+            response = {"error": f"{type(e).__name__}: {e}"}
+        self.wfile.write(json.dumps(response, default=str).encode() + b"\n")
+        self.server.last_request = time.monotonic()
+
+
+class QueryServer(socketserver.UnixStreamServer):
+    """Serial server: queries take milliseconds, and one thread keeps each
+    connection on the thread that created it."""
+
+    # handle_request() gives up after this long, so idleness gets checked
+    timeout = 1.0
+
+    def __init__(self, socket_path: Path, idle_timeout: float):
+        self.pool = ConnectionPool()
+        self.idle_timeout = idle_timeout
+        self.last_request = time.monotonic()
+        self.version = server_version()
+        self.retired = False
+        super().__init__(str(socket_path), QueryHandler)
+        stat = socket_path.stat()
+        self.socket_path = socket_path
+        self.identity = (stat.st_dev, stat.st_ino)
+
+    def idle(self) -> bool:
+        return bool(self.idle_timeout) and time.monotonic() - self.last_request > self.idle_timeout
+
+    def retire(self) -> None:
+        """Stop taking requests, and free the socket path for a new server."""
+        self.retired = True
+        self.release()
+
+    def release(self) -> None:
+        """Remove the socket file, unless a newer server has replaced it."""
+        try:
+            stat = self.socket_path.stat()
+            if (stat.st_dev, stat.st_ino) == self.identity:
+                self.socket_path.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def claim_socket(socket_path: Path) -> bool:
+    """Remove a stale socket file; return False if a live server owns it."""
+    if not socket_path.exists():
+        return True
+    probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    try:
+        probe.connect(str(socket_path))
+        return False
+    except OSError:
+        socket_path.unlink()
+        return True
+    finally:
+        probe.close()
+
+
+def serve(socket_path: Path, idle_timeout: float) -> None:
+    socket_path.parent.parent.mkdir(parents=True, exist_ok=True)
+    if not private_dir(str(socket_path.parent), create=True):
+        # Clients only trust a socket nobody else could have put there
+        print(f"Not serving: {socket_path.parent} must be a directory only you can access",
+              file=sys.stderr)
+        return
+    if not claim_socket(socket_path):
+        print(f"Server already running on {socket_path}", file=sys.stderr)
+        return
+    # bind() creates the socket file: make it 0600 from the start, so no
+    # other local user can connect before a later chmod
+    umask = os.umask(0o177)
+    try:
+        server = QueryServer(socket_path, idle_timeout)
+    except OSError as e:  # Lost a race with another server starting up
+        print(f"Could not bind {socket_path}: {e}", file=sys.stderr)
+        return
+    finally:
+        os.umask(umask)
+    try:
+        while not server.idle() and not server.retired:
+            server.handle_request()
+    finally:
+        server.server_close()
+        server.pool.close()
+        server.release()
+
+
+def main():
+    """Main entry point."""
+    parser = argparse.ArgumentParser(
+        description="Serve artifact queries over a Unix socket"
+    )
+    parser.add_argument(
+        "--socket",
+        type=str,
+        help=f"Socket path (default: {server_socket_path()})"
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=900,
+        help="Exit after this many seconds without a request, 0 = never (default: 900)"
+    )
+    args = parser.parse_args()
+
+    socket_path = Path(args.socket or server_socket_path()).expanduser()
+    serve(socket_path, args.idle_timeout)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python3
+"""
+Artifact Store for SDD Plugin.
+
+In-process access to the artifact index for tools that would otherwise
+shell out to artifact_query.py and parse its text:
+
+    from artifact_store import ArtifactStore
+
+    with ArtifactStore() as store:
+        results = store.search("token refresh", artifact_type="handoffs")
+        handoff = store.get_by_id("handoffs", results["handoffs"][0].id)
+        touched = store.by_file("src/auth/login.py")
+
+Searches take the same options as artifact_query.py (unified, semantic,
+hybrid, weights, highlight, facets) and find the same rows, returned as
+SearchHit records; get_by_id returns an Artifact and by_file Handoffs.
+
+A store keeps a small pool of read-only connections (mode=ro, query_only,
+shared page cache, memory-mapped I/O). Each call borrows one, so a store
+can be shared by any number of threads; at most ``size`` queries run at
+once and the rest wait for a connection. artifact_server.py serves its
+queries from a store per database.
+"""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+from dataclasses import dataclass, field, fields
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional
+
+from artifact_query import (
+    UNIFIED_SOURCES,
+    get_db_path,
+    list_handoffs,
+    run_searches,
+)
+
+POOL_SIZE = 4
+MMAP_SIZE = 256 * 1024 * 1024
+
+# Statements are prepared once per connection and reused from sqlite3's
+# per-connection statement cache, keyed on SQL text.
+STATEMENT_CACHE_SIZE = 256
+
+# Tables get_by_id can read, by artifact type
+TABLES = {name: source["table"] for name, source in UNIFIED_SOURCES.items()}
+TABLES["queries"] = "queries"
+
+# The artifact type of each per-type search section
+SECTION_TYPES = {name: name for name in TABLES}
+SECTION_TYPES["past_queries"] = "queries"
+
+
+@dataclass
+class SearchHit:
+    """One search result.
+
+    ``section`` is where the result was listed ("handoffs", ..., "ranked",
+    "past_queries") and ``artifact_type`` the table it came from, which
+    varies within "ranked". ``fields`` holds the section's other columns
+    (snippets, titles, outcome, ...).
+    """
+    section: str
+    artifact_type: str
+    id: str
+    score: float
+    file_path: Optional[str] = None
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+    @classmethod
+    def from_row(cls, section: str, row: Dict[str, Any]) -> "SearchHit":
+        row = dict(row)
+        artifact_type = row.pop("artifact_type", None) or SECTION_TYPES.get(section, section)
+        return cls(
+            section=section,
+            artifact_type=artifact_type,
+            id=row.pop("id"),
+            score=row.pop("score"),
+            file_path=row.pop("file_path", None),
+            fields=row,
+        )
+
+
+@dataclass
+class Artifact:
+    """The full row of one artifact; ``fields`` holds every other column."""
+    artifact_type: str
+    id: str
+    file_path: Optional[str] = None
+    fields: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass
+class Handoff:
+    """A handoff as listed by by_file."""
+    id: str
+    session_name: str
+    task_number: Optional[int]
+    task_summary: str
+    outcome: Optional[str]
+    file_path: str
+    created_at: Optional[str]
+
+
+class ArtifactStore:
+    """Thread-safe, read-only access to one artifact index."""
+
+    def __init__(self, db_path: Optional[Path] = None, size: int = POOL_SIZE):
+        self.db_path = Path(db_path) if db_path else get_db_path()
+        if not self.db_path.exists():
+            raise FileNotFoundError(f"Artifact index not found: {self.db_path}")
+        self.size = size
+        self._idle: List[sqlite3.Connection] = []
+        self._opened = 0
+        self._available = threading.Condition()
+        self._closed = False
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = sqlite3.connect(
+            f"{self.db_path.resolve().as_uri()}?mode=ro&cache=shared",
+            uri=True,
+            check_same_thread=False,  # Borrowed by one thread at a time
+            cached_statements=STATEMENT_CACHE_SIZE,
+        )
+        conn.execute("PRAGMA query_only = ON")
+        conn.execute(f"PRAGMA mmap_size = {MMAP_SIZE}")
+        return conn
+
+    def _borrow(self) -> sqlite3.Connection:
+        """An idle connection, a new one if the pool isn't full, or else the
+        next one returned. Raises once the store is closed, waiters included."""
+        with self._available:
+            while True:
+                if self._closed:
+                    raise RuntimeError("ArtifactStore is closed")
+                if self._idle:
+                    return self._idle.pop()
+                if self._opened < self.size:
+                    self._opened += 1
+                    break
+                self._available.wait()
+        try:
+            return self._connect()
+        except BaseException:
+            with self._available:
+                self._opened -= 1
+                self._available.notify()
+            raise
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a pooled connection for the duration of the block."""
+        conn = self._borrow()
+        try:
+            yield conn
+        finally:
+            with self._available:
+                if self._closed:
+                    conn.close()
+                else:
+                    self._idle.append(conn)
+                    self._available.notify()
+
+    def search(
+        self,
+        query: str,
+        artifact_type: str = "all",
+        outcome: Optional[str] = None,
+        limit: int = 5,
+        **options: Any
+    ) -> Dict[str, List[SearchHit]]:
+        """Search like artifact_query.py; results are keyed by section
+        ("handoffs", "specs", ..., "ranked", "past_queries")."""
+        with self.connection() as conn:
+            results = run_searches(conn, query, artifact_type, outcome, limit, **options)
+        return {
+            section: [SearchHit.from_row(section, row) for row in rows]
+            for section, rows in results.items()
+        }
+
+    def get_by_id(self, artifact_type: str, artifact_id: str) -> Optional[Artifact]:
+        """The full row of one artifact, or None if there is no such row."""
+        if artifact_type not in TABLES:
+            raise ValueError(
+                f"Unknown artifact type {artifact_type!r}; expected one of {', '.join(TABLES)}"
+            )
+        with self.connection() as conn:
+            cursor = conn.execute(
+                f"SELECT * FROM {TABLES[artifact_type]} WHERE id = ?", (artifact_id,)
+            )
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            columns = dict(zip([desc[0] for desc in cursor.description], row))
+        return Artifact(
+            artifact_type=artifact_type,
+            id=columns.pop("id"),
+            file_path=columns.pop("file_path", None),
+            fields=columns,
+        )
+
+    def by_file(
+        self,
+        path: str,
+        outcome: Optional[str] = None,
+        limit: int = 20
+    ) -> List[Handoff]:
+        """Handoffs that modified ``path`` (a file, a directory ending in /,
+        or a glob), newest first."""
+        with self.connection() as conn:
+            rows = list_handoffs(conn, outcome, limit, facets={"file": path})
+        names = [f.name for f in fields(Handoff)]
+        return [Handoff(**{name: row[name] for name in names}) for row in rows]
+
+    def close(self) -> None:
+        """Close every pooled connection; borrowed ones close on return, and
+        anyone waiting for one gets RuntimeError."""
+        with self._available:
+            self._closed = True
+            for conn in self._idle:
+                conn.close()
+            self._idle.clear()
+            self._available.notify_all()
+
+    def __enter__(self) -> "ArtifactStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
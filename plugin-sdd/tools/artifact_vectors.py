@@ -0,0 +1,235 @@
+#!/usr/bin/env python3
+"""
+Hashed TF-IDF vectors for semantic artifact search.
+
+Text is reduced to word features (plus a six-letter prefix, so
+"authenticate" and "authentication" meet), hashed into VECTOR_DIM buckets
+and stored per row as sublinear term frequencies - float32 blobs built with
+the standard library, so indexing never needs NumPy.
+
+Searching needs NumPy (an optional dependency): the blobs are gathered into
+an IDF-weighted, L2-normalized matrix, saved as a memory-mapped .npy
+sidecar beside the index and rebuilt whenever the index generation moves.
+A query is then one matrix-vector product and an argpartition.
+
+Works fully offline: no network, no model download.
+"""
+
+import json
+import math
+import os
+import re
+import sqlite3
+import threading
+import zlib
+from array import array
+from collections import Counter
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+VECTOR_DIM = 256
+PREFIX_LEN = 6
+
+WORD = re.compile(r"[a-z0-9_]{2,}")
+STOPWORDS = frozenset(
+    "an and are as at be but by can for from has have if in into is it its "
+    "not of on or so that the then this to was we were when which will with".split()
+)
+
+
+def embed(text: Optional[str]) -> bytes:
+    """Hashed term-frequency vector for ``text`` as a float32 blob."""
+    buckets = [0.0] * VECTOR_DIM
+    for word, count in Counter(WORD.findall((text or "").lower())).items():
+        if word in STOPWORDS:
+            continue
+        weight = 1.0 + math.log(count)
+        buckets[zlib.crc32(word.encode()) % VECTOR_DIM] += weight
+        if len(word) > PREFIX_LEN:
+            buckets[zlib.crc32(word[:PREFIX_LEN].encode() + b"*") % VECTOR_DIM] += weight / 2
+    return array("f", buckets).tobytes()
+
+
+def require_numpy():
+    try:
+        import numpy
+    except ImportError:
+        raise RuntimeError(
+            "Semantic search needs NumPy; install it with: uv add numpy"
+        ) from None
+    return numpy
+
+
+class VectorIndex:
+    """IDF-weighted, normalized vectors for every row of one index.
+
+    Rows are sorted by artifact type, so each type is a contiguous slice.
+    """
+
+    def __init__(self, matrix, keys, idf, ranges: Dict[str, Tuple[int, int]]):
+        self.matrix = matrix
+        self.keys = keys
+        self.idf = idf
+        self.ranges = ranges
+
+    def positions(self, artifact_type: str, ids: List[str]):
+        """Matrix rows of the given ids (unknown ids are skipped)."""
+        np = require_numpy()
+        start, end = self.ranges[artifact_type]
+        wanted = np.array(
+            sorted(f"{artifact_type}:{id_}".encode() for id_ in ids), dtype=self.keys.dtype
+        )
+        found = start + np.searchsorted(self.keys[start:end], wanted)
+        # Sorted, so out-of-range positions are a suffix
+        in_range = found < end
+        found, wanted = found[in_range], wanted[in_range]
+        return found[self.keys[found] == wanted]
+
+    def search(
+        self,
+        query: str,
+        types: List[str],
+        k: int,
+        candidates: Optional[Dict[str, List[str]]] = None
+    ) -> List[Tuple[str, str, float]]:
+        """Cosine top-k over the given types: (artifact_type, id, similarity).
+
+        ``candidates`` limits a type to the listed ids, found by binary
+        search since keys are sorted.
+        """
+        np = require_numpy()
+        vector = np.frombuffer(embed(query), dtype=np.float32) * self.idf
+        norm = np.linalg.norm(vector)
+        if not norm:
+            return []
+        vector /= norm
+
+        hits = []
+        for artifact_type in types:
+            if artifact_type not in self.ranges:
+                continue
+            start, end = self.ranges[artifact_type]
+            if candidates is not None and artifact_type in candidates:
+                rows = self.positions(artifact_type, candidates[artifact_type])
+                scores = self.matrix[rows] @ vector
+            else:
+                rows = np.arange(start, end)
+                scores = self.matrix[start:end] @ vector
+            top = min(k, len(scores))
+            if not top:
+                continue
+            best = np.argpartition(-scores, top - 1)[:top]
+            for i in best:
+                if scores[i] > 0:
+                    key = self.keys[rows[i]].decode()
+                    hits.append((artifact_type, key.split(":", 1)[1], float(scores[i])))
+        hits.sort(key=lambda hit: -hit[2])
+        return hits[:k]
+
+
+def sidecar_paths(db_path: Path) -> Dict[str, Path]:
+    stem = db_path.with_suffix("")
+    return {
+        "matrix": Path(f"{stem}.vectors.npy"),
+        "keys": Path(f"{stem}.vector-keys.npy"),
+        "meta": Path(f"{stem}.vectors.json"),
+    }
+
+
+def build_index(conn: sqlite3.Connection, schema: str = "main") -> VectorIndex:
+    """Assemble the vector matrix from the ``vectors`` table."""
+    np = require_numpy()
+    rows = conn.execute(
+        f"SELECT artifact_type, id, vector FROM {schema}.vectors ORDER BY artifact_type, id"
+    ).fetchall()
+    matrix = np.frombuffer(b"".join(row[2] for row in rows), dtype=np.float32)
+    matrix = matrix.reshape(len(rows), VECTOR_DIM).copy()
+
+    # Smoothed IDF per bucket, from how many rows use it
+    df = np.count_nonzero(matrix, axis=0)
+    idf = (np.log((1 + len(rows)) / (1 + df)) + 1).astype(np.float32)
+    matrix *= idf
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    norms[norms == 0] = 1
+    matrix /= norms
+
+    keys = np.array([f"{row[0]}:{row[1]}".encode() for row in rows], dtype="S48")
+    ranges: Dict[str, Tuple[int, int]] = {}
+    for i, row in enumerate(rows):
+        start, _ = ranges.get(row[0], (i, i))
+        ranges[row[0]] = (start, i + 1)
+    return VectorIndex(matrix, keys, idf, ranges)
+
+
+def save_index(index: VectorIndex, db_path: Path, generation: str) -> None:
+    """Write the sidecar files; the metadata file goes last and marks them valid."""
+    np = require_numpy()
+    paths = sidecar_paths(db_path)
+    for name, data in (("matrix", index.matrix), ("keys", index.keys)):
+        tmp = paths[name].with_name(paths[name].name + ".tmp")
+        with open(tmp, "wb") as f:
+            np.save(f, data)
+        os.replace(tmp, paths[name])
+    meta = {
+        "generation": generation,
+        "dim": VECTOR_DIM,
+        "idf": index.idf.tolist(),
+        "ranges": index.ranges,
+    }
+    tmp = paths["meta"].with_name(paths["meta"].name + ".tmp")
+    tmp.write_text(json.dumps(meta))
+    os.replace(tmp, paths["meta"])
+
+
+def load_sidecar(db_path: Path, generation: str) -> Optional[VectorIndex]:
+    """Memory-map the sidecar if it was built for ``generation``."""
+    np = require_numpy()
+    paths = sidecar_paths(db_path)
+    try:
+        meta = json.loads(paths["meta"].read_text())
+        if meta["generation"] != generation or meta["dim"] != VECTOR_DIM:
+            return None
+        matrix = np.load(paths["matrix"], mmap_mode="r")
+        keys = np.load(paths["keys"], mmap_mode="r")
+    except (OSError, ValueError, KeyError):
+        return None
+    idf = np.array(meta["idf"], dtype=np.float32)
+    ranges = {name: tuple(span) for name, span in meta["ranges"].items()}
+    return VectorIndex(matrix, keys, idf, ranges)
+
+
+# Indexes already loaded in this process (the query server keeps them warm);
+# the lock stops concurrent readers from building the same sidecar twice
+_loaded: Dict[Tuple[str, str], VectorIndex] = {}
+_loading = threading.Lock()
+
+
+def vector_index(
+    conn: sqlite3.Connection,
+    db_path: Path,
+    generation: Optional[str],
+    schema: str = "main"
+) -> VectorIndex:
+    """The vector index for a database at its current generation.
+
+    Served from memory, then from the sidecar, and otherwise rebuilt from
+    the ``vectors`` table (and the sidecar rewritten, if the directory is
+    writable).
+    """
+    cache_key = (str(db_path), generation or "")
+    with _loading:
+        if generation is not None and cache_key in _loaded:
+            return _loaded[cache_key]
+        index = load_sidecar(db_path, generation) if generation is not None else None
+        if index is None:
+            index = build_index(conn, schema)
+            if generation is not None:
+                try:
+                    save_index(index, db_path, generation)
+                except OSError:
+                    pass
+        if generation is not None:
+            for key in [k for k in _loaded if k[0] == cache_key[0]]:
+                del _loaded[key]
+            _loaded[cache_key] = index
+        return index
@@ -0,0 +1,302 @@
+#!/usr/bin/env python3
+"""
+Eval result cache for run_evals.py.
+
+An eval file's results are keyed on the content hashes of the file and of
+every project module it imports, directly or transitively. Imports are
+read from the source with ast (nothing is executed), resolved against the
+eval's directory, evals/, the project root and src/, and followed only
+while they stay inside the project; the standard library and installed
+packages are never part of a key.
+
+Each module's hash and import list is kept with its size and mtime, so an
+unchanged tree costs one stat per module. Files an eval reads at runtime
+(fixtures, data) are not tracked; a plain run re-runs everything.
+
+The same database maps eval files to the spec IDs they declare, so
+--spec can pick files without importing the suite.
+"""
+
+import ast
+import hashlib
+import json
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+CACHE_PATH = Path(".claude/cache/evals/evals.db")
+
+# Bump when the cache format or the way results are produced changes
+CACHE_VERSION = "1"
+
+# Bump when stored rows would be read differently (such as how spec IDs are
+# found); a database from another version starts with empty tables
+SCHEMA_VERSION = 2
+
+# Names a spec declaration is assigned to, or passed as
+SPEC_NAMES = ("spec_id", "spec_ids")
+
+
+def import_names(source: str) -> Iterator[Tuple[str, int]]:
+    """(module, level) for everything a module imports.
+
+    ``from a import b`` yields both ``a`` and ``a.b``, since ``b`` may be a
+    submodule; whichever doesn't exist as a file is dropped on resolution.
+    """
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Import):
+            for alias in node.names:
+                yield alias.name, 0
+        elif isinstance(node, ast.ImportFrom):
+            base = node.module or ""
+            if base:
+                yield base, node.level
+            for alias in node.names:
+                if alias.name != "*":
+                    yield f"{base}.{alias.name}" if base else alias.name, node.level
+
+
+def literal_strings(node: Optional[ast.AST]) -> List[str]:
+    """A string constant, or the string constants of a list, tuple or set."""
+    if isinstance(node, (ast.List, ast.Tuple, ast.Set)):
+        return [s for element in node.elts for s in literal_strings(element)]
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return [node.value]
+    return []
+
+
+def declared_spec_ids(source: str) -> List[str]:
+    """Spec IDs an eval file declares: string literals assigned to a name or
+    attribute called ``spec_id``/``spec_ids`` (``spec_id = "SPEC-001"``,
+    ``self.spec_ids = [...]``) or passed as such a keyword argument.
+
+    Other literals, such as assertion messages or fixture data that happen
+    to name a spec, are not declarations.
+    """
+    found = set()
+    for node in ast.walk(ast.parse(source)):
+        if isinstance(node, ast.Assign):
+            targets, value = node.targets, node.value
+        elif isinstance(node, ast.AnnAssign):
+            targets, value = [node.target], node.value
+        elif isinstance(node, ast.keyword):
+            if node.arg in SPEC_NAMES:
+                found.update(literal_strings(node.value))
+            continue
+        else:
+            continue
+        names = [
+            t.id if isinstance(t, ast.Name) else t.attr
+            for t in targets if isinstance(t, (ast.Name, ast.Attribute))
+        ]
+        if any(name in SPEC_NAMES for name in names):
+            found.update(literal_strings(value))
+    return sorted(found)
+
+
+def json_value(value: Any) -> Any:
+    """``value`` if JSON stores it exactly, else its repr().
+
+    A tuple or set would come back as a list, so it is kept as the text it
+    was reported with instead.
+    """
+    def exact(item: Any) -> bool:
+        if type(item) in (type(None), bool, int, float, str):
+            return True
+        if type(item) is list:
+            return all(exact(element) for element in item)
+        if type(item) is dict:
+            return all(type(k) is str and exact(v) for k, v in item.items())
+        return False
+
+    return value if exact(value) else repr(value)
+
+
+def resolve_import(name: str, level: int, importer: Path, roots: List[Path]) -> List[Path]:
+    """Project files executed by an import: the module and its packages."""
+    if level:
+        base = importer.parent
+        for _ in range(level - 1):
+            base = base.parent
+        roots = [base]
+    parts = name.split(".") if name else []
+    for root in roots:
+        found = []
+        for depth in range(1, len(parts) + 1):
+            package = root.joinpath(*parts[:depth], "__init__.py")
+            if package.is_file():
+                found.append(package)
+        module = root.joinpath(*parts).with_suffix(".py") if parts else None
+        if module is not None and module.is_file():
+            found.append(module)
+        if found:
+            return found
+    return []
+
+
+class EvalCache:
+    """Eval results by file, valid while the file's dependencies are unchanged."""
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir.resolve()
+        path = self.project_dir / CACHE_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=1.0)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = OFF")  # Losing a cache is harmless
+        if self.conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            self.conn.executescript(f"""
+                DROP TABLE IF EXISTS eval_specs;
+                DROP TABLE IF EXISTS eval_results;
+                PRAGMA user_version = {SCHEMA_VERSION};
+            """)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS modules (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                sha256 TEXT NOT NULL,
+                imports TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS eval_specs (
+                path TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                spec_ids TEXT NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS eval_results (
+                eval_file TEXT PRIMARY KEY,
+                key TEXT NOT NULL,
+                dependencies TEXT NOT NULL,
+                results TEXT NOT NULL,  -- JSON list of EvalResult fields
+                recorded_at REAL NOT NULL
+            );
+        """)
+        self.conn.commit()
+        self._modules: Dict[Path, Tuple[str, List[Tuple[str, int]]]] = {}
+
+    def relative(self, path: Path) -> str:
+        return path.resolve().relative_to(self.project_dir).as_posix()
+
+    def module(self, path: Path) -> Tuple[str, List[Tuple[str, int]]]:
+        """Content hash and imports of one file, re-read only if it changed."""
+        if path in self._modules:
+            return self._modules[path]
+        stat = path.stat()
+        relative = self.relative(path)
+        row = self.conn.execute(
+            "SELECT size, mtime_ns, sha256, imports FROM modules WHERE path = ?", (relative,)
+        ).fetchone()
+        if row is not None and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns):
+            entry = (row[2], [tuple(pair) for pair in json.loads(row[3])])
+        else:
+            content = path.read_bytes()
+            try:
+                imports = sorted(set(import_names(content.decode("utf-8"))))
+            except (SyntaxError, UnicodeDecodeError, ValueError):
+                imports = []  # The eval will fail to load, and say why
+            entry = (hashlib.sha256(content).hexdigest(), imports)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO modules VALUES (?, ?, ?, ?, ?)",
+                (relative, stat.st_size, stat.st_mtime_ns, entry[0], json.dumps(imports))
+            )
+        self._modules[path] = entry
+        return entry
+
+    def spec_ids(self, eval_paths: List[Path]) -> Dict[Path, List[str]]:
+        """Spec IDs declared by each eval file, re-parsed only if it changed."""
+        known = {
+            row[0]: (row[1], row[2], row[3])
+            for row in self.conn.execute("SELECT path, size, mtime_ns, spec_ids FROM eval_specs")
+        }
+        declared: Dict[Path, List[str]] = {}
+        for eval_path in eval_paths:
+            stat = eval_path.stat()
+            relative = self.relative(eval_path)
+            row = known.get(relative)
+            if row is not None and row[:2] == (stat.st_size, stat.st_mtime_ns):
+                declared[eval_path] = json.loads(row[2])
+                continue
+            declared[eval_path] = spec_ids_of(eval_path)
+            self.conn.execute(
+                "INSERT OR REPLACE INTO eval_specs VALUES (?, ?, ?, ?)",
+                (relative, stat.st_size, stat.st_mtime_ns, json.dumps(declared[eval_path]))
+            )
+        self.conn.commit()
+        return declared
+
+    def dependencies(self, eval_path: Path) -> Dict[str, str]:
+        """Content hash of the eval file and every project module it imports."""
+        eval_path = eval_path.resolve()
+        roots = [
+            eval_path.parent,
+            self.project_dir / "evals",
+            self.project_dir,
+            self.project_dir / "src",
+        ]
+        hashes: Dict[str, str] = {}
+        pending = [eval_path]
+        seen = {eval_path}
+        while pending:
+            path = pending.pop()
+            sha, imports = self.module(path)
+            hashes[self.relative(path)] = sha
+            for name, level in imports:
+                for found in resolve_import(name, level, path, roots):
+                    found = found.resolve()
+                    if found not in seen and found.is_relative_to(self.project_dir):
+                        seen.add(found)
+                        pending.append(found)
+        self.conn.commit()
+        return hashes
+
+    def key(self, dependencies: Dict[str, str]) -> str:
+        digest = hashlib.sha256(CACHE_VERSION.encode())
+        for path, sha in sorted(dependencies.items()):
+            digest.update(f"\0{path}\0{sha}".encode())
+        return digest.hexdigest()
+
+    def get(self, eval_path: Path, key: str) -> Optional[List[Dict[str, Any]]]:
+        """Cached results (as EvalResult fields) if recorded under ``key``."""
+        row = self.conn.execute(
+            "SELECT results FROM eval_results WHERE eval_file = ? AND key = ?",
+            (self.relative(eval_path), key)
+        ).fetchone()
+        return json.loads(row[0]) if row is not None else None
+
+    def put(self, eval_path: Path, key: str, dependencies: Dict[str, str],
+            results: List[Dict[str, Any]]) -> None:
+        """Record plain results (see run_evals.portable_result) as JSON."""
+        stored = [{name: json_value(value) for name, value in r.items()} for r in results]
+        self.conn.execute(
+            "INSERT OR REPLACE INTO eval_results VALUES (?, ?, ?, ?, ?)",
+            (self.relative(eval_path), key, json.dumps(sorted(dependencies)),
+             json.dumps(stored), time.time())
+        )
+        self.conn.commit()
+
+    def discard(self, eval_path: Path) -> None:
+        self.conn.execute(
+            "DELETE FROM eval_results WHERE eval_file = ?", (self.relative(eval_path),)
+        )
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def spec_ids_of(eval_path: Path) -> List[str]:
+    """Spec IDs declared by one eval file (empty if it doesn't parse)."""
+    try:
+        return declared_spec_ids(eval_path.read_text(encoding="utf-8"))
+    except (SyntaxError, UnicodeDecodeError, ValueError):
+        return []
+
+
+def open_eval_cache(project_dir: Path) -> Optional[EvalCache]:
+    """Open the eval cache for a project, or None if it can't be written."""
+    try:
+        return EvalCache(project_dir)
+    except (sqlite3.Error, OSError):
+        return None
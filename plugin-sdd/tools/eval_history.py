@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""
+Eval run history for run_evals.py.
+
+Every run records each eval's outcome, wall time, peak RSS and failure
+signature in .claude/cache/evals/history.db. The runner reads it back to
+schedule the next run (files that failed last time first, for fast
+feedback, then longest first, so --jobs workers finish together) and
+``run_evals.py history`` reports pass-rate trends, the slowest evals and
+flaky ones.
+
+An eval counts as flaky when it both passed and failed while its code
+(the eval_cache dependency key) was unchanged.
+"""
+
+import re
+import sqlite3
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+HISTORY_PATH = Path(".claude/cache/evals/history.db")
+
+# Runs whose durations inform scheduling
+SCHEDULE_RUNS = 5
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    id INTEGER PRIMARY KEY,
+    started_at TEXT NOT NULL,
+    wall_ms REAL NOT NULL,
+    jobs INTEGER NOT NULL,
+    evals INTEGER NOT NULL,
+    passed INTEGER NOT NULL,
+    cached INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS file_runs (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    eval_file TEXT NOT NULL,
+    code_key TEXT,
+    wall_ms REAL NOT NULL,
+    failed INTEGER NOT NULL,
+    PRIMARY KEY (eval_file, run_id)
+);
+
+CREATE TABLE IF NOT EXISTS eval_runs (
+    run_id INTEGER NOT NULL REFERENCES runs(id) ON DELETE CASCADE,
+    eval_file TEXT NOT NULL,
+    spec_id TEXT NOT NULL,
+    description TEXT NOT NULL,
+    passed INTEGER NOT NULL,
+    failure TEXT,
+    wall_ms REAL,
+    peak_rss_kb INTEGER
+);
+
+CREATE INDEX IF NOT EXISTS idx_eval_runs_run ON eval_runs(run_id);
+CREATE INDEX IF NOT EXISTS idx_eval_runs_spec ON eval_runs(spec_id, run_id);
+"""
+
+VOLATILE = re.compile(r"0x[0-9a-fA-F]+|\d+(?:\.\d+)?")
+
+
+def failure_signature(result: Any) -> Optional[str]:
+    """What went wrong, with addresses and numbers blanked so the same
+    failure gets the same signature from run to run."""
+    if result.passed:
+        return None
+    if result.error:
+        text = str(result.error)
+    else:
+        text = f"expected {result.expected}, got {result.actual}"
+    return VOLATILE.sub("#", text)[:200]
+
+
+class EvalHistory:
+    """Per-run eval outcomes and durations for one project."""
+
+    def __init__(self, project_dir: Path):
+        self.project_dir = project_dir.resolve()
+        path = self.project_dir / HISTORY_PATH
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, timeout=5.0)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA foreign_keys = ON")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def relative(self, path: Path) -> str:
+        return path.resolve().relative_to(self.project_dir).as_posix()
+
+    def schedule(self, eval_files: List[Path]) -> List[Path]:
+        """Files that failed last run first, then by recent duration,
+        longest first; files never run before count as longest."""
+        stats = {
+            row[0]: (row[1], row[2])
+            for row in self.conn.execute("""
+                SELECT eval_file,
+                       (SELECT failed FROM file_runs last WHERE last.eval_file = f.eval_file
+                        ORDER BY run_id DESC LIMIT 1),
+                       AVG(wall_ms)
+                FROM file_runs f
+                WHERE run_id IN (SELECT run_id FROM file_runs r WHERE r.eval_file = f.eval_file
+                                 ORDER BY run_id DESC LIMIT ?)
+                GROUP BY eval_file
+            """, (SCHEDULE_RUNS,))
+        }
+
+        def priority(eval_file: Path):
+            failed, wall_ms = stats.get(self.relative(eval_file), (0, None))
+            return (not failed, -(wall_ms if wall_ms is not None else float("inf")))
+
+        return sorted(eval_files, key=priority)
+
+    def record_run(
+        self,
+        started_at: float,
+        jobs: int,
+        by_file: Dict[Path, List[Any]],
+        durations: Dict[Path, float],
+        code_keys: Dict[Path, str]
+    ) -> int:
+        """Record one run; files served from the eval cache didn't run and
+        are only counted."""
+        results = [r for file_results in by_file.values() for r in file_results]
+        cached = sum(1 for r in results if getattr(r, 'cached', False))
+        cursor = self.conn.execute(
+            "INSERT INTO runs (started_at, wall_ms, jobs, evals, passed, cached) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(started_at)),
+                (time.time() - started_at) * 1000,
+                jobs,
+                len(results),
+                sum(1 for r in results if r.passed),
+                cached,
+            )
+        )
+        run_id = cursor.lastrowid
+        for eval_file, file_results in by_file.items():
+            if eval_file not in durations:
+                continue
+            relative = self.relative(eval_file)
+            self.conn.execute(
+                "INSERT INTO file_runs VALUES (?, ?, ?, ?, ?)",
+                (run_id, relative, code_keys.get(eval_file), durations[eval_file],
+                 int(any(not r.passed for r in file_results)))
+            )
+            self.conn.executemany(
+                "INSERT INTO eval_runs VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (run_id, relative, r.spec_id, r.description, int(r.passed),
+                     failure_signature(r), getattr(r, 'wall_ms', None),
+                     getattr(r, 'peak_rss_kb', None))
+                    for r in file_results
+                ]
+            )
+        self.conn.commit()
+        return run_id
+
+    def report(self, runs: int = 20, top: int = 10) -> Dict[str, List[Dict[str, Any]]]:
+        """Pass-rate trend, per-spec pass rates, slowest and flaky evals over
+        the last ``runs`` runs."""
+        def rows(sql: str, params=()) -> List[Dict[str, Any]]:
+            cursor = self.conn.execute(sql, params)
+            columns = [desc[0] for desc in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
+
+        self.conn.execute("DROP TABLE IF EXISTS temp.window")
+        self.conn.execute(
+            "CREATE TEMP TABLE window AS SELECT id FROM runs ORDER BY id DESC LIMIT ?", (runs,)
+        )
+        return {
+            "runs": rows("""
+                SELECT id, started_at, wall_ms, jobs, evals, passed, cached
+                FROM runs WHERE id IN (SELECT id FROM temp.window) ORDER BY id
+            """),
+            "specs": rows("""
+                SELECT spec_id, COUNT(*) AS results, SUM(passed) AS passed,
+                       GROUP_CONCAT(CASE WHEN passed THEN '+' ELSE 'x' END, '') AS trend
+                FROM (SELECT run_id, spec_id, MIN(passed) AS passed FROM eval_runs
+                      WHERE run_id IN (SELECT id FROM temp.window)
+                      GROUP BY run_id, spec_id ORDER BY run_id)
+                GROUP BY spec_id ORDER BY spec_id
+            """),
+            "slowest": rows("""
+                SELECT spec_id, description, eval_file, AVG(wall_ms) AS wall_ms,
+                       MAX(peak_rss_kb) AS peak_rss_kb, COUNT(*) AS runs
+                FROM eval_runs
+                WHERE run_id IN (SELECT id FROM temp.window) AND wall_ms IS NOT NULL
+                GROUP BY eval_file, spec_id, description
+                ORDER BY wall_ms DESC LIMIT ?
+            """, (top,)),
+            "flaky": rows("""
+                SELECT e.spec_id, e.description, e.eval_file,
+                       COUNT(*) AS runs, COUNT(*) - SUM(e.passed) AS failures,
+                       (SELECT failure FROM eval_runs last
+                        WHERE last.eval_file = e.eval_file AND last.description = e.description
+                          AND last.failure IS NOT NULL
+                        ORDER BY run_id DESC LIMIT 1) AS failure
+                FROM eval_runs e
+                JOIN file_runs f ON f.run_id = e.run_id AND f.eval_file = e.eval_file
+                WHERE e.run_id IN (SELECT id FROM temp.window)
+                GROUP BY e.eval_file, e.spec_id, e.description, f.code_key
+                HAVING MIN(e.passed) = 0 AND MAX(e.passed) = 1
+                ORDER BY e.spec_id, failures DESC
+            """),
+        }
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def open_history(project_dir: Path) -> Optional[EvalHistory]:
+    """Open a project's eval history, or None if it can't be written."""
+    try:
+        return EvalHistory(project_dir)
+    except (sqlite3.Error, OSError):
+        return None
+
+
+def format_history(report: Dict[str, List[Dict[str, Any]]]) -> str:
+    """Human-readable ``run_evals.py history`` output."""
+    if not report["runs"]:
+        return "[info] No eval runs recorded yet."
+    lines = ["", "=" * 60, f"EVAL HISTORY (last {len(report['runs'])} runs)", "=" * 60, ""]
+
+    lines.append("Runs:")
+    for run in report["runs"]:
+        ran = run["evals"] - run["cached"]
+        cached = f", {run['cached']} cached" if run["cached"] else ""
+        lines.append(
+            f"  {run['started_at']}  {run['passed']}/{run['evals']} passed"
+            f"  {run['wall_ms'] / 1000:.1f}s  ({ran} ran{cached}, jobs {run['jobs']})"
+        )
+
+    lines.extend(["", "By spec (oldest run first):"])
+    for spec in report["specs"]:
+        runs = len(spec["trend"])
+        rate = 100 * spec["passed"] / runs if runs else 0
+        lines.append(f"  {spec['spec_id']}: {rate:.0f}% of {runs} runs passed  {spec['trend']}")
+
+    if report["slowest"]:
+        lines.extend(["", "Slowest evals (average):"])
+        for row in report["slowest"]:
+            memory = f", {row['peak_rss_kb'] / 1024:.1f} MB" if row["peak_rss_kb"] else ""
+            lines.append(
+                f"  {row['wall_ms']:8.0f} ms{memory}  {row['spec_id']}  {row['description']}"
+                f"  ({row['eval_file']})"
+            )
+
+    lines.extend(["", "Flaky evals (passed and failed on unchanged code):"])
+    if not report["flaky"]:
+        lines.append("  none")
+    for row in report["flaky"]:
+        lines.append(
+            f"  {row['spec_id']}  {row['description']}: failed {row['failures']}/{row['runs']}"
+            f"  ({row['eval_file']})"
+        )
+        if row["failure"]:
+            lines.append(f"      Last failure: {row['failure']}")
+    lines.append("")
+    return "\n".join(lines)
@@ -1,12 +1,45 @@
 #!/usr/bin/env python
-"""Eval runner: discover and run evals, report results."""
+"""Eval runner: discover and run evals, report results.
+
+Each eval file runs in its own supervised worker process (up to --jobs at
+once). A worker reports every eval method as it starts and finishes, with
+its wall time and peak RSS. An eval that outlives --timeout, or exceeds the
+--max-cpu / --max-memory caps, has its worker killed; it is recorded as a
+failed EvalResult with error "timeout" or "memory", and the rest of the
+file carries on in a fresh worker. Time spent outside any eval (module
+import, run_all setup) counts against --timeout too.
+
+Results are cached by the content of each eval file and the project
+modules it imports (see eval_cache.py); --changed re-runs only the evals
+whose files or imported modules changed and shows the rest marked [cached].
+
+Runs are recorded in a history store (see eval_history.py), which orders
+the next run: last run's failures first, then longest first. `history`
+reports pass-rate trends, the slowest evals and flaky ones.
+
+--spec picks eval files by the spec IDs they declare, read from a map
+that is refreshed by mtime, so only the selected files are imported.
+"""
 
 import argparse
+import fnmatch
 import importlib.util
+import multiprocessing
+import signal
 import sys
-from dataclasses import dataclass
+import time
+from dataclasses import dataclass, fields
+from multiprocessing.connection import wait
 from pathlib import Path
-from typing import Any, List, Optional
+from typing import Any, Callable, Dict, List, Optional
+
+from eval_cache import open_eval_cache, spec_ids_of
+from eval_history import format_history, open_history
+
+try:
+    import resource
+except ImportError:  # Windows: no resource limits or rusage
+    resource = None
 
 @dataclass
 class EvalResult:
@@ -17,6 +50,17 @@ class EvalResult:
     expected: Any
     actual: Any = None
     error: Optional[str] = None
+    wall_ms: Optional[float] = None
+    peak_rss_kb: Optional[int] = None
+    cached: bool = False
+
+@dataclass
+class Limits:
+    """Per-eval and per-file limits for supervised workers (0 = none)."""
+    eval_timeout: float = 0
+    file_timeout: float = 0
+    max_memory_mb: int = 0
+    max_cpu: int = 0
 
 def discover_evals(evals_dir: Path, module: Optional[str] = None) -> List[Path]:
     """Find all eval files in the evals directory."""
@@ -46,8 +90,12 @@ def load_eval_module(eval_path: Path):
         print(f"[error] Failed to load {eval_path}: {e}")
         return None
 
-def run_eval_file(eval_path: Path) -> List[EvalResult]:
-    """Run all evals in a single eval file."""
+def run_eval_file(eval_path: Path, measure: Optional[Callable] = None) -> List[EvalResult]:
+    """Run all evals in a single eval file.
+
+    ``measure(key, func, spec_id)``, if given, wraps every eval method and
+    eval_ function before it runs.
+    """
     module = load_eval_module(eval_path)
     if module is None:
         return [EvalResult(
@@ -66,6 +114,12 @@ def run_eval_file(eval_path: Path) -> List[EvalResult]:
         if isinstance(obj, type) and hasattr(obj, 'run_all'):
             try:
                 instance = obj()
+                if measure is not None:
+                    spec_id = getattr(obj, 'spec_id', '<unknown>')
+                    for attr in dir(instance):
+                        method = getattr(instance, attr)
+                        if attr.startswith('eval_') and callable(method):
+                            setattr(instance, attr, measure(f"{name}.{attr}", method, spec_id))
                 eval_results = instance.run_all()
                 if isinstance(eval_results, list):
                     for r in eval_results:
@@ -85,6 +139,8 @@ def run_eval_file(eval_path: Path) -> List[EvalResult]:
         for name in dir(module):
             if name.startswith('eval_') and callable(getattr(module, name)):
                 func = getattr(module, name)
+                if measure is not None:
+                    func = measure(name, func, "<unknown>")
                 try:
                     result = func()
                     if hasattr(result, 'passed'):
@@ -100,6 +156,341 @@ def run_eval_file(eval_path: Path) -> List[EvalResult]:
 
     return results
 
+PLAIN_TYPES = (type(None), bool, int, float, complex, str, bytes)
+
+def is_plain(value: Any) -> bool:
+    """Whether ``value`` is builtin scalars in builtin containers only."""
+    if type(value) in PLAIN_TYPES:
+        return True
+    if type(value) in (list, tuple, set, frozenset):
+        return all(is_plain(item) for item in value)
+    if type(value) is dict:
+        return all(is_plain(k) and is_plain(v) for k, v in value.items())
+    return False
+
+def plain_value(value: Any) -> Any:
+    """``value`` itself if it is plain data, else its repr().
+
+    Only plain data leaves a worker: an eval's own classes may be importable
+    there (through its sys.path tweaks) but not in the parent.
+    """
+    try:
+        if is_plain(value):
+            return value
+    except RecursionError:  # A container that holds itself
+        pass
+    return repr(value)
+
+def portable_result(result: Any) -> Dict[str, Any]:
+    """An eval's result as plain fields that can leave a worker process.
+
+    Eval files define their own EvalResult classes, which the parent can't
+    unpickle, so only the fields are sent, as plain values.
+    """
+    return {
+        field.name: plain_value(getattr(result, field.name, field.default))
+        for field in fields(EvalResult)
+    }
+
+def peak_rss_kb(reset: bool = False) -> Optional[int]:
+    """This process's peak resident set size in KB.
+
+    On Linux the peak can be reset, so it is measured per eval; elsewhere
+    it is the process's peak so far.
+    """
+    try:
+        if reset:
+            with open("/proc/self/clear_refs", "w") as f:
+                f.write("5")
+            return None
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    if reset or resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak // 1024 if sys.platform == "darwin" else peak  # Bytes on macOS
+
+def cap_cpu(seconds: int) -> None:
+    """Let the next eval use at most ``seconds`` more CPU time."""
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    used = int(usage.ru_utime + usage.ru_stime) + 1
+    _, hard = resource.getrlimit(resource.RLIMIT_CPU)
+    resource.setrlimit(resource.RLIMIT_CPU, (used + seconds, hard))
+
+def eval_worker(eval_path: str, conn, limits: Limits,
+                replay: Dict[str, Dict[str, Any]], skip: Dict[str, str]) -> None:
+    """Worker process: run one eval file, reporting each eval as it goes.
+
+    Sends ("start", key, spec_id), ("end", key, fields) per eval and finally
+    ("done", [fields, ...]). Evals in ``replay`` already ran in an earlier
+    worker and return their recorded result; evals in ``skip`` were killed
+    and return a failure with the recorded error.
+    """
+    if limits.max_memory_mb:
+        memory = limits.max_memory_mb * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (memory, memory))
+    measured: Dict[int, tuple] = {}
+
+    def measure(key: str, func: Callable, spec_id: str) -> Callable:
+        def run(*args, **kwargs):
+            if key in replay:
+                return EvalResult(**replay[key])
+            if key in skip:
+                return EvalResult(
+                    passed=False,
+                    spec_id=spec_id,
+                    description=key,
+                    expected="eval to finish",
+                    error=skip[key]
+                )
+            conn.send(("start", key, spec_id))
+            if limits.max_cpu:
+                cap_cpu(limits.max_cpu)
+            peak_rss_kb(reset=True)
+            start = time.perf_counter()
+            try:
+                result = func(*args, **kwargs)
+            except MemoryError:
+                result = EvalResult(
+                    passed=False,
+                    spec_id=spec_id,
+                    description=key,
+                    expected="eval to run",
+                    error="memory"
+                )
+            wall_ms = (time.perf_counter() - start) * 1000
+            rss = peak_rss_kb()
+            reported = None
+            if hasattr(result, 'passed'):
+                reported = dict(portable_result(result), wall_ms=wall_ms, peak_rss_kb=rss)
+                measured[id(result)] = (result, wall_ms, rss)
+            conn.send(("end", key, reported))
+            return result
+        return run
+
+    results = []
+    for result in run_eval_file(Path(eval_path), measure):
+        portable = portable_result(result)
+        if id(result) in measured:
+            _, portable["wall_ms"], portable["peak_rss_kb"] = measured[id(result)]
+        results.append(portable)
+    conn.send(("done", results))
+    conn.close()
+
+@dataclass
+class Worker:
+    """A running eval file, as seen by the supervisor."""
+    index: int
+    process: Any
+    conn: Any
+    started: float
+    replay: Dict[str, Dict[str, Any]]
+    skip: Dict[str, str]
+    current: Optional[str] = None
+    current_spec: str = "<unknown>"
+    current_started: float = 0.0  # Or, between evals, when the last one ended
+    killed: bool = False
+
+def exit_error(exitcode: Optional[int], limits: Limits, killed: bool = False) -> str:
+    """The error recorded for an eval whose worker died under it."""
+    if exitcode == -getattr(signal, "SIGXCPU", 0):
+        return "timeout"  # RLIMIT_CPU
+    if exitcode == -getattr(signal, "SIGKILL", 0) and limits.max_memory_mb and not killed:
+        return "memory"  # The kernel's OOM killer, under --max-memory
+    return f"worker exited with code {exitcode}"
+
+def run_supervised(eval_files: List[Path], project_dir: Path, jobs: int = 1,
+                   limits: Optional[Limits] = None, summary: bool = False,
+                   durations: Optional[Dict[Path, float]] = None) -> List[List[EvalResult]]:
+    """Run each eval file in a supervised worker, up to ``jobs`` at once.
+
+    Files start in the order given. Returns each file's results in that
+    order too, so the report doesn't depend on which file finished first.
+    Each file's wall time (ms) goes into ``durations``, if given.
+    """
+    limits = limits or Limits()
+    by_file: List[List[EvalResult]] = [[] for _ in eval_files]
+    pending = list(range(len(eval_files)))
+    running: List[Worker] = []
+
+    def start(index: int, replay: Dict, skip: Dict, started: Optional[float] = None) -> Worker:
+        reader, writer = multiprocessing.Pipe(duplex=False)
+        # Not daemonic, so evals can start their own process pools; the
+        # supervisor kills and joins every worker itself
+        process = multiprocessing.Process(
+            target=eval_worker,
+            args=(str(eval_files[index]), writer, limits, replay, skip),
+            daemon=False,
+        )
+        process.start()
+        writer.close()
+        now = time.monotonic()
+        return Worker(index, process, reader, started or now, replay, skip, current_started=now)
+
+    def finish(worker: Worker, results: List[EvalResult]) -> None:
+        running.remove(worker)
+        worker.process.join()
+        worker.conn.close()
+        by_file[worker.index] = results
+        if durations is not None:
+            durations[eval_files[worker.index]] = (time.monotonic() - worker.started) * 1000
+        if not summary and jobs > 1:
+            print(f"Finished: {eval_files[worker.index].relative_to(project_dir)}", flush=True)
+
+    def stop(worker: Worker) -> None:
+        worker.killed = worker.process.is_alive()
+        worker.process.kill()
+        worker.process.join()
+        worker.conn.close()
+
+    try:
+        while pending or running:
+            while pending and len(running) < jobs:
+                index = pending.pop(0)
+                if not summary and jobs == 1:
+                    print(f"Running: {eval_files[index].relative_to(project_dir)}", flush=True)
+                running.append(start(index, {}, {}))
+
+            now = time.monotonic()
+            deadlines = []
+            for worker in running:
+                if limits.file_timeout:
+                    deadlines.append(worker.started + limits.file_timeout)
+                if limits.eval_timeout:
+                    deadlines.append(worker.current_started + limits.eval_timeout)
+            timeout = max(0.0, min(deadlines) - now) if deadlines else None
+            wait([w.conn for w in running] + [w.process.sentinel for w in running], timeout)
+
+            now = time.monotonic()
+            for worker in list(running):
+                done = None
+                unreadable = None
+                try:
+                    while worker.conn.poll():
+                        message = worker.conn.recv()
+                        if message[0] == "start":
+                            worker.current, worker.current_spec = message[1], message[2]
+                            worker.current_started = now
+                        elif message[0] == "end":
+                            if message[2] is not None:
+                                worker.replay[message[1]] = message[2]
+                            worker.current = None
+                            worker.current_started = now
+                        else:
+                            done = message[1]
+                except (EOFError, OSError):
+                    pass
+                except Exception as e:  # A message that won't unpickle here
+                    unreadable = f"unreadable worker result: {type(e).__name__}: {e}"
+                if done is not None:
+                    finish(worker, [EvalResult(**result) for result in done])
+                    continue
+
+                current = worker.current
+                if unreadable is not None:
+                    stop(worker)
+                    results = [EvalResult(**result) for result in worker.replay.values()]
+                    results.append(EvalResult(
+                        passed=False,
+                        spec_id=worker.current_spec if current else "<unknown>",
+                        description=current or f"Failed to run {eval_files[worker.index].name}",
+                        expected="eval result to reach the runner",
+                        error=unreadable
+                    ))
+                    finish(worker, results)
+                    continue
+                if limits.file_timeout and now - worker.started >= limits.file_timeout:
+                    stop(worker)
+                    results = [EvalResult(**result) for result in worker.replay.values()]
+                    results.append(EvalResult(
+                        passed=False,
+                        spec_id=worker.current_spec if current else "<unknown>",
+                        description=current or f"{eval_files[worker.index].name} (whole file)",
+                        expected=f"file to finish within {limits.file_timeout:g}s",
+                        error="timeout",
+                        wall_ms=(now - worker.started) * 1000
+                    ))
+                    finish(worker, results)
+                elif (
+                    current is None and limits.eval_timeout and worker.process.is_alive()
+                    and now - worker.current_started >= limits.eval_timeout
+                ):
+                    # Stuck outside any eval (module import, run_all setup):
+                    # a rerun would hang the same way
+                    stop(worker)
+                    results = [EvalResult(**result) for result in worker.replay.values()]
+                    results.append(EvalResult(
+                        passed=False,
+                        spec_id="<unknown>",
+                        description=f"{eval_files[worker.index].name} (outside any eval)",
+                        expected=f"file to reach its next eval within {limits.eval_timeout:g}s",
+                        error="timeout",
+                        wall_ms=(now - worker.current_started) * 1000
+                    ))
+                    finish(worker, results)
+                elif (
+                    current is not None and limits.eval_timeout
+                    and now - worker.current_started >= limits.eval_timeout
+                ):
+                    # Rerun the file without the hung eval; finished evals replay
+                    stop(worker)
+                    running.remove(worker)
+                    running.append(start(
+                        worker.index, worker.replay, dict(worker.skip, **{current: "timeout"}),
+                        worker.started
+                    ))
+                elif not worker.process.is_alive():
+                    stop(worker)
+                    error = exit_error(worker.process.exitcode, limits, worker.killed)
+                    if current is not None:
+                        running.remove(worker)
+                        running.append(start(
+                            worker.index, worker.replay, dict(worker.skip, **{current: error}),
+                            worker.started
+                        ))
+                    else:
+                        results = [EvalResult(**result) for result in worker.replay.values()]
+                        results.append(EvalResult(
+                            passed=False,
+                            spec_id="<unknown>",
+                            description=f"Failed to run {eval_files[worker.index].name}",
+                            expected="eval file to run",
+                            error=error
+                        ))
+                        finish(worker, results)
+    finally:
+        # Workers aren't daemonic: stop any still running if interrupted
+        for worker in running:
+            stop(worker)
+
+    return by_file
+
+def matches_spec(spec_id: str, patterns: List[str]) -> bool:
+    """Whether a spec ID matches any --spec pattern (globs allowed)."""
+    return any(fnmatch.fnmatchcase(spec_id.upper(), p.upper()) for p in patterns)
+
+def cacheable(results: List[EvalResult]) -> bool:
+    """Whether a file's results depend only on its code: not on this run's
+    limits, nor on a missing package that may since have been installed."""
+    return not any(
+        r.error in ("timeout", "memory", "Module load failed")
+        or str(r.error).startswith("worker exited")
+        for r in results
+    )
+
+def format_measure(result: EvalResult) -> str:
+    """Wall time and peak RSS of one eval, when they were measured."""
+    parts = []
+    if getattr(result, 'wall_ms', None) is not None:
+        parts.append(f"{result.wall_ms:.0f} ms")
+    if getattr(result, 'peak_rss_kb', None) is not None:
+        parts.append(f"{result.peak_rss_kb / 1024:.1f} MB")
+    return f" ({', '.join(parts)})" if parts else ""
+
 def print_results(results: List[EvalResult], verbose: bool = False) -> int:
     """Print eval results and return exit code."""
     if not results:
@@ -130,7 +521,9 @@ def print_results(results: List[EvalResult], verbose: bool = False) -> int:
 
         for r in spec_results:
             icon = "+" if r.passed else "x"
-            print(f"  [{icon}] {r.description}")
+            measure = format_measure(r) if verbose else ""
+            marker = " [cached]" if getattr(r, 'cached', False) else ""
+            print(f"  [{icon}] {r.description}{measure}{marker}")
             if not r.passed and (verbose or r.error):
                 if r.error:
                     print(f"      Error: {r.error}")
@@ -165,25 +558,129 @@ def cmd_run(args: argparse.Namespace) -> int:
             print("[info] No evals found in evals/")
         return 0
 
-    all_results: List[EvalResult] = []
-    for eval_file in eval_files:
-        if not args.summary:
-            print(f"Running: {eval_file.relative_to(project_dir)}")
-        results = run_eval_file(eval_file)
-        all_results.extend(results)
+    # --spec: pick files by their declared spec IDs, without importing them
+    cache = open_eval_cache(project_dir)
+    specs = getattr(args, 'spec', None)
+    if specs:
+        if cache is not None:
+            declared = cache.spec_ids(eval_files)
+        else:
+            declared = {f: spec_ids_of(f) for f in eval_files}
+        eval_files = [
+            f for f in eval_files if any(matches_spec(s, specs) for s in declared[f])
+        ]
+        if not eval_files:
+            print(f"[info] No evals found for spec: {', '.join(specs)}")
+            if cache is not None:
+                cache.close()
+            return 0
+
+    limits = Limits(
+        eval_timeout=getattr(args, 'timeout', 0),
+        file_timeout=getattr(args, 'file_timeout', 0),
+        max_memory_mb=getattr(args, 'max_memory', 0),
+        max_cpu=getattr(args, 'max_cpu', 0),
+    )
+    # Key every file on its dependencies' content; --changed serves hits
+    keys: Dict[Path, tuple] = {}
+    by_file: Dict[Path, List[EvalResult]] = {}
+    if cache is not None:
+        for eval_file in eval_files:
+            dependencies = cache.dependencies(eval_file)
+            keys[eval_file] = (cache.key(dependencies), dependencies)
+            hit = cache.get(eval_file, keys[eval_file][0]) if getattr(args, 'changed', False) else None
+            if hit is not None:
+                by_file[eval_file] = [EvalResult(**dict(r, cached=True)) for r in hit]
+                if not args.summary:
+                    print(f"Cached: {eval_file.relative_to(project_dir)}")
+    elif getattr(args, 'changed', False):
+        print("[warn] Eval cache unavailable; running every eval")
+
+    # Last run's failures first for fast feedback, then longest first so
+    # workers finish together
+    history = open_history(project_dir)
+    to_run = [f for f in eval_files if f not in by_file]
+    if history is not None:
+        to_run = history.schedule(to_run)
+
+    jobs = max(1, min(getattr(args, 'jobs', 1), len(to_run) or 1))
+    if jobs > 1 and not args.summary:
+        print(f"Running {len(to_run)} eval files in {jobs} workers")
+    started = time.time()
+    durations: Dict[Path, float] = {}
+    for eval_file, results in zip(to_run, run_supervised(
+        to_run, project_dir, jobs, limits, args.summary, durations
+    )):
+        by_file[eval_file] = results
+        if cache is not None and cacheable(results):
+            key, dependencies = keys[eval_file]
+            cache.put(eval_file, key, dependencies, [portable_result(r) for r in results])
+        elif cache is not None:
+            cache.discard(eval_file)
+    if cache is not None:
+        cache.close()
+    if history is not None:
+        history.record_run(
+            started, jobs, {f: by_file[f] for f in eval_files}, durations,
+            {f: key for f, (key, _) in keys.items()}
+        )
+        history.close()
 
+    all_results = [r for eval_file in eval_files for r in by_file[eval_file]]
+    if specs:
+        # Files run whole (so their cached results stay complete); report
+        # the requested specs, plus anything that failed before naming one
+        all_results = [
+            r for r in all_results
+            if matches_spec(r.spec_id, specs) or (r.spec_id == "<unknown>" and not r.passed)
+        ]
     return print_results(all_results, verbose=not args.summary)
 
+def cmd_history(args: argparse.Namespace) -> int:
+    """Show pass-rate trends, slowest and flaky evals from past runs."""
+    history = open_history(Path(args.project_dir))
+    if history is None:
+        print("[error] Eval history unavailable")
+        return 1
+    print(format_history(history.report(args.runs)))
+    history.close()
+    return 0
+
 def main():
     parser = argparse.ArgumentParser(description="Run evals to validate implementation.")
+    parser.add_argument("command", nargs="?", default="run", choices=["run", "history"],
+                        help="run evals (default), or show history of past runs")
     parser.add_argument("--all", action="store_true", help="Run all evals")
     parser.add_argument("--module", type=str, help="Run evals for specific module")
-    parser.add_argument("--spec", type=str, help="Run evals for specific spec ID")
+    parser.add_argument("--spec", type=str, action="append",
+                        help="Run evals for a spec ID or glob (SPEC-042, 'SPEC-04*'); repeatable")
     parser.add_argument("--summary", action="store_true", help="Show summary only")
     parser.add_argument("--project-dir", type=str, default=".", help="Project directory")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Run eval files in N worker processes (default: 1)")
+    parser.add_argument("--changed", action="store_true",
+                        help="Only re-run evals whose file or imported modules changed")
+    parser.add_argument("--timeout", type=float, default=300,
+                        help="Fail an eval, or a file's import and setup between evals, running "
+                             "longer than N seconds, 0 = never (default: 300; before "
+                             "supervision, evals had no limit)")
+    parser.add_argument("--file-timeout", type=float, default=0,
+                        help="Stop an eval file running longer than N seconds (default: never)")
+    parser.add_argument("--max-memory", type=int, default=0,
+                        help="Cap each worker's address space at N MB (RLIMIT_AS)")
+    parser.add_argument("--max-cpu", type=int, default=0,
+                        help="Cap each eval at N seconds of CPU time (RLIMIT_CPU)")
+    parser.add_argument("--runs", type=int, default=20,
+                        help="history: how many recent runs to report (default: 20)")
 
     args = parser.parse_args()
 
+    if (args.max_memory or args.max_cpu) and resource is None:
+        parser.error("--max-memory and --max-cpu need the resource module (Unix only)")
+
+    if args.command == "history":
+        return cmd_history(args)
+
     if not args.all and not args.module and not args.spec:
         # Default to running all
         args.all = True
@@ -0,0 +1,27 @@
+"""Tests for artifact_bench.py's corpus and report."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_bench import generate_corpus, run_benchmark  # noqa: E402
+
+
+def test_corpus_is_reproducible_from_seed(tmp_path):
+    first = generate_corpus(tmp_path / "a", 20, seed=7)
+    second = generate_corpus(tmp_path / "b", 20, seed=7)
+    for artifact_type, paths in first.items():
+        assert [p.read_text() for p in paths] == [p.read_text() for p in second[artifact_type]]
+
+
+def test_report_counts_full_noop_and_incremental_runs(tmp_path):
+    report = run_benchmark(tmp_path, scale=40, seed=1, jobs=1, repeat=1, touch=0.1)
+    total = sum(report["corpus"].values())
+    full, noop, incremental = (report["index"][run] for run in ("full", "noop", "incremental"))
+
+    assert full["added"] == total
+    assert (noop["added"], noop["updated"], noop["unchanged"]) == (0, 0, total)
+    assert incremental["updated"] == incremental["files_touched"]
+    assert {"handoffs", "specs", "plans", "continuity", "unified"} <= set(report["query"])
+    assert report["db_size_bytes"] > 0
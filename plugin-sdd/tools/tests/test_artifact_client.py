@@ -0,0 +1,52 @@
+"""Tests for artifact_client.py's socket checks and fast path."""
+
+import os
+import socket
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_client import fast_request, private_dir, trusted_socket  # noqa: E402
+
+
+def bind(path: Path) -> socket.socket:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.bind(str(path))
+    return sock
+
+
+def test_socket_trusted_only_in_private_directory(tmp_path):
+    shared = tmp_path / "shared"
+    shared.mkdir()
+    os.chmod(shared, 0o755)
+    private = tmp_path / "private"
+    assert private_dir(str(private), create=True)
+    assert not private_dir(str(shared))
+
+    for directory, trusted in ((private, True), (shared, False)):
+        sock = bind(directory / "q.sock")
+        try:
+            assert trusted_socket(str(directory / "q.sock")) is trusted
+        finally:
+            sock.close()
+    (private / "plain").write_text("not a socket")
+    assert not trusted_socket(str(private / "plain"))
+
+
+def test_fast_path_takes_plain_searches_only(tmp_path):
+    db = tmp_path / "context.db"
+    db.write_bytes(b"")
+
+    request = fast_request(["token", "refresh", "--type", "handoffs", "--limit=3", "--db", str(db)])
+    assert request["query"] == "token refresh"
+    assert (request["type"], request["limit"], request["format"]) == ("handoffs", 3, True)
+
+    for argv in (
+        ["token", "--db", str(db), "--save"],
+        ["token", "--db", str(db), "--type", "bogus"],
+        ["token", "--db", str(db), "--limit", "0"],
+        ["token", "--db", str(tmp_path / "missing.db")],
+        ["--db", str(db)],
+    ):
+        assert fast_request(argv) is None, argv
@@ -0,0 +1,346 @@
+"""Tests for artifact_index.py's incremental indexing."""
+
+import json
+import os
+import sqlite3
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import artifact_index  # noqa: E402
+from artifact_index import (  # noqa: E402
+    ARTIFACT_TYPES, TRUNCATION_MARK, deferred_fts, generate_id, index_attempts, index_files, index_paths,
+    index_reasoning, init_db, maintain, parse_markdown,
+)
+
+HANDOFF = """# Handoff
+
+## Task Summary
+Refresh tokens before they expire.
+
+## What Worked
+Retrying once after a 401.
+"""
+
+LEDGER = """# Continuity
+
+## Goal
+Ship token refresh.
+"""
+
+
+def write(path: Path, text: str) -> str:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def count(conn, table: str) -> int:
+    return conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+
+def matches(conn, table: str, term: str) -> int:
+    return conn.execute(
+        f"SELECT COUNT(*) FROM {table}_fts WHERE {table}_fts MATCH ?", (term,)
+    ).fetchone()[0]
+
+
+# The handoffs, continuity and queries tables as the first release created them
+BASELINE_SCHEMA = """
+CREATE TABLE handoffs (
+    id TEXT PRIMARY KEY,
+    session_name TEXT NOT NULL,
+    task_number INTEGER,
+    file_path TEXT NOT NULL,
+    task_summary TEXT,
+    what_worked TEXT,
+    what_failed TEXT,
+    key_decisions TEXT,
+    files_modified TEXT,
+    outcome TEXT CHECK(outcome IN ('SUCCEEDED', 'PARTIAL', 'FAILED', 'UNKNOWN')),
+    outcome_notes TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+    indexed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE continuity (
+    id TEXT PRIMARY KEY,
+    session_name TEXT NOT NULL,
+    goal TEXT,
+    state_done TEXT,
+    state_now TEXT,
+    state_next TEXT,
+    key_learnings TEXT,
+    key_decisions TEXT,
+    snapshot_reason TEXT,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+CREATE TABLE queries (
+    id TEXT PRIMARY KEY,
+    question TEXT NOT NULL,
+    answer TEXT NOT NULL,
+    handoffs_matched TEXT,
+    plans_matched TEXT,
+    specs_matched TEXT,
+    continuity_matched TEXT,
+    was_helpful BOOLEAN,
+    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+);
+"""
+
+
+def index_handoffs(conn, root: Path):
+    return index_files(conn, "handoffs", sorted(root.rglob("*.md")))
+
+
+def test_add_update_touch_and_remove(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = init_db(tmp_path / "context.db")
+    root = Path("thoughts/shared/handoffs/auth")
+    first = Path(write(root / "task-1.md", HANDOFF))
+    second = Path(write(root / "task-2.md", HANDOFF.replace("401", "403")))
+
+    stats = index_handoffs(conn, root)
+    assert (stats["added"], stats["updated"], stats["unchanged"], stats["removed"]) == (2, 0, 0, 0)
+    assert count(conn, "handoffs") == count(conn, "manifest") == 2
+
+    # Same content, new mtime: hashed, not re-parsed
+    stat = first.stat()
+    os.utime(first, ns=(stat.st_atime_ns, stat.st_mtime_ns + 10**9))
+    generation = conn.execute("SELECT generation FROM index_state").fetchone()[0]
+    stats = index_handoffs(conn, root)
+    assert (stats["added"], stats["updated"], stats["unchanged"]) == (0, 0, 2)
+    assert conn.execute(
+        "SELECT mtime_ns FROM manifest WHERE path = ?", (str(first),)
+    ).fetchone()[0] == first.stat().st_mtime_ns
+    assert conn.execute("SELECT generation FROM index_state").fetchone()[0] == generation
+
+    write(first, HANDOFF.replace("Retrying once", "Backing off"))
+    stats = index_handoffs(conn, root)
+    assert (stats["added"], stats["updated"], stats["unchanged"]) == (0, 1, 1)
+    assert count(conn, "handoffs") == 2  # Replaced in place, not added
+    assert matches(conn, "handoffs", "backing") == 1
+    assert matches(conn, "handoffs", "retrying") == 1
+
+    second.unlink()
+    stats = index_handoffs(conn, root)
+    assert (stats["unchanged"], stats["removed"]) == (1, 1)
+    assert count(conn, "handoffs") == count(conn, "manifest") == 1
+    assert matches(conn, "handoffs", "retrying") == 0
+    conn.close()
+
+
+def test_baseline_database_is_migrated(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = tmp_path / "context.db"
+    old = sqlite3.connect(db_path)
+    old.executescript(BASELINE_SCHEMA)
+    old.execute(
+        "INSERT INTO handoffs (id, session_name, file_path, files_modified) VALUES (?, ?, ?, ?)",
+        ("old", "auth", "thoughts/handoffs/auth/old.md", '["src/auth.py"]')
+    )
+    old.commit()
+    old.close()
+
+    conn = init_db(db_path)
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(continuity)")}
+    assert "file_path" in columns
+    columns = {row[1] for row in conn.execute("PRAGMA table_info(queries)")}
+    assert {"signature", "search_options", "generation", "times_asked"} <= columns
+    assert conn.execute("SELECT handoff_id, path FROM handoff_files").fetchall() == [
+        ("old", "src/auth.py")
+    ]
+
+    ledger = Path(write(Path("CONTINUITY_auth.md"), LEDGER))
+    stats = index_files(conn, "continuity", [ledger])
+    assert stats["added"] == 1
+    assert conn.execute("SELECT file_path FROM continuity").fetchone()[0] == str(ledger)
+    conn.close()
+
+
+def test_index_paths_skips_unselected_types(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = init_db(tmp_path / "context.db")
+    changed = [
+        write(Path("thoughts/shared/handoffs/auth/task-1.md"), HANDOFF),
+        write(Path("CONTINUITY_auth.md"), LEDGER),
+    ]
+
+    results = index_paths(conn, changed, {"handoffs"})
+    assert set(results) == {"handoffs"}
+    assert (count(conn, "handoffs"), count(conn, "continuity")) == (1, 0)
+
+    results = index_paths(conn, changed)
+    assert set(results) == {"handoffs", "continuity"}
+    assert count(conn, "continuity") == 1
+    conn.close()
+
+
+def test_parallel_parse_matches_serial(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    root = Path("thoughts/shared/handoffs/auth")
+    for n in range(6):
+        write(root / f"task-{n}.md", HANDOFF.replace("401", str(400 + n)))
+
+    serial = init_db(tmp_path / "serial.db")
+    parallel = init_db(tmp_path / "parallel.db")
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        stats = index_files(parallel, "handoffs", sorted(root.glob("*.md")), executor=executor, jobs=2)
+    assert stats == index_handoffs(serial, root)
+    assert stats["added"] == 6
+
+    rows = f"SELECT {', '.join(ARTIFACT_TYPES['handoffs']['columns'])} FROM handoffs ORDER BY id"
+    assert parallel.execute(rows).fetchall() == serial.execute(rows).fetchall()
+    serial.close()
+    parallel.close()
+
+
+def triggers(conn) -> set:
+    return {row[0] for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")}
+
+
+def test_bulk_load_rebuilds_only_changed_fts(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = init_db(tmp_path / "context.db")
+    root = Path("thoughts/shared/handoffs/auth")
+    write(root / "task-1.md", HANDOFF)
+
+    with deferred_fts(conn, ["handoffs", "plans"]) as changed:
+        assert not {"handoffs_ai", "plans_ai"} & triggers(conn)
+        if index_handoffs(conn, root)["added"]:
+            changed.add("handoffs")
+        # Written without its trigger and not reported: no rebuild for plans
+        conn.execute("INSERT INTO plans (id, title, file_path) VALUES ('p', 'Retrying plan', 'p.md')")
+        assert matches(conn, "handoffs", "retrying") == 0
+
+    assert {"handoffs_ai", "handoffs_ad", "handoffs_au", "plans_ai"} <= triggers(conn)
+    assert matches(conn, "handoffs", "retrying") == 1
+    assert matches(conn, "plans", "retrying") == 0
+    conn.close()
+
+
+def test_tokenizer_splits_sections_in_one_pass():
+    doc = parse_markdown("""---
+status: done
+---
+# Token refresh
+
+## What Worked
+Retrying once.
+
+### Details
+Only after a 401.
+
+```
+## Not a heading
+```
+
+## what worked
+Ignored: the first section of a name wins.
+
+## Key Decisions
+Back off.
+""")
+    assert doc.frontmatter == {"status": "done"}
+    assert doc.title == "Token refresh"
+    worked = doc.section("Successes", "WHAT WORKED")
+    assert worked.startswith("Retrying once.") and "### Details" in worked
+    assert "## Not a heading" in worked
+    assert "Ignored" not in worked
+    assert doc.section("Key Decisions") == "Back off."
+
+
+def test_ids_follow_paths_and_maintain_purges_orphans(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    db_path = tmp_path / "context.db"
+    conn = init_db(db_path)
+    root = Path("thoughts/shared/handoffs/auth")
+    handoff = write(root / "task-1.md", HANDOFF)
+    index_handoffs(conn, root)
+    write(Path(handoff), HANDOFF.replace("401", "403"))
+    index_handoffs(conn, root)
+    assert conn.execute("SELECT id FROM handoffs").fetchall() == [(generate_id(handoff),)]
+
+    # A vanished file's row, and one still under an old content-derived ID
+    conn.execute(
+        "INSERT INTO handoffs (id, session_name, file_path, task_summary) "
+        "VALUES ('orphan', 'auth', 'thoughts/shared/handoffs/auth/gone.md', 'Retrying')"
+    )
+    conn.execute("UPDATE handoffs SET id = 'content-id' WHERE file_path = ?", (handoff,))
+    conn.commit()
+
+    report = maintain(conn, db_path)
+    assert report["purged"]["handoffs"] == 2
+    assert conn.execute("SELECT id, file_path FROM handoffs").fetchall() == [
+        (generate_id(handoff), handoff)
+    ]
+    assert matches(conn, "handoffs", "403") == 1
+    assert matches(conn, "handoffs", "retrying") == 1
+    conn.close()
+
+
+REASONING = """# Commit abc1234: Refresh tokens
+
+## Branch
+main
+
+## What was committed
+Refresh tokens before they expire
+
+## What was tried
+
+### Failed attempts
+- build: `make` - undefined name refresh
+- test: `pytest` - 401 on retry
+
+### Summary
+Build passed after **2 failed attempt(s)** and 1 successful build(s).
+"""
+
+
+def test_reasoning_and_attempts_indexed(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = init_db(tmp_path / "context.db")
+    write(Path(".git/claude/commits/abc1234/reasoning.md"), REASONING)
+    attempts = Path(write(Path(".git/claude/branches/main/attempts.jsonl"), "\n".join([
+        '{"type": "build_fail", "command": "make", "error": "undefined name refresh"}',
+        "not json",
+        '{"type": "build_pass", "command": "make"}',
+    ])))
+
+    assert index_reasoning(conn)["added"] == 1
+    assert conn.execute(
+        "SELECT commit_hash, branch, failed_attempts, outcome FROM reasoning"
+    ).fetchone() == ("abc1234", "main", 2, "AFTER_FAILURES")
+    assert matches(conn, "reasoning", "undefined") == 1
+
+    assert index_attempts(conn)["added"] == 1
+    assert conn.execute(
+        "SELECT line_number, attempt_type, error FROM attempts ORDER BY line_number"
+    ).fetchall() == [(1, "build_fail", "undefined name refresh"), (3, "build_pass", None)]
+
+    with attempts.open("a") as f:
+        f.write('\n{"type": "test_fail", "command": "pytest", "error": "401 on retry"}')
+    assert index_attempts(conn)["updated"] == 1
+    assert count(conn, "attempts") == 3
+    conn.close()
+
+
+def test_oversized_sections_are_streamed_and_capped(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(artifact_index, "MMAP_THRESHOLD", 64)  # Read through the memory map
+    monkeypatch.setattr(artifact_index, "MAX_FIELD_SIZE", 100)
+    conn = init_db(tmp_path / "context.db")
+    log = "\n".join(f"retry {n}: 401 from the token endpoint" for n in range(50))
+    root = Path("thoughts/shared/handoffs/auth")
+    write(root / "task-1.md", HANDOFF.replace("Retrying once after a 401.", log))
+
+    index_handoffs(conn, root)
+    summary, worked = conn.execute("SELECT task_summary, what_worked FROM handoffs").fetchone()
+    assert summary == "Refresh tokens before they expire."
+    assert worked.endswith(TRUNCATION_MARK)
+    assert len(worked) <= 100 + len(TRUNCATION_MARK)
+    truncated = json.loads(conn.execute("SELECT truncated FROM manifest").fetchone()[0])
+    assert list(truncated) == ["what_worked"] and truncated["what_worked"] >= len(log)
+    conn.close()
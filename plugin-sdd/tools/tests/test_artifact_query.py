@@ -0,0 +1,268 @@
+"""Tests for artifact_query.py's searches and saved queries."""
+
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import artifact_query  # noqa: E402
+from artifact_index import bump_generation, index_files, init_db  # noqa: E402
+from artifact_query import (  # noqa: E402
+    DEFAULT_DB, SNIPPET_TOKENS, cached_searches, expand_federation, federated_search,
+    find_similar_queries, is_same_question, list_handoffs, metrics_stats, open_cache,
+    parallel_search, record_metrics, run_searches, save_query, search_handoffs, search_unified,
+    stream_searches, weight_columns,
+)
+
+SAVED = "how does the authentication token refresh work for SPEC-042"
+
+
+def test_near_duplicate_question_merges_into_saved_row(tmp_path):
+    conn = init_db(tmp_path / "context.db")
+    save_query(conn, SAVED, "first answer", {})
+
+    save_query(conn, "how does authentication token refresh work in SPEC-042?", "second answer", {})
+
+    rows = conn.execute("SELECT question, answer, times_asked FROM queries").fetchall()
+    assert rows == [(SAVED, "second answer", 2)]
+
+
+def test_only_identical_question_may_reuse_an_answer(tmp_path):
+    conn = init_db(tmp_path / "context.db")
+    save_query(conn, SAVED, "answer", {})
+
+    reordered = "for SPEC-042 how does the authentication token refresh work"
+    paraphrase = "how does authentication token refresh work in SPEC-042?"
+    same, _ = find_similar_queries(conn, reordered)
+    assert is_same_question(same, reordered)
+    same, _ = find_similar_queries(conn, paraphrase)
+    assert same is not None and not is_same_question(same, paraphrase)
+
+
+def test_different_id_or_negation_is_only_similar(tmp_path):
+    conn = init_db(tmp_path / "context.db")
+    save_query(conn, SAVED, "answer", {})
+
+    for question in (
+        "how does the authentication token refresh work for SPEC-043",
+        "how does the authentication token refresh not work for SPEC-042",
+    ):
+        same, similar = find_similar_queries(conn, question)
+        assert same is None
+        assert similar["question"] == SAVED
+
+
+def test_unified_search_normalizes_each_type(tmp_path):
+    conn = init_db(tmp_path / "context.db")
+    # "token" is rare among handoffs but common among plans, so raw bm25
+    # rates every handoff hit above every plan hit
+    handoffs = [("h1", "token refresh token"), ("h2", "token refresh and logout flow")]
+    handoffs += [(f"hx{n}", "logout flow cleanup") for n in range(8)]
+    plans = [("p1", "token refresh token"), ("p2", "token refresh and logout flow")]
+    plans += [(f"px{n}", f"token rotation note {n}") for n in range(6)] + [("py", "cleanup")]
+    for id, summary in handoffs:
+        conn.execute(
+            "INSERT INTO handoffs (id, session_name, file_path, task_summary) VALUES (?, 's', ?, ?)",
+            (id, f"{id}.md", summary),
+        )
+    for id, overview in plans:
+        conn.execute(
+            "INSERT INTO plans (id, title, file_path, overview) VALUES (?, 'Plan', ?, ?)",
+            (id, f"{id}.md", overview),
+        )
+    conn.commit()
+
+    hits = search_unified(conn, "token", limit=6)
+
+    by_type = {t: [hit for hit in hits if hit["artifact_type"] == t] for t in ("handoffs", "plans")}
+    assert max(hit["bm25"] for hit in by_type["handoffs"]) < min(hit["bm25"] for hit in by_type["plans"])
+    # Normalized per type, each type's best hit scores 1.0 and the merged
+    # order interleaves types instead of listing every handoff first
+    assert {hit["id"] for hit in hits[:2]} == {"h1", "p1"}
+    assert [hit["score"] for hit in hits[:2]] == [-1.0, -1.0]
+    assert [hit["artifact_type"] for hit in hits[2:]] != ["handoffs"] * (len(hits) - 2)
+
+
+def test_weight_columns_follow_the_searched_type():
+    assert weight_columns("handoffs") == [
+        "files_modified", "key_decisions", "task_summary", "what_failed", "what_worked",
+    ]
+    assert {"command", "content", "error", "subject"} == set(weight_columns("reasoning"))
+    assert {"question", "what_failed", "goal"} <= set(weight_columns("all"))
+
+
+def add_handoff(conn, id: str, summary: str) -> None:
+    conn.execute(
+        "INSERT INTO handoffs (id, session_name, file_path, task_summary) VALUES (?, 's', ?, ?)",
+        (id, f"{id}.md", summary),
+    )
+    conn.commit()
+
+
+def test_federated_search_merges_projects(tmp_path, monkeypatch):
+    summaries = ["token refresh token refresh", "token refresh and logout", "logout only"]
+    for n, summary in enumerate(summaries):
+        db_path = tmp_path / f"project-{n}" / DEFAULT_DB
+        db_path.parent.mkdir(parents=True)
+        conn = init_db(db_path)
+        add_handoff(conn, f"h{n}", summary)
+        conn.close()
+
+    db_paths = expand_federation([str(tmp_path / "project-*")])
+    assert len(db_paths) == 3
+    monkeypatch.setattr(artifact_query, "attach_limit", lambda conn: 2)  # Two ATTACH batches
+
+    attached = federated_search(db_paths, "token refresh", "handoffs", limit=5)
+    threaded = parallel_search(db_paths, "token refresh", "handoffs", limit=5)
+    for results in (attached, threaded):
+        hits = results["handoffs"]
+        assert [hit["id"] for hit in hits] == ["h0", "h1"]
+        assert [Path(hit["project"]).name for hit in hits] == ["project-0", "project-1"]
+
+
+def test_cached_results_last_until_the_index_changes(tmp_path, monkeypatch):
+    db_path = tmp_path / "context.db"
+    conn = init_db(db_path)
+    add_handoff(conn, "h1", "token refresh")
+    cache = open_cache(db_path)
+    searches = []
+    run_searches = artifact_query.run_searches
+
+    def counted(conn, query, *args, **options):
+        searches.append(query)
+        return run_searches(conn, query, *args, **options)
+
+    monkeypatch.setattr(artifact_query, "run_searches", counted)
+
+    first = cached_searches(conn, cache, "token refresh", "handoffs")
+    assert cached_searches(conn, cache, "Refresh TOKEN", "handoffs") == first
+    assert searches == ["token refresh"]
+
+    add_handoff(conn, "h2", "token refresh again")
+    bump_generation(conn)
+    conn.commit()
+    assert len(cached_searches(conn, cache, "token refresh", "handoffs")["handoffs"]) == 2
+
+    save_query(conn, "how does token refresh work", "answer", {})
+    cached_searches(conn, cache, "token refresh", "handoffs")
+    assert len(searches) == 3
+    cache.close()
+    conn.close()
+
+
+def test_weights_reorder_hits_and_snippets_mark_matches(tmp_path):
+    conn = init_db(tmp_path / "context.db")
+    filler = " ".join(f"step{n}" for n in range(100))
+    conn.executemany(
+        "INSERT INTO handoffs (id, session_name, file_path, task_summary, what_failed) "
+        "VALUES (?, 's', ?, ?, ?)",
+        [
+            ("summary", "summary.md", f"token refresh {filler}", "nothing"),
+            ("failure", "failure.md", "logout", "token refresh"),
+        ],
+    )
+    conn.commit()
+
+    def order(**weights):
+        return [hit["id"] for hit in search_handoffs(conn, "token", weights=weights)]
+
+    assert order(what_failed=20, task_summary=0.1) == ["failure", "summary"]
+    assert order(what_failed=0.1, task_summary=20) == ["summary", "failure"]
+
+    hits = {hit["id"]: hit for hit in search_handoffs(conn, "token", highlight=True)}
+    summary = hits["summary"]["task_summary"]
+    assert summary.startswith("**token** refresh") and summary.endswith(" … ")
+    assert len(summary.split()) <= SNIPPET_TOKENS + 1
+    assert hits["failure"]["what_failed"] == "**token** refresh"
+
+
+def write_handoff(root: Path, name: str, date: str, files: list) -> Path:
+    path = root / name
+    path.parent.mkdir(parents=True, exist_ok=True)
+    listed = "\n".join(f"- `{f}`" for f in files)
+    path.write_text(
+        f"---\ndate: {date}\n---\n# Handoff\n\n## Task Summary\nToken work.\n\n"
+        f"## Files Modified\n{listed}\n"
+    )
+    return path
+
+
+def test_file_session_and_date_facets(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    conn = init_db(tmp_path / "context.db")
+    root = Path("thoughts/shared/handoffs")
+    handoffs = [
+        write_handoff(root, "auth/task-1.md", "2026-01-05", ["./src/auth.py:12", "README.md"]),
+        write_handoff(root, "cache/task-2.md", "2026-02-10", ["src/cache/redis.py"]),
+    ]
+    index_files(conn, "handoffs", handoffs)
+
+    def found(**facets):
+        return sorted(Path(h["file_path"]).parent.name for h in list_handoffs(conn, facets=facets))
+
+    assert found(file="src/auth.py") == ["auth"]
+    assert found(file="src/") == found(file="src/*") == ["auth", "cache"]
+    assert found(file="src/cache/") == ["cache"]
+    assert found(session="cache") == ["cache"]
+    assert found(since="2026-02-01") == ["cache"]
+    assert found(until="2026-02-01") == ["auth"]
+    assert [h["session_name"] for h in search_handoffs(conn, "token", facets={"file": "README.md"})] == ["auth"]
+
+    # Re-indexing an edited handoff replaces its file list
+    write_handoff(root, "auth/task-1.md", "2026-01-05", ["src/login.py"])
+    index_files(conn, "handoffs", handoffs)
+    assert found(file="src/auth.py") == []
+    assert found(file="src/login.py") == ["auth"]
+    conn.close()
+
+
+def test_profile_counts_matches_and_stats_summarize_recorded_runs(tmp_path):
+    db_path = tmp_path / "context.db"
+    conn = init_db(db_path)
+    for n in range(3):
+        add_handoff(conn, f"h{n}", f"token refresh {n}")
+
+    for _ in range(2):
+        profile = {}
+        run_searches(conn, "token", "handoffs", limit=1, profile=profile)
+        record_metrics(conn, "token", profile)
+    entry = profile["handoffs"]
+    assert (entry["rows_returned"], entry["fts_matches"]) == (1, 3)
+    assert entry["plan"] and entry["wall_ms"] >= 0
+    assert [(row["section"], row["queries"]) for row in metrics_stats(conn)] == [("handoffs", 2)]
+    conn.close()
+
+    def cli(*args):
+        return subprocess.run(
+            [sys.executable, artifact_query.__file__, *args, "--db", str(db_path), "--no-server"],
+            capture_output=True, text=True, check=True,
+        ).stdout
+
+    assert "handoffs" in cli("--stats", "--days", "1")
+    assert "p50 ms" not in cli("stats")  # Query text, not the report
+
+
+def test_keyset_pages_cover_every_row_once(tmp_path, monkeypatch):
+    monkeypatch.setattr(artifact_query, "STREAM_PAGE", 2)
+    conn = init_db(tmp_path / "context.db")
+    for n in range(7):
+        add_handoff(conn, f"h{n}", "token refresh" if n % 2 else "token refresh token")
+
+    everything = [row["id"] for _, row in stream_searches(conn, "token", "handoffs", limit=0)]
+    assert sorted(everything) == [f"h{n}" for n in range(7)]
+
+    paged, after = [], None
+    while True:
+        rows = [row for _, row in stream_searches(conn, "token", "handoffs", limit=3, after=after)]
+        paged += [row["id"] for row in rows]
+        if len(rows) < 3:
+            break
+        after = (rows[-1]["score"], rows[-1]["rowid"])
+    assert paged == everything
+
+    with pytest.raises(ValueError):
+        list(stream_searches(conn, "token", "all", after=(0.0, 0)))
+    conn.close()
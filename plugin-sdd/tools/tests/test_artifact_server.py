@@ -0,0 +1,65 @@
+"""Tests for artifact_server.py's protocol and lifecycle."""
+
+import json
+import socket
+import stat
+import sys
+import threading
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_client import server_version, trusted_socket  # noqa: E402
+from artifact_index import init_db  # noqa: E402
+from artifact_server import serve  # noqa: E402
+
+
+def ask(socket_path: Path, request: dict) -> dict:
+    sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+    sock.settimeout(5)
+    try:
+        sock.connect(str(socket_path))
+        sock.sendall(json.dumps(request).encode() + b"\n")
+        return json.loads(sock.makefile("rb").readline())
+    finally:
+        sock.close()
+
+
+def test_serves_searches_until_a_newer_client_retires_it(tmp_path):
+    db_path = tmp_path / "context.db"
+    conn = init_db(db_path)
+    conn.execute(
+        "INSERT INTO handoffs (id, session_name, file_path, task_summary) "
+        "VALUES ('h1', 's', 'h1.md', 'token refresh')"
+    )
+    conn.commit()
+    conn.close()
+
+    socket_path = tmp_path / "run" / "q.sock"
+    server = threading.Thread(target=serve, args=(socket_path, 30))
+    server.start()
+    try:
+        for _ in range(100):
+            if socket_path.exists():
+                break
+            time.sleep(0.05)
+        assert stat.S_IMODE(socket_path.stat().st_mode) == 0o600
+        assert trusted_socket(str(socket_path))
+
+        request = {
+            "db": str(db_path), "query": "token refresh", "type": "handoffs",
+            "version": server_version(), "format": True,
+        }
+        response = ask(socket_path, request)
+        assert [hit["id"] for hit in response["results"]["handoffs"]] == ["h1"]
+        assert "h1.md" in response["text"]
+
+        assert ask(socket_path, dict(request, version="older")) == {"stale": True}
+        server.join(5)
+        assert not server.is_alive()
+        assert not socket_path.exists()
+    finally:
+        if server.is_alive():
+            ask(socket_path, {"version": "stop"})
+            server.join(5)
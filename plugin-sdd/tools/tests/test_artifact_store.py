@@ -0,0 +1,70 @@
+"""Tests for artifact_store.py's pool and records."""
+
+import sys
+import threading
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_index import init_db  # noqa: E402
+from artifact_store import Artifact, ArtifactStore, Handoff, SearchHit  # noqa: E402
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    path = tmp_path / "context.db"
+    conn = init_db(path)
+    conn.execute(
+        "INSERT INTO handoffs (id, session_name, task_number, file_path, task_summary, outcome,"
+        " created_at) VALUES ('h1', 'auth', 3, 'thoughts/h1.md', 'Fix token refresh', 'SUCCEEDED',"
+        " '2025-01-02 10:00:00')"
+    )
+    conn.execute("INSERT INTO handoff_files VALUES ('h1', 'src/auth/login.py')")
+    conn.commit()
+    conn.close()
+    return path
+
+
+def test_results_are_typed_records(db_path):
+    with ArtifactStore(db_path) as store:
+        results = store.search("token refresh", artifact_type="handoffs")
+        hit = results["handoffs"][0]
+        assert isinstance(hit, SearchHit)
+        assert (hit.section, hit.artifact_type, hit.id) == ("handoffs", "handoffs", "h1")
+        assert hit.file_path == "thoughts/h1.md"
+        assert hit.fields["outcome"] == "SUCCEEDED"
+
+        artifact = store.get_by_id("handoffs", hit.id)
+        assert isinstance(artifact, Artifact)
+        assert artifact.fields["task_summary"] == "Fix token refresh"
+        assert store.get_by_id("handoffs", "missing") is None
+
+        assert store.by_file("src/auth/") == [Handoff(
+            "h1", "auth", 3, "Fix token refresh", "SUCCEEDED", "thoughts/h1.md",
+            "2025-01-02 10:00:00",
+        )]
+
+
+def test_close_wakes_threads_waiting_for_a_connection(db_path):
+    store = ArtifactStore(db_path, size=1)
+    errors = []
+
+    def wait_for_connection():
+        try:
+            store.by_file("src/auth/login.py")
+        except RuntimeError as e:
+            errors.append(e)
+
+    with store.connection():
+        waiter = threading.Thread(target=wait_for_connection)
+        waiter.start()
+        waiter.join(0.2)
+        assert waiter.is_alive()  # The only connection is borrowed
+        store.close()
+        waiter.join(5)
+        assert not waiter.is_alive()
+    assert len(errors) == 1
+    with pytest.raises(RuntimeError):
+        store.search("token")
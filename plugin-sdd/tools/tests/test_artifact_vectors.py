@@ -0,0 +1,59 @@
+"""Tests for artifact_vectors.py and semantic search."""
+
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_index import index_files, init_db  # noqa: E402
+from artifact_query import search_hybrid, search_semantic  # noqa: E402
+from artifact_vectors import VECTOR_DIM, embed  # noqa: E402
+
+HANDOFFS = {
+    "auth": "## Task Summary\nAuthenticate users against the directory.\n",
+    "cache": "## Task Summary\nEvict stale cache entries nightly.\n",
+}
+
+
+def buckets(text: str) -> set:
+    return {i for i, value in enumerate(array("f", embed(text))) if value}
+
+
+def index_handoffs(tmp_path: Path):
+    root = tmp_path / "thoughts/shared/handoffs/s"
+    root.mkdir(parents=True)
+    for name, text in HANDOFFS.items():
+        (root / f"{name}.md").write_text(f"# Handoff\n\n{text}")
+    conn = init_db(tmp_path / "context.db")
+    index_files(conn, "handoffs", sorted(root.glob("*.md")))
+    return conn, root
+
+
+def test_embedding_shares_word_prefixes_and_skips_stopwords():
+    assert len(array("f", embed("anything"))) == VECTOR_DIM
+    assert buckets("authenticate") & buckets("authentication")
+    assert not buckets("the and of")
+
+
+def test_indexer_keeps_a_vector_per_row(tmp_path):
+    conn, root = index_handoffs(tmp_path)
+    assert conn.execute("SELECT COUNT(*) FROM vectors WHERE artifact_type = 'handoffs'").fetchone()[0] == 2
+
+    (root / "cache.md").unlink()
+    index_files(conn, "handoffs", sorted(root.glob("*.md")))
+    assert conn.execute("SELECT COUNT(*) FROM vectors").fetchone()[0] == 1
+    conn.close()
+
+
+def test_semantic_search_matches_related_words(tmp_path):
+    pytest.importorskip("numpy")
+    conn, _ = index_handoffs(tmp_path)
+
+    hits = search_semantic(conn, "authentication failures", "handoffs")
+    assert [Path(hit["file_path"]).stem for hit in hits] == ["auth"]
+    hits = search_hybrid(conn, "authentication cache", "handoffs")
+    assert {Path(hit["file_path"]).stem for hit in hits} == {"auth", "cache"}
+    conn.close()
@@ -0,0 +1,98 @@
+"""Tests for eval_cache.py's dependency keys, spec map and stored results."""
+
+import sys
+import textwrap
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from eval_cache import declared_spec_ids, open_eval_cache  # noqa: E402
+
+EVAL_SOURCE = textwrap.dedent('''
+    FIXTURE = {"spec": "SPEC-900"}
+
+
+    class SpecEval:
+        spec_id = "SPEC-001"
+
+        def __init__(self):
+            self.spec_ids = ["SPEC-002", "SPEC-003"]
+
+        def eval_login(self):
+            assert True, "SPEC-901"
+            return make_result(spec_id="SPEC-004", expected="SPEC-902")
+''')
+
+
+def test_only_spec_id_declarations_count():
+    assert declared_spec_ids(EVAL_SOURCE) == ["SPEC-001", "SPEC-002", "SPEC-003", "SPEC-004"]
+
+
+def test_stray_spec_literal_does_not_select_file(tmp_path):
+    (tmp_path / "evals").mkdir()
+    eval_file = tmp_path / "evals" / "eval_login.py"
+    eval_file.write_text(EVAL_SOURCE)
+
+    cache = open_eval_cache(tmp_path)
+    try:
+        declared = cache.spec_ids([eval_file])[eval_file]
+    finally:
+        cache.close()
+
+    assert "SPEC-001" in declared
+    assert not {"SPEC-900", "SPEC-901", "SPEC-902"} & set(declared)
+
+
+def test_results_stored_as_json(tmp_path):
+    eval_file = tmp_path / "eval_login.py"
+    eval_file.write_text(EVAL_SOURCE)
+    results = [{"name": "eval_login", "passed": False, "expected": (1, 2), "actual": [{"a": 3}]}]
+
+    cache = open_eval_cache(tmp_path)
+    try:
+        cache.put(eval_file, "key", {}, results)
+        stored = cache.conn.execute("SELECT results FROM eval_results").fetchone()[0]
+        assert isinstance(stored, str)
+        assert cache.get(eval_file, "key") == [
+            {"name": "eval_login", "passed": False, "expected": "(1, 2)", "actual": [{"a": 3}]}
+        ]
+        assert cache.get(eval_file, "other") is None
+    finally:
+        cache.close()
+
+
+def write(path: Path, text: str) -> Path:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return path
+
+
+def cache_key(project: Path, eval_file: Path):
+    cache = open_eval_cache(project)  # A new run: nothing memoized
+    try:
+        dependencies = cache.dependencies(eval_file)
+        return sorted(dependencies), cache.key(dependencies)
+    finally:
+        cache.close()
+
+
+def test_key_follows_the_import_graph(tmp_path):
+    write(tmp_path / "src/app/__init__.py", "")
+    auth = write(tmp_path / "src/app/auth.py", "from . import tokens\n")
+    tokens = write(tmp_path / "src/app/tokens.py", "TTL = 60\n")
+    unrelated = write(tmp_path / "src/app/billing.py", "RATE = 1\n")
+    write(tmp_path / "evals/helpers.py", "import os\n")
+    eval_file = write(tmp_path / "evals/eval_auth.py", "import helpers\nfrom app.auth import login\n")
+
+    files, key = cache_key(tmp_path, eval_file)
+    assert files == [
+        "evals/eval_auth.py", "evals/helpers.py",
+        "src/app/__init__.py", "src/app/auth.py", "src/app/tokens.py",
+    ]
+
+    write(unrelated, "RATE = 2\n")
+    auth.touch()
+    assert cache_key(tmp_path, eval_file)[1] == key
+
+    write(tokens, "TTL = 30\n")
+    assert cache_key(tmp_path, eval_file)[1] != key
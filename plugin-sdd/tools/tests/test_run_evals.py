@@ -0,0 +1,270 @@
+"""Tests for run_evals.py's supervised workers."""
+
+import signal
+import subprocess
+import sys
+import textwrap
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from run_evals import Limits, exit_error  # noqa: E402
+
+RUN_EVALS = Path(__file__).resolve().parent.parent / "run_evals.py"
+
+CHILD_PROCESS_EVAL = textwrap.dedent('''
+    from concurrent.futures import ProcessPoolExecutor
+    from dataclasses import dataclass
+    from typing import Any
+
+
+    @dataclass
+    class EvalResult:
+        passed: bool
+        spec_id: str
+        description: str
+        expected: Any
+        actual: Any = None
+        error: str = None
+
+
+    def square(value):
+        return value * value
+
+
+    class SpecEval:
+        spec_id = "SPEC-001"
+
+        def eval_pool_in_worker(self):
+            print("eval started", flush=True)
+            with ProcessPoolExecutor(max_workers=2) as pool:
+                actual = list(pool.map(square, [1, 2, 3]))
+            return EvalResult(actual == [1, 4, 9], self.spec_id, "pool in worker", [1, 4, 9], actual)
+
+        def run_all(self):
+            return [self.eval_pool_in_worker()]
+''')
+
+
+def run_evals(project: Path, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(RUN_EVALS), "--project-dir", str(project), *args],
+        capture_output=True, text=True, timeout=60,
+    )
+
+
+def test_eval_can_start_child_processes(tmp_path):
+    (tmp_path / "evals" / "pool").mkdir(parents=True)
+    (tmp_path / "evals" / "pool" / "eval_pool.py").write_text(CHILD_PROCESS_EVAL)
+
+    result = run_evals(tmp_path)
+
+    assert result.returncode == 0, result.stdout + result.stderr
+    assert "[+] pool in worker" in result.stdout
+    assert "daemonic" not in result.stdout + result.stderr
+
+
+def test_running_line_printed_before_eval_runs(tmp_path):
+    (tmp_path / "evals" / "pool").mkdir(parents=True)
+    (tmp_path / "evals" / "pool" / "eval_pool.py").write_text(CHILD_PROCESS_EVAL)
+
+    output = run_evals(tmp_path).stdout
+
+    assert output.index("Running: ") < output.index("eval started")
+
+
+PROJECT_OBJECT_EVAL = textwrap.dedent('''
+    import sys
+    from dataclasses import dataclass
+    from pathlib import Path
+    from typing import Any
+
+    sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "src"))
+    from widget import Widget
+
+
+    @dataclass
+    class EvalResult:
+        passed: bool
+        spec_id: str
+        description: str
+        expected: Any
+        actual: Any = None
+        error: str = None
+
+
+    class SpecEval:
+        spec_id = "SPEC-001"
+
+        def eval_widget(self):
+            return EvalResult(False, self.spec_id, "widget", Widget(1), [Widget(2)])
+
+        def run_all(self):
+            return [self.eval_widget()]
+''')
+
+
+def test_project_objects_reported_as_text(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "widget.py").write_text(textwrap.dedent('''
+        class Widget:
+            def __init__(self, n):
+                self.n = n
+
+            def __repr__(self):
+                return f"Widget({self.n})"
+    '''))
+    (tmp_path / "evals" / "widget").mkdir(parents=True)
+    (tmp_path / "evals" / "widget" / "eval_widget.py").write_text(PROJECT_OBJECT_EVAL)
+
+    result = run_evals(tmp_path)
+
+    assert result.returncode == 1
+    assert "Traceback" not in result.stderr
+    assert "Expected: Widget(1)" in result.stdout
+    assert "Actual: [Widget(2)]" in result.stdout
+
+
+LIMITS_EVAL = textwrap.dedent('''
+    import time
+    from dataclasses import dataclass
+    from typing import Any
+
+
+    @dataclass
+    class EvalResult:
+        passed: bool
+        spec_id: str
+        description: str
+        expected: Any
+        actual: Any = None
+        error: str = None
+
+
+    class SpecEval:
+        spec_id = "SPEC-001"
+
+        def eval_a_sleeps(self):
+            time.sleep(60)
+            return EvalResult(True, self.spec_id, "sleeps", None)
+
+        def eval_b_allocates(self):
+            block = bytearray(1024 * 1024 * 1024)
+            return EvalResult(True, self.spec_id, "allocates", len(block))
+
+        def eval_c_after(self):
+            return EvalResult(True, self.spec_id, "runs after", True, True)
+
+        def run_all(self):
+            return [self.eval_a_sleeps(), self.eval_b_allocates(), self.eval_c_after()]
+''')
+
+
+def limits_project(tmp_path: Path, *evals: str) -> Path:
+    source = LIMITS_EVAL
+    for name in ("eval_a_sleeps", "eval_b_allocates"):
+        if name not in evals:
+            source = source.replace(f"self.{name}(), ", "")
+    (tmp_path / "evals" / "limits").mkdir(parents=True)
+    (tmp_path / "evals" / "limits" / "eval_limits.py").write_text(source)
+    return tmp_path
+
+
+def test_timed_out_eval_is_killed_and_rest_of_file_runs(tmp_path):
+    project = limits_project(tmp_path, "eval_a_sleeps")
+
+    result = run_evals(project, "--timeout", "2")
+
+    assert result.returncode == 1
+    assert "[x] SpecEval.eval_a_sleeps" in result.stdout
+    assert "Error: timeout" in result.stdout
+    assert "[+] runs after" in result.stdout
+
+
+def test_memory_capped_eval_fails_and_rest_of_file_runs(tmp_path):
+    project = limits_project(tmp_path, "eval_b_allocates")
+
+    result = run_evals(project, "--max-memory", "512")
+
+    assert result.returncode == 1
+    assert "[x] SpecEval.eval_b_allocates" in result.stdout
+    assert "Error: memory" in result.stdout
+    assert "[+] runs after" in result.stdout
+
+
+def test_hang_outside_any_eval_counts_against_timeout(tmp_path):
+    (tmp_path / "evals" / "hang").mkdir(parents=True)
+    (tmp_path / "evals" / "hang" / "eval_hang.py").write_text("import time\ntime.sleep(60)\n")
+
+    result = run_evals(tmp_path, "--timeout", "2")
+
+    assert result.returncode == 1
+    assert "eval_hang.py (outside any eval)" in result.stdout
+    assert "Error: timeout" in result.stdout
+
+
+def test_sigkill_is_memory_only_under_max_memory():
+    killed = -signal.SIGKILL
+
+    assert exit_error(killed, Limits(max_memory_mb=512)) == "memory"
+    assert exit_error(killed, Limits()) == f"worker exited with code {killed}"
+    assert exit_error(killed, Limits(max_memory_mb=512), killed=True) != "memory"
+
+
+TUPLE_EVAL = textwrap.dedent('''
+    from dataclasses import dataclass
+    from typing import Any
+
+
+    @dataclass
+    class EvalResult:
+        passed: bool
+        spec_id: str
+        description: str
+        expected: Any
+        actual: Any = None
+        error: str = None
+
+
+    class SpecEval:
+        spec_id = "SPEC-001"
+
+        def eval_pair(self):
+            return EvalResult(False, self.spec_id, "pair", (1, 2), {3})
+
+        def run_all(self):
+            return [self.eval_pair()]
+''')
+
+
+def test_changed_serves_cached_results_as_they_were_reported(tmp_path):
+    (tmp_path / "evals" / "pair").mkdir(parents=True)
+    (tmp_path / "evals" / "pair" / "eval_pair.py").write_text(TUPLE_EVAL)
+
+    fresh = run_evals(tmp_path).stdout
+    cached = run_evals(tmp_path, "--changed").stdout
+
+    assert "[x] pair" in cached and "[cached]" in cached
+    for line in ("Expected: (1, 2)", "Actual: {3}"):
+        assert line in fresh and line in cached
+
+
+def spec_eval(spec_id: str, description: str, note: str = "") -> str:
+    return TUPLE_EVAL.replace('"SPEC-001"', f'"{spec_id}"').replace(
+        'EvalResult(False, self.spec_id, "pair", (1, 2), {3})',
+        f'EvalResult(True, self.spec_id, "{description}", "{note}")',
+    )
+
+
+def test_spec_runs_only_files_declaring_it(tmp_path):
+    (tmp_path / "evals" / "auth").mkdir(parents=True)
+    (tmp_path / "evals" / "auth" / "eval_login.py").write_text(spec_eval("SPEC-001", "login"))
+    (tmp_path / "evals" / "auth" / "eval_logout.py").write_text(
+        spec_eval("SPEC-002", "logout", note="unlike SPEC-001")
+    )
+
+    output = run_evals(tmp_path, "--spec", "SPEC-001").stdout
+    assert "[+] login" in output and "logout" not in output
+
+    output = run_evals(tmp_path, "--spec", "spec-00*").stdout
+    assert "[+] login" in output and "[+] logout" in output